@@ -1,13 +1,30 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from array import array
+import functools
+import itertools
 import json
+import marshal
 import os
-import ctypes
+import operator
 import sys
+import queue
+import re
+import threading
+import time
 
 # Simple Tkinter board with drag-and-drop and a backlog tab
 
+# Startup timings (--profile-startup) count from here, after the imports; for
+# the imports themselves run `python -X importtime app.py`
+_START = time.perf_counter()
+PROFILE_STARTUP = False  # set by --profile-startup
+
 # Dark mode palette
 APP_BG = "#202020"       # slate-900
 FG = "#FFFFFF"           # gray-200
@@ -15,31 +32,3774 @@ CARD_BG = "#3A3A3A"      # slate-800
 CARD_BORDER = "#FFFFFF"   # gray-700
 CARD_HOVER = "#2F2F42"    # slightly lighter hover
 
-COLUMNS = [
-    ("To-Do", "#1E293B"),      # slate-ish
-    ("Blocked", "#331B1B"),    # maroon-ish
-    ("Priority", "#332611"),   # brown-ish
-    ("In Progress", "#21162B"),# dark green-ish
-    ("Complete", "#162B1A"),   # slate
-]
+COLUMNS = [
+    ("To-Do", "#1E293B"),      # slate-ish
+    ("Blocked", "#331B1B"),    # maroon-ish
+    ("Priority", "#332611"),   # brown-ish
+    ("In Progress", "#21162B"),# dark green-ish
+    ("Complete", "#162B1A"),   # slate
+]
+
+# The backlog is stored as one more lane of the model, next to the board columns
+BACKLOG = "Backlog"
+LANES = [title for title, _ in COLUMNS] + [BACKLOG]
+
+# Scrolling behavior
+NATURAL_SCROLL = True  # If True, content moves in the same direction as wheel/gesture
+
+# Virtualized columns: only cards in the viewport (plus overscan) get widgets
+CARD_PAD_X = 8          # horizontal gap between card and column edge
+CARD_PAD_Y = 6          # vertical gap above and below each card
+CARD_EST_HEIGHT = 66    # height assumed for a card until it has been measured
+OVERSCAN_ROWS = 3       # extra rows built above and below the viewport
+# How cards are drawn: "widgets" (a Frame with a Label and two ttk.Buttons each)
+# or "canvas" (six items on the column's canvas, events bound once per column)
+CARD_RENDERER = os.environ.get("NOTTRELLO_CARDS", "widgets")
+BUTTON_BORDER = "#6B7280"  # outline of the canvas-drawn View/Delete buttons
+BUTTON_PRESSED = "#4B4B4B"
+
+# Dragging
+DRAG_EDGE = 40          # px from a column's top/bottom edge where auto-scroll starts
+DRAG_SCROLL_MAX = 24    # px scrolled per auto-scroll tick at the very edge
+DRAG_TICK_MS = 16       # auto-scroll tick (~60 fps)
+DROP_MARKER = "#60A5FA"  # insertion line shown while dragging
+
+# Backlog list rows
+LIST_ROW_HEIGHT = 22
+LIST_SELECT_BG = "#334155"
+
+# Input coalescing: motion and wheel events are folded into one update per frame
+FRAME_MS = 16
+WHEEL_NOTCH_FRACTION = 0.1  # one wheel notch scrolls this share of the column height
+
+# Instrumentation (F12 toggles the overlay, Ctrl+F12 dumps a trace file). Off by
+# default; NOTTRELLO_INSTRUMENT=1 turns it on from startup, NOTTRELLO_TRACEMALLOC=1
+# also samples Python memory, NOTTRELLO_TRACE=<path> dumps on close.
+INSTRUMENT = os.environ.get("NOTTRELLO_INSTRUMENT", "") not in ("", "0")
+INSTRUMENT_TRACEMALLOC = os.environ.get("NOTTRELLO_TRACEMALLOC", "") not in ("", "0")
+HEARTBEAT_MS = 50       # main-loop lag is measured against this after() tick
+OVERLAY_MS = 500        # overlay refresh interval
+STAT_WINDOW = 512       # recent samples kept per timer for percentiles
+TRACE_MAX = 200000      # timed calls kept for the trace dump
+
+# Storage backend: "json" (board_state.json, see PERSISTENCE) or "sqlite"
+# (board_state.db). Switching to sqlite imports the existing JSON board once.
+STORAGE_BACKEND = os.environ.get("NOTTRELLO_STORAGE", "json")
+# JSON persistence: "journal" appends one small record per change next to the
+# snapshot and compacts it into the snapshot in the background; "snapshot"
+# rewrites the whole state file on every change.
+PERSISTENCE = "journal"
+JOURNAL_MAX_BYTES = 1 << 20   # compact once the journal grows past this size...
+JOURNAL_MAX_AGE = 300         # ...or once its oldest record is this many seconds old
+SAVE_DEBOUNCE_MS = 400        # changes within this window are written together
+# Card descriptions live in a content-addressed store next to each board's file
+# (<board>.blobs/): cards and events in memory carry only a ref to the text, in a
+# field of its own ("desc_ref"), and so do saved files; the text itself is only
+# in the store. Boards saved with texts inline (older versions) are still read.
+# Bodies read recently stay in an LRU of up to BLOB_CACHE_BYTES; bodies neither a
+# card nor an undo step refers to are deleted once BLOB_GC_AGE seconds old,
+# checked at most every BLOB_GC_EVERY.
+BLOB_CACHE_BYTES = 4 << 20
+BLOB_GC_AGE = 7 * 86400
+BLOB_GC_EVERY = 86400
+# Search matches query words as word prefixes. A query of words shorter than
+# SEARCH_MIN_PREFIX would take in a large part of the vocabulary ("a": every
+# word starting with a), so they match whole words; next to a longer word
+# they are still prefixes, checked on the cards that word matched.
+SEARCH_MIN_PREFIX = 2
+# Archive: "Clear" on the Complete column moves its cards to <board>.archive/
+# instead of deleting them, and cards left in Complete for ARCHIVE_AFTER_DAYS
+# (None: never) follow on their own. The archive is only read when browsed.
+DONE_LANE = "Complete"
+ARCHIVE_AFTER_DAYS = 14
+ARCHIVE_FIRST_CHECK_MS = 60 * 1000    # first check for aged cards after startup...
+ARCHIVE_CHECK_MS = 60 * 60 * 1000     # ...then this often
+# Analytics: every change of column is logged per board (<board>.flow). Cycle
+# time runs from a card's first arrival in FLOW_START_LANE to its last arrival in
+# DONE_LANE; lead time from its creation. NumPy speeds up the bulk math when it
+# is installed; it is not required.
+FLOW_START_LANE = "In Progress"
+ANALYTICS_RANGES = [("Last 30 days", 30), ("Last 90 days", 90), ("Last year", 365), ("All", None)]
+ANALYTICS_REFRESH_MS = 500   # redraw at most this often while changes come in
+# Saved views (Views tab): filters and a sort order over every card of a board,
+# kept in views.json in the data directory and shared by all boards
+VIEW_SORTS = [("created", "Created"), ("updated", "Updated"), ("entered", "In column since"),
+              ("title", "Title"), ("lane", "Column")]
+VIEW_TIMES = ("created", "updated", "entered")
+DEFAULT_VIEWS = [
+    {"name": "Newest first", "sort": "created", "descending": True},
+    {"name": "Stale in Blocked", "lane": "Blocked", "age_field": "entered", "older_than_days": 7,
+     "sort": "entered"},
+    {"name": "Not touched in 30 days", "age_field": "updated", "older_than_days": 30, "sort": "updated"},
+]
+
+ANALYTICS_COLORS = {
+    "To-Do": "#3B82F6",
+    "Blocked": "#EF4444",
+    "Priority": "#F59E0B",
+    "In Progress": "#A855F7",
+    "Complete": "#22C55E",
+    "Backlog": "#64748B",
+}
+# Open boards' files are checked this often for changes made by another process
+# (a second window, the command line, a sync tool); those are merged in place
+WATCH_MS = 1000
+
+# Boards: each has its own state file, listed in boards.json. Up to BOARD_CACHE
+# boards stay open in memory (least recently used is closed first) and up to
+# BOARD_VIEWS of them keep their columns built, so switching back is instant.
+DEFAULT_BOARD = "Main"
+BOARD_CACHE = 4
+BOARD_VIEWS = 2
+
+# Undo history per board (Ctrl+Z / Ctrl+Y): the oldest steps are dropped once
+# either limit is passed
+UNDO_MAX_BYTES = 16 << 20
+UNDO_MAX_STEPS = 1000
+
+# Shared boards: `python app.py serve` holds a board and shares it with windows
+# started with --connect HOST:PORT (or NOTTRELLO_SERVER=HOST:PORT)
+SYNC_SERVER = os.environ.get("NOTTRELLO_SERVER", "")
+SYNC_PORT = 8765
+SYNC_BATCH_MS = 10          # server: changes within this window go out as one message
+SYNC_POLL_MS = 16           # client: the Tk thread applies what arrived this often
+SYNC_CLIENT_BUFFER = 256    # messages queued per client; one further behind gets a snapshot instead
+SYNC_RESYNC_MS = 1000       # client: at most one snapshot request this often
+SYNC_MAX_LINE = 64 << 20    # longest message the server accepts
+SYNC_TIMEOUT = 5.0          # seconds to connect and receive the first snapshot
+
+# Startup: the first screen of every lane is loaded before the window shows,
+# the rest is appended in small time-sliced batches from the event loop
+FIRST_SCREEN_ROWS = 40
+LOAD_SLICE_MS = 10
+LOAD_CHUNK = 256
+
+# Background jobs: CPU-bound work goes to a pool of processes (no GIL contention
+# with the window), I/O to a pool of threads. Results and progress come back
+# through queues the Tk loop drains every JOB_POLL_MS while any job is running.
+JOB_PROCESSES = max(1, min(4, (os.cpu_count() or 2) - 1))
+JOB_THREADS = 4
+JOB_POLL_MS = 50
+
+# Board model: plain Python state, no Tk. Widgets subscribe to its change events.
+#
+# Every mutation emits a small JSON-friendly event dict. Listeners receive a list
+# of events: one event for a single operation, or everything done inside
+# `with model.batch():` at once. Events carry enough data to be replayed
+# (journal, sync) or inverted (undo). Positions are lane indexes; order keys
+# (Card.pos) are an in-memory detail and never leave the model. With a BlobStore
+# attached (`model.blobs`) a description is stored there and the card keeps its
+# ref ("desc_ref") with "desc" left empty; add/edit take the text, apply either
+# (desc_text reads one back). Without a store the text stays in "desc".
+#   {"op": "add", "id", "lane", "index", "title", "desc", "desc_ref"}
+#   {"op": "remove", "id", "lane", "index", "title", "desc", "desc_ref"}
+#   {"op": "move", "id", "lane", "index", "from_lane", "from_index"}
+#   {"op": "edit", "id", "title", "desc", "desc_ref", "old_title", "old_desc", "old_desc_ref"}
+#   {"op": "load", "lane", "ids"}    cards appended by a bulk load, not an edit
+#   {"op": "reset"}
+
+class Card:
+    __slots__ = ("id", "title", "desc", "lane", "pos", "ref")
+
+    def __init__(self, cid: int, title: str, desc: str, lane: str, pos: float, ref: str = ""):
+        self.id = cid
+        self.title = title
+        self.desc = desc
+        self.lane = lane
+        self.pos = pos
+        self.ref = ref   # BlobStore ref of the description ("" when held in desc)
+
+class Lane:
+    # Card ids of one column kept sorted by their float order key (Card.pos), in
+    # blocks of up to 2 * LOAD so an insert or removal shifts one block, not the
+    # whole lane. A Fenwick tree over the block sizes maps a block to the index of
+    # its first card and an index to its block. Per insert, remove or index_of:
+    # O(log n) bisects and tree steps plus an O(LOAD) shift within one block; a
+    # block split or emptied rebuilds the tree, O(n / LOAD), at most once per
+    # LOAD changes. Keys are unique within a lane (BoardModel._key_for), so
+    # finding a card by its key is a bisect, not a scan; inserting between two
+    # cards only needs a new key.
+    LOAD = 512
+    __slots__ = ("_keys", "_ids", "_maxes", "_tree", "_len", "ids")
+
+    def __init__(self):
+        self._keys: List[List[float]] = []
+        self._ids: List[List[int]] = []
+        self._maxes: List[float] = []   # last key of each block
+        self._tree: List[int] = [0]     # Fenwick tree of block sizes, 1-based
+        self._len = 0
+        self.ids = LaneIds(self)        # read-only view, in order
+
+    def __len__(self):
+        return self._len
+
+    def _build(self):
+        tree = [0] + [len(ids) for ids in self._ids]
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree):
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _grow(self, b: int, delta: int):
+        tree = self._tree
+        b += 1
+        while b < len(tree):
+            tree[b] += delta
+            b += b & -b
+        self._len += delta
+
+    def _start(self, b: int) -> int:
+        # Index of the first card of block b
+        tree = self._tree
+        total = 0
+        while b:
+            total += tree[b]
+            b -= b & -b
+        return total
+
+    def _locate(self, index: int) -> tuple:
+        # -> (block, offset in it) of the card at `index` (0 <= index < len)
+        tree = self._tree
+        b = 0
+        step = 1 << (len(tree).bit_length() - 1)
+        while step:
+            nxt = b + step
+            if nxt < len(tree) and tree[nxt] <= index:
+                b = nxt
+                index -= tree[nxt]
+            step >>= 1
+        return b, index
+
+    def _find(self, pos: float, cid: int) -> tuple:
+        b = bisect_left(self._maxes, pos)
+        if b == len(self._maxes):
+            raise KeyError(cid)
+        i = bisect_left(self._keys[b], pos)
+        ids = self._ids[b]
+        while ids[i] != cid:   # only past equal keys, which the model never makes
+            i += 1
+            if i == len(ids):
+                b, i = b + 1, 0
+                ids = self._ids[b]
+        return b, i
+
+    def index_of(self, pos: float, cid: int) -> int:
+        b, i = self._find(pos, cid)
+        return self._start(b) + i
+
+    def key_at(self, index: int) -> float:
+        b, i = self._locate(index)
+        return self._keys[b][i]
+
+    def insert(self, pos: float, cid: int) -> int:
+        maxes = self._maxes
+        if not maxes:
+            self._keys.append([pos])
+            self._ids.append([cid])
+            maxes.append(pos)
+            self._len = 1
+            self._build()
+            return 0
+        b = bisect_right(maxes, pos)
+        if b == len(maxes):
+            b -= 1
+        keys, ids = self._keys[b], self._ids[b]
+        i = bisect_right(keys, pos)
+        keys.insert(i, pos)
+        ids.insert(i, cid)
+        maxes[b] = keys[-1]
+        index = self._start(b) + i
+        if len(keys) > 2 * self.LOAD:
+            half = self.LOAD
+            self._keys[b + 1:b + 1] = [keys[half:]]
+            self._ids[b + 1:b + 1] = [ids[half:]]
+            del keys[half:], ids[half:]
+            maxes[b:b + 1] = [keys[-1], self._keys[b + 1][-1]]
+            self._len += 1
+            self._build()
+        else:
+            self._grow(b, 1)
+        return index
+
+    def remove(self, pos: float, cid: int) -> int:
+        b, i = self._find(pos, cid)
+        index = self._start(b) + i
+        keys, ids = self._keys[b], self._ids[b]
+        del keys[i], ids[i]
+        if keys:
+            self._maxes[b] = keys[-1]
+            self._grow(b, -1)
+        else:
+            del self._keys[b], self._ids[b], self._maxes[b]
+            self._len -= 1
+            self._build()
+        return index
+
+    def extend(self, keys: List[float], ids: List[int]):
+        # Cards after every other one (keys ascending, above the last), as loaded
+        if not ids:
+            return
+        load = self.LOAD
+        i = 0
+        if self._ids and len(self._ids[-1]) < load:
+            i = load - len(self._ids[-1])
+            self._keys[-1].extend(keys[:i])
+            self._ids[-1].extend(ids[:i])
+        for j in range(i, len(ids), load):
+            self._keys.append(keys[j:j + load])
+            self._ids.append(ids[j:j + load])
+        self._maxes[:] = [blk[-1] for blk in self._keys]
+        self._len += len(ids)
+        self._build()
+
+    def last_key(self) -> Optional[float]:
+        return self._maxes[-1] if self._maxes else None
+
+    def reset(self, ids: List[int]):
+        # `ids` in order, keyed 0, 1, 2, ... (the ids view stays the same object)
+        load = self.LOAD
+        self._ids = [ids[i:i + load] for i in range(0, len(ids), load)]
+        self._keys = [[float(k) for k in range(i, i + len(blk))] for i, blk in zip(range(0, len(ids), load), self._ids)]
+        self._maxes = [keys[-1] for keys in self._keys]
+        self._len = len(ids)
+        self._build()
+
+    def key_for_index(self, index: Optional[int]) -> Optional[float]:
+        # Order key that places a card at `index`; None when the gap is exhausted
+        n = self._len
+        if index is None or index >= n:
+            return self._maxes[-1] + 1.0 if n else 0.0
+        if index <= 0:
+            return self._keys[0][0] - 1.0
+        b, i = self._locate(index)
+        hi = self._keys[b][i]
+        lo = self._keys[b][i - 1] if i else self._keys[b - 1][-1]
+        mid = (lo + hi) / 2.0
+        if mid <= lo or mid >= hi:
+            return None
+        return mid
+
+class LaneIds:
+    # The ids of a Lane in order, as BoardModel.ids hands them out: a read-only
+    # sequence that stays current as the lane changes (views keep hold of it)
+    __slots__ = ("_lane",)
+
+    def __init__(self, lane: Lane):
+        self._lane = lane
+
+    def __len__(self):
+        return self._lane._len
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._lane._ids)
+
+    def __reversed__(self):
+        return itertools.chain.from_iterable(reversed(ids) for ids in reversed(self._lane._ids))
+
+    def __getitem__(self, index):
+        n = self._lane._len
+        if isinstance(index, slice):
+            start, stop, step = index.indices(n)
+            if step != 1:
+                return list(self)[index]
+            out: List[int] = []
+            if start >= stop:
+                return out
+            blocks = self._lane._ids
+            b, i = self._lane._locate(start)
+            while len(out) < stop - start:
+                out.extend(blocks[b][i:i + stop - start - len(out)])
+                b += 1
+                i = 0
+            return out
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("lane index out of range")
+        b, i = self._lane._locate(index)
+        return self._lane._ids[b][i]
+
+    def __contains__(self, cid) -> bool:
+        return any(cid in ids for ids in self._lane._ids)
+
+    def index(self, cid) -> int:
+        start = 0
+        for ids in self._lane._ids:
+            if cid in ids:
+                return start + ids.index(cid)
+            start += len(ids)
+        raise ValueError(f"{cid} is not in the lane")
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LaneIds):
+            other = list(other)
+        return isinstance(other, list) and len(other) == len(self) and list(self) == other
+
+    def __repr__(self):
+        return f"LaneIds({list(self)!r})"
+
+class BoardModel:
+    def __init__(self, lanes: Iterable[str] = None):
+        if lanes is None:
+            lanes = LANES
+        self.lanes: Dict[str, Lane] = {name: Lane() for name in lanes}
+        self.cards: Dict[int, Card] = {}
+        self.next_id = 1
+        self.blobs: Optional[BlobStore] = None
+        self._listeners: List[Callable[[List[dict]], None]] = []
+        self._batch_depth = 0
+        self._pending: List[dict] = []
+
+    # Subscriptions
+    def subscribe(self, fn: Callable[[List[dict]], None]):
+        self._listeners.append(fn)
+
+    def unsubscribe(self, fn: Callable[[List[dict]], None]):
+        try:
+            self._listeners.remove(fn)
+        except ValueError:
+            pass
+
+    @contextmanager
+    def batch(self):
+        # Group several mutations into a single notification
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending:
+                events, self._pending = self._pending, []
+                self._dispatch(events)
+
+    def _emit(self, event: dict):
+        if self._batch_depth:
+            self._pending.append(event)
+        else:
+            self._dispatch([event])
+
+    def _dispatch(self, events: List[dict]):
+        for fn in list(self._listeners):
+            fn(events)
+
+    # Queries
+    def get(self, cid: int) -> Optional[Card]:
+        return self.cards.get(cid)
+
+    def ids(self, lane: str) -> LaneIds:
+        # Live, read-only view of a lane's order
+        return self.lanes[lane].ids
+
+    def lane_cards(self, lane: str) -> List[Card]:
+        cards = self.cards
+        return [cards[cid] for cid in self.lanes[lane].ids]
+
+    def index_of(self, cid: int) -> int:
+        card = self.cards[cid]
+        return self.lanes[card.lane].index_of(card.pos, cid)
+
+    def desc_text(self, card: Card, cache: bool = True) -> str:
+        if card.ref and self.blobs is not None:
+            return self.blobs.get(card.ref, cache) or card.desc
+        return card.desc
+
+    def _store(self, desc: str, ref: str = "") -> tuple:
+        # (text, ref) given -> (desc, ref) as a card holds them. A ref is trusted
+        # as is; text is hashed into the blob store, which writes it later (flush)
+        if self.blobs is None:
+            return desc, ref
+        if ref:
+            return "", ref
+        if desc:
+            stored = self.blobs.put(desc)
+            if stored is not None:
+                return "", stored
+        return desc, ""
+
+    def __len__(self):
+        return len(self.cards)
+
+    # Mutations
+    def _key_for(self, lane: str, index: Optional[int]) -> float:
+        pos = self.lanes[lane].key_for_index(index)
+        if pos is None:
+            self._renumber(lane)
+            pos = self.lanes[lane].key_for_index(index)
+        return pos
+
+    def _renumber(self, lane: str):
+        # Spread order keys evenly again once repeated midpoint inserts exhaust a gap
+        ln = self.lanes[lane]
+        ids = list(ln.ids)
+        ln.reset(ids)
+        for i, cid in enumerate(ids):
+            self.cards[cid].pos = float(i)
+
+    def add(self, lane: str, title: str, desc: str = "", index: Optional[int] = None) -> Card:
+        return self._insert(self.next_id, lane, index, title, desc)
+
+    def add_many(self, lane: str, items: Iterable, index: Optional[int] = None) -> List[Card]:
+        # Insert (title, desc) pairs in order with a single notification
+        out = []
+        with self.batch():
+            for title, desc in items:
+                out.append(self.add(lane, title, desc, index))
+                if index is not None:
+                    index += 1
+        return out
+
+    def _insert(self, cid: int, lane: str, index: Optional[int], title: str, desc: str, ref: str = "") -> Card:
+        if lane not in self.lanes:
+            raise KeyError(lane)
+        if cid in self.cards:
+            raise KeyError(cid)
+        pos = self._key_for(lane, index)
+        desc, ref = self._store(desc, ref)
+        card = Card(cid, title, desc, lane, pos, ref)
+        self.cards[cid] = card
+        index = self.lanes[lane].insert(pos, cid)
+        if cid >= self.next_id:
+            self.next_id = cid + 1
+        self._emit({"op": "add", "id": cid, "lane": lane, "index": index, "title": title,
+                    "desc": desc, "desc_ref": ref})
+        return card
+
+    def restore(self, lane: str, items: List[tuple]):
+        # Put cards back with their old ids: items are (id, index, title, desc, ref)
+        # in ascending final index order (e.g. undoing a clear). The lane is merged
+        # and renumbered once instead of inserting card by card; one "add" event each.
+        if lane not in self.lanes:
+            raise KeyError(lane)
+        cards = self.cards
+        for it in items:
+            if it[0] in cards:
+                raise KeyError(it[0])
+        ln = self.lanes[lane]
+        old = list(ln.ids)
+        merged: List[int] = []
+        placed = []
+        j = 0
+        for cid, index, title, desc, ref in items:
+            take = index - len(merged)
+            if take > 0:
+                merged.extend(old[j:j + take])
+                j += take
+            desc, ref = self._store(desc or "", ref or "")
+            placed.append((cid, len(merged), title, desc, ref))
+            merged.append(cid)
+            cards[cid] = Card(cid, title, desc, lane, 0.0, ref)
+            if cid >= self.next_id:
+                self.next_id = cid + 1
+        merged.extend(old[j:])
+        # In place: views may hold the live id list (see ids)
+        ln.reset(merged)
+        for i, cid in enumerate(merged):
+            cards[cid].pos = float(i)
+        with self.batch():
+            for cid, index, title, desc, ref in placed:
+                self._emit({"op": "add", "id": cid, "lane": lane, "index": index, "title": title,
+                            "desc": desc, "desc_ref": ref})
+
+    def edit(self, cid: int, title: str, desc: str, ref: str = ""):
+        card = self.cards[cid]
+        desc, ref = self._store(desc, ref)
+        if card.title == title and card.desc == desc and card.ref == ref:
+            return
+        old_title, old_desc, old_ref = card.title, card.desc, card.ref
+        card.title = title
+        card.desc = desc
+        card.ref = ref
+        self._emit({"op": "edit", "id": cid, "title": title, "desc": desc, "desc_ref": ref,
+                    "old_title": old_title, "old_desc": old_desc, "old_desc_ref": old_ref})
+
+    def remove(self, cid: int):
+        card = self.cards.pop(cid)
+        index = self.lanes[card.lane].remove(card.pos, cid)
+        self._emit({"op": "remove", "id": cid, "lane": card.lane, "index": index,
+                    "title": card.title, "desc": card.desc, "desc_ref": card.ref})
+
+    def move(self, cid: int, lane: str, index: Optional[int] = None):
+        # `index` counts positions in the target lane without the moved card
+        card = self.cards[cid]
+        if lane not in self.lanes:
+            raise KeyError(lane)
+        from_lane = card.lane
+        from_index = self.lanes[from_lane].remove(card.pos, cid)
+        pos = self._key_for(lane, index)
+        card.lane = lane
+        card.pos = pos
+        index = self.lanes[lane].insert(pos, cid)
+        self._emit({"op": "move", "id": cid, "lane": lane, "index": index,
+                    "from_lane": from_lane, "from_index": from_index})
+
+    def clear(self, lane: str):
+        with self.batch():
+            for cid in list(self.lanes[lane].ids):
+                self.remove(cid)
+
+    def sync(self, other: "BoardModel"):
+        # Make this board equal to `other`, keyed by card id: remove what is gone,
+        # add or move only the cards that are out of place, edit changed text. In
+        # each lane the longest run of cards already in the right relative order
+        # stays put. One notification for the whole diff. -> whether anything changed
+        cards = self.cards
+        theirs = other.cards
+        with self.batch():
+            start = len(self._pending)
+            for cid in [cid for cid in cards if cid not in theirs]:
+                self.remove(cid)
+            for name, lane in other.lanes.items():
+                if name not in self.lanes or self.lanes[name].ids == lane.ids:
+                    continue
+                keep = self._in_order(name, lane.ids)
+                prev = None
+                for cid in lane.ids:
+                    if cid not in keep:
+                        # Right after its predecessor in `other` (the lane without it)
+                        index = 0
+                        mine = cards.get(cid)
+                        if prev is not None:
+                            index = self.index_of(prev) + 1
+                            if mine is not None and mine.lane == name and self.index_of(cid) < index:
+                                index -= 1
+                        if mine is None:
+                            card = theirs[cid]
+                            self._insert(cid, name, index, card.title, card.desc, card.ref)
+                        elif mine.lane != name or self.index_of(cid) != index:
+                            self.move(cid, name, index)
+                    prev = cid
+            for cid, card in theirs.items():
+                if cid in cards:
+                    self.edit(cid, card.title, card.desc, card.ref)
+            if other.next_id > self.next_id:
+                self.next_id = other.next_id
+            return len(self._pending) > start
+
+    def _in_order(self, lane: str, target: List[int]) -> set:
+        # Ids from `target` already in `lane` whose current order agrees with it:
+        # a longest increasing subsequence of their present indexes
+        where = {cid: i for i, cid in enumerate(self.lanes[lane].ids)}
+        seq = [(where[cid], cid) for cid in target if cid in where]
+        tails: List[int] = []   # smallest last index of an increasing run, per length
+        ends: List[int] = []    # position in seq of that last element
+        back = [-1] * len(seq)
+        for i, (index, _) in enumerate(seq):
+            k = bisect_left(tails, index)
+            if k == len(tails):
+                tails.append(index)
+                ends.append(i)
+            else:
+                tails[k] = index
+                ends[k] = i
+            back[i] = ends[k - 1] if k else -1
+        keep = set()
+        i = ends[-1] if ends else -1
+        while i >= 0:
+            keep.add(seq[i][1])
+            i = back[i]
+        return keep
+
+    def apply(self, event: dict):
+        # Replay a recorded event (journal, undo, remote peers)
+        op = event.get("op")
+        if op == "add":
+            self._insert(int(event["id"]), event["lane"], event.get("index"),
+                         event.get("title", ""), event.get("desc", ""), event.get("desc_ref", ""))
+        elif op == "remove":
+            self.remove(int(event["id"]))
+        elif op == "move":
+            self.move(int(event["id"]), event["lane"], event.get("index"))
+        elif op == "edit":
+            self.edit(int(event["id"]), event.get("title", ""), event.get("desc", ""), event.get("desc_ref", ""))
+
+    # Serialization
+    def to_dict(self) -> dict:
+        cards = self.cards
+
+        def dump(lane):
+            out = []
+            for cid in self.lanes[lane].ids:
+                c = cards[cid]
+                if c.ref:
+                    out.append({"id": c.id, "title": c.title, "desc": c.desc, "desc_ref": c.ref})
+                else:
+                    out.append({"id": c.id, "title": c.title, "desc": c.desc})
+            return out
+
+        return {
+            "columns": {name: dump(name) for name in self.lanes if name != BACKLOG},
+            "backlog": dump(BACKLOG) if BACKLOG in self.lanes else [],
+            "next_id": self.next_id,
+        }
+
+    def load(self, data: dict) -> bool:
+        # Replace the whole board from saved data; accepts the legacy string-list formats
+        lanes, next_id, restored_any = self.parse_state(data, self.lanes)
+        self.load_parsed(lanes, next_id)
+        return restored_any
+
+    @staticmethod
+    def parse_state(data: dict, lane_names: Iterable[str]):
+        # Normalize saved data into {lane: [(id, title, desc, ref), ...]} without touching
+        # the model. Cards saved without an id (legacy formats) or with a duplicate
+        # id get a fresh one. -> (lanes, next_id, restored_any)
+        lane_names = list(lane_names)
+        raw: Dict[str, list] = {name: [] for name in lane_names}
+        restored_any = False
+        cols_data = data.get("columns", {})
+        if not isinstance(cols_data, dict):
+            cols_data = {}
+        for name in lane_names:
+            if name == BACKLOG:
+                continue
+            items = cols_data.get(name)
+            if isinstance(items, list):
+                for it in items:
+                    title, desc, cid, ref = BoardModel._parse_item(it, strip=True)
+                    if title:
+                        raw[name].append((cid, title, desc, ref))
+                        restored_any = True
+        backlog_items = data.get("backlog", [])
+        if BACKLOG in raw and isinstance(backlog_items, list):
+            for it in backlog_items:
+                title, desc, cid, ref = BoardModel._parse_item(it, strip=False)
+                if title:
+                    raw[BACKLOG].append((cid, title, desc, ref))
+            if backlog_items:
+                restored_any = True
+
+        next_id = data.get("next_id") if isinstance(data.get("next_id"), int) else 1
+        for items in raw.values():
+            for cid, _, _, _ in items:
+                if cid is not None and cid >= next_id:
+                    next_id = cid + 1
+        next_id = max(1, next_id)
+        seen = set()
+        lanes: Dict[str, list] = {}
+        for name, items in raw.items():
+            out = []
+            for cid, title, desc, ref in items:
+                if cid is None or cid in seen:
+                    cid = next_id
+                    next_id += 1
+                seen.add(cid)
+                out.append((cid, title, desc, ref))
+            lanes[name] = out
+        return lanes, next_id, restored_any
+
+    @staticmethod
+    def _parse_item(it, strip: bool):
+        # -> (title, desc, id or None, desc ref or "")
+        ref = ""
+        if isinstance(it, dict):
+            title = str(it.get("title", ""))
+            desc = str(it.get("desc", ""))
+            cid = it.get("id")
+            cid = cid if isinstance(cid, int) else None
+            ref = it.get("desc_ref")
+            if not (isinstance(ref, str) and BlobStore.is_ref(ref)):
+                ref = ""
+        elif isinstance(it, str):
+            title, desc, cid = it, "", None
+        else:
+            title, desc, cid = str(it), "", None
+        if strip:
+            title = title.strip()
+        return title, desc, cid, ref
+
+    def load_parsed(self, lanes: Dict[str, list], next_id: int):
+        # Replace the board with already-parsed lanes (see parse_state)
+        self.cards = {}
+        for name in self.lanes:
+            self.lanes[name] = Lane()
+        self.next_id = next_id
+        for name, items in lanes.items():
+            if name in self.lanes:
+                self._append(name, items)
+        self._dispatch([{"op": "reset"}])
+
+    def extend(self, lane: str, items: list):
+        # Bulk-append parsed (id, title, desc, ref) items to the end of a lane with one
+        # {"op": "load"} event; used to fill the board in slices at startup.
+        # Loading is not an edit, so persistence and undo ignore this event.
+        ids = self._append(lane, items)
+        if ids:
+            self._emit({"op": "load", "lane": lane, "ids": ids})
+
+    def _append(self, lane: str, items: list) -> List[int]:
+        ln = self.lanes[lane]
+        cards = self.cards
+        blobs = self.blobs
+        pos = ln.last_key()
+        pos = 0.0 if pos is None else pos + 1.0
+        keys = []
+        ids = []
+        for cid, title, desc, ref in items:
+            if desc and not ref and blobs is not None:
+                # Saved inline by an older version: stored now, and saves from here
+                # on carry the ref
+                stored = blobs.put(desc)
+                if stored is not None:
+                    desc, ref = "", stored
+            if cid in cards:
+                cid = self.next_id
+            cards[cid] = Card(cid, title, desc, lane, pos, ref)
+            keys.append(pos)
+            ids.append(cid)
+            pos += 1.0
+            if cid >= self.next_id:
+                self.next_id = cid + 1
+        ln.extend(keys, ids)
+        return ids
+
+class UndoHistory:
+    # Undo/redo built from the model's own events. Each notification (one change,
+    # or everything in one batch) is one step, kept as compact tuples that hold
+    # just enough to invert it; strings are shared with the cards, not copied.
+    # Undo replays a step's inverses, newest first, inside one model batch, so
+    # restoring a cleared lane is one notification and one persisted write.
+    # Description refs a step holds are pinned in the model's BlobStore while the
+    # step is kept, so gc cannot delete a body that undo would bring back.
+    def __init__(self, model: BoardModel, max_bytes: int = UNDO_MAX_BYTES, max_steps: int = UNDO_MAX_STEPS):
+        self.model = model
+        self.max_bytes = max_bytes
+        self.max_steps = max_steps
+        self._undo: deque = deque()        # (ops, estimated bytes, refs), oldest first
+        self._redo: List[tuple] = []
+        self.bytes = 0
+        self._replaying = False
+        model.subscribe(self._on_model_change)
+
+    def _on_model_change(self, events: List[dict]):
+        if self._replaying:
+            return
+        ops = []
+        refs = []
+        size = 0
+        for ev in events:
+            op = ev["op"]
+            if op in ("add", "remove"):
+                ref = ev.get("desc_ref", "")
+                rec = (op, ev["id"], ev["lane"], ev["index"], ev["title"], ev["desc"], ref)
+                size += 80 + len(ev["title"]) + len(ev["desc"])
+                if ref:
+                    refs.append(ref)
+            elif op == "move":
+                rec = (op, ev["id"], ev["lane"], ev["index"], ev["from_lane"], ev["from_index"])
+                size += 80
+            elif op == "edit":
+                ref, old_ref = ev.get("desc_ref", ""), ev.get("old_desc_ref", "")
+                rec = (op, ev["id"], ev["title"], ev["desc"], ref, ev["old_title"], ev["old_desc"], old_ref)
+                size += 80 + len(ev["title"]) + len(ev["desc"]) + len(ev["old_title"]) + len(ev["old_desc"])
+                refs.extend(r for r in (ref, old_ref) if r)
+            elif op == "reset":
+                # A different board state was loaded; old steps no longer apply
+                self.clear()
+                ops, refs, size = [], [], 0
+                continue
+            else:
+                # "load" fills the board at startup; it is not an edit
+                continue
+            ops.append(rec)
+        if not ops:
+            return
+        self._drop(self._redo)
+        self._redo = []
+        if refs and self.model.blobs is not None:
+            self.model.blobs.pin(refs)
+        self._undo.append((ops, size, refs))
+        self.bytes += size
+        while self._undo and (self.bytes > self.max_bytes or len(self._undo) > self.max_steps):
+            self._drop([self._undo.popleft()])
+
+    def _drop(self, steps: Iterable[tuple]):
+        blobs = self.model.blobs
+        for _, s, refs in steps:
+            self.bytes -= s
+            if refs and blobs is not None:
+                blobs.unpin(refs)
+
+    def clear(self):
+        self._drop(self._undo)
+        self._drop(self._redo)
+        self._undo.clear()
+        self._redo = []
+        self.bytes = 0
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> bool:
+        if not self._undo:
+            return False
+        step = self._undo.pop()
+        ops = step[0]
+        if len(ops) < 2 or not self._restore_run(ops):
+            self._replay(reversed(ops), inverse=True)
+        self._redo.append(step)
+        return True
+
+    def _restore_run(self, ops: List[tuple]) -> bool:
+        # Undo of a clear or multi-delete in one lane. When cards were removed at
+        # non-decreasing indexes, each one's original position is its removal index
+        # plus the number removed before it, so the lane is rebuilt in one pass
+        lane = ops[0][2]
+        items = []
+        last = -1
+        for n, rec in enumerate(ops):
+            if rec[0] != "remove" or rec[2] != lane or rec[3] < last:
+                return False
+            last = rec[3]
+            items.append((rec[1], rec[3] + n, rec[4], rec[5], rec[6]))
+        self._replaying = True
+        try:
+            self.model.restore(lane, items)
+        except KeyError:
+            return False
+        finally:
+            self._replaying = False
+        return True
+
+    @contextmanager
+    def ignoring(self):
+        # Changes made in the block are not this user's to undo (a shared board's
+        # other clients); the steps recorded so far stay
+        replaying, self._replaying = self._replaying, True
+        try:
+            yield
+        finally:
+            self._replaying = replaying
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+        step = self._redo.pop()
+        self._replay(step[0], inverse=False)
+        self._undo.append(step)
+        return True
+
+    def _replay(self, ops: Iterable[tuple], inverse: bool):
+        model = self.model
+        self._replaying = True
+        try:
+            with model.batch():
+                for rec in ops:
+                    try:
+                        model.apply(self._event(rec, inverse))
+                    except (KeyError, TypeError, ValueError):
+                        # The card changed underneath (e.g. another step was dropped)
+                        pass
+        finally:
+            self._replaying = False
+
+    @staticmethod
+    def _event(rec: tuple, inverse: bool) -> dict:
+        op, cid = rec[0], rec[1]
+        if op == "move":
+            _, _, lane, index, from_lane, from_index = rec
+            if inverse:
+                lane, index = from_lane, from_index
+            return {"op": "move", "id": cid, "lane": lane, "index": index}
+        if op == "edit":
+            _, _, title, desc, ref, old_title, old_desc, old_ref = rec
+            if inverse:
+                title, desc, ref = old_title, old_desc, old_ref
+            return {"op": "edit", "id": cid, "title": title, "desc": desc, "desc_ref": ref}
+        _, _, lane, index, title, desc, ref = rec
+        if (op == "add") == inverse:
+            return {"op": "remove", "id": cid}
+        return {"op": "add", "id": cid, "lane": lane, "index": index, "title": title,
+                "desc": desc, "desc_ref": ref}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def read_desc_tokens(progress: Optional[Callable], blobs: "BlobStore", items: List[tuple]) -> List[tuple]:
+    # (id, ref) -> (id, ref, tokens) for each description; a thread job in the
+    # window (see JobRunner), called directly elsewhere
+    found = []
+    for i, (cid, ref) in enumerate(items):
+        if progress is not None and not i % 256:
+            progress(i, len(items))
+        found.append((cid, ref, frozenset(tokenize(blobs.get(ref, cache=False)))))
+    return found
+
+class SearchIndex:
+    # Inverted index over card titles and descriptions (board and backlog alike).
+    # Tokens map to sets of card ids; a sorted vocabulary gives prefix matches via
+    # bisect. Kept current from model events rather than rebuilt; bulk "load"
+    # events are indexed as they arrive, so a progressive load spreads the cost
+    # over its time slices. Descriptions kept in a BlobStore are read and indexed
+    # on the next query instead, so loading a board never reads every body. The
+    # window reads them on a worker thread (take_unread/add_desc_tokens) and
+    # queries with partial=True meanwhile, matching what is indexed so far.
+    def __init__(self, model: BoardModel):
+        self.model = model
+        self._postings: Dict[str, set] = {}
+        self._vocab: List[str] = []
+        self._doc_tokens: Dict[int, frozenset] = {}
+        self._unread: set = set()   # cards whose description ref is not indexed yet
+        self._build()
+        model.subscribe(self._on_model_change)
+
+    def _on_model_change(self, events: List[dict]):
+        for ev in events:
+            op = ev["op"]
+            if op == "reset":
+                self._build()
+            elif op == "add":
+                self._index(ev["id"], ev["title"], ev["desc"], ev.get("desc_ref", ""))
+            elif op == "remove":
+                self._unindex(ev["id"])
+            elif op == "edit":
+                self._unindex(ev["id"])
+                self._index(ev["id"], ev["title"], ev["desc"], ev.get("desc_ref", ""))
+            elif op == "load":
+                for cid in ev["ids"]:
+                    card = self.model.get(cid)
+                    if card is not None:
+                        self._index(cid, card.title, card.desc, card.ref)
+            # Moves don't change text; lanes are read from the model at query time
+
+    def _build(self):
+        postings: Dict[str, set] = {}
+        doc_tokens = self._doc_tokens = {}
+        unread = self._unread = set()
+        findall = _TOKEN_RE.findall
+        for card in self.model.cards.values():
+            cid = card.id
+            if card.ref:
+                unread.add(cid)
+            tokens = frozenset(findall(card.title.lower()) + findall(card.desc.lower()))
+            doc_tokens[cid] = tokens
+            for tok in tokens:
+                ids = postings.get(tok)
+                if ids is None:
+                    postings[tok] = {cid}
+                else:
+                    ids.add(cid)
+        self._postings = postings
+        self._vocab = sorted(postings)
+
+    def _index(self, cid: int, title: str, desc: str, ref: str = ""):
+        if ref:
+            self._unread.add(cid)
+        tokens = frozenset(tokenize(title) + tokenize(desc))
+        self._doc_tokens[cid] = tokens
+        for tok in tokens:
+            ids = self._postings.get(tok)
+            if ids is None:
+                self._postings[tok] = {cid}
+                self._vocab.insert(bisect_left(self._vocab, tok), tok)
+            else:
+                ids.add(cid)
+
+    def _read_descs(self):
+        # Index the descriptions of cards added, edited or loaded since the last query
+        blobs = self.model.blobs
+        if blobs is None:
+            self._unread = set()
+            return
+        self.add_desc_tokens(read_desc_tokens(None, blobs, self.take_unread()))
+
+    def has_unread(self) -> bool:
+        return bool(self._unread)
+
+    def take_unread(self) -> List[tuple]:
+        # (id, ref) of the descriptions not indexed yet, now left to the caller
+        unread, self._unread = self._unread, set()
+        cards = self.model.cards
+        return [(cid, cards[cid].ref) for cid in unread if cid in cards and cards[cid].ref]
+
+    def requeue(self, items: List[tuple]):
+        # Taken descriptions that were not read after all
+        cards = self.model.cards
+        self._unread.update(cid for cid, ref in items if cid in cards and cards[cid].ref == ref)
+
+    def add_desc_tokens(self, found: List[tuple]):
+        # Results of read_desc_tokens; cards deleted or edited since are skipped
+        # (an edit indexed them again)
+        cards = self.model.cards
+        postings = self._postings
+        grown = False
+        for cid, ref, words in found:
+            card = cards.get(cid)
+            if card is None or card.ref != ref or cid not in self._doc_tokens:
+                continue
+            tokens = self._doc_tokens[cid]
+            new = words - tokens
+            if not new:
+                continue
+            self._doc_tokens[cid] = tokens | new
+            for tok in new:
+                ids = postings.get(tok)
+                if ids is None:
+                    postings[tok] = {cid}
+                    grown = True
+                else:
+                    ids.add(cid)
+        if grown:
+            self._vocab = sorted(postings)
+
+    def _unindex(self, cid: int):
+        self._unread.discard(cid)
+        for tok in self._doc_tokens.pop(cid, ()):
+            ids = self._postings.get(tok)
+            if ids is None:
+                continue
+            ids.discard(cid)
+            if not ids:
+                del self._postings[tok]
+                i = bisect_left(self._vocab, tok)
+                if i < len(self._vocab) and self._vocab[i] == tok:
+                    del self._vocab[i]
+
+    def _prefix_range(self, prefix: str):
+        lo = bisect_left(self._vocab, prefix)
+        hi = bisect_left(self._vocab, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def _postings_over(self, lo: int, hi: int, limit: int) -> bool:
+        # Whether the postings of vocabulary range lo:hi hold more than `limit` ids
+        postings, vocab = self._postings, self._vocab
+        total = 0
+        for i in range(lo, hi):
+            total += len(postings[vocab[i]])
+            if total > limit:
+                return True
+        return False
+
+    def query(self, text: str, partial: bool = False) -> Optional[set]:
+        # Ids of cards containing every query word as a word prefix; None for an
+        # empty query. partial: leave descriptions not indexed yet unread
+        terms = sorted(set(tokenize(text)), key=len, reverse=True)
+        if not terms:
+            return None
+        if self._unread and not partial:
+            self._read_descs()
+        result: Optional[set] = None
+        for term in terms:
+            if result is None and len(term) < SEARCH_MIN_PREFIX:
+                lo = bisect_left(self._vocab, term)
+                hi = lo + (lo < len(self._vocab) and self._vocab[lo] == term)
+            else:
+                lo, hi = self._prefix_range(term)
+            if lo == hi:
+                return set()
+            if result is not None and self._postings_over(lo, hi, 4 * len(result)):
+                # Cheaper to check the few remaining candidates than to union many postings
+                docs = self._doc_tokens
+                words = set(self._vocab[lo:hi])
+                result = {cid for cid in result if not words.isdisjoint(docs[cid])}
+            else:
+                postings = self._postings
+                matched = set().union(*(postings[self._vocab[i]] for i in range(lo, hi)))
+                result = matched if result is None else result & matched
+            if not result:
+                return result
+        return result
+
+class CardTimes:
+    # When each card of a board was created, last changed (edited, or moved to
+    # another lane) and entered its lane, as [created, updated, entered], in
+    # <board>.times next to its file (in memory only for shared boards). Only
+    # changes seen by this window are timed; cards first seen by loading count
+    # from then. The file is read on first use, not when the board opens.
+    def __init__(self, model: BoardModel, path: Optional[str]):
+        self.model = model
+        self.path = path
+        self._times: Dict[int, list] = {}   # None where not known until the file is read
+        self._loaded = False
+        self._dirty = False
+        self._seen = time.time()
+        model.subscribe(self._on_model_change)
+
+    def _on_model_change(self, events: List[dict]):
+        now = time.time()
+        times = self._times
+        for ev in events:
+            op = ev["op"]
+            if op == "add":
+                times[ev["id"]] = [now, now, now]
+            elif op == "edit":
+                times.setdefault(ev["id"], [None, None, None])[1] = now
+            elif op == "move" and ev["lane"] != ev["from_lane"]:
+                rec = times.setdefault(ev["id"], [None, None, None])
+                rec[1] = rec[2] = now
+            elif op == "remove":
+                times.pop(ev["id"], None)
+            elif self._loaded and op in ("load", "reset"):
+                ids = ev["ids"] if op == "load" else self.model.cards
+                for cid in ids:
+                    if cid not in times:
+                        times[cid] = [now, now, now]
+            else:
+                continue
+            self._dirty = True
+
+    def _load(self):
+        self._loaded = True
+        saved = {}
+        if self.path is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                saved = {}
+        if not isinstance(saved, dict):
+            saved = {}
+        times = self._times
+        seen = [self._seen] * 3
+        for key, rec in saved.items():
+            try:
+                cid = int(key)
+                rec = [float(t) for t in rec[:3]]
+            except (TypeError, ValueError):
+                continue
+            if len(rec) == 3:
+                mine = times.get(cid)
+                times[cid] = rec if mine is None else [a if a is not None else b for a, b in zip(mine, rec)]
+        for cid in self.model.cards:
+            rec = times.get(cid)
+            if rec is None:
+                times[cid] = list(seen)
+            elif None in rec:
+                times[cid] = [a if a is not None else b for a, b in zip(rec, seen)]
+
+    def get(self, cid: int) -> list:
+        if not self._loaded:
+            self._load()
+        rec = self._times.get(cid)
+        if rec is None or None in rec:
+            rec = self._times[cid] = [self._seen if t is None else t for t in (rec or [None] * 3)]
+        return rec
+
+    def save(self):
+        if not self._dirty or self.path is None:
+            return
+        if not self._loaded:
+            self._load()
+        cards = self.model.cards
+        try:
+            write_json_atomic(self.path, {str(cid): rec for cid, rec in self._times.items() if cid in cards})
+        except OSError as e:
+            log(f"could not save card times: {e}")
+            return
+        self._dirty = False
+
+class SortedIndex:
+    # (key, id) pairs of one sort field, kept sorted as cards change: an insert
+    # or removal is a bisect plus one list insert/delete, no re-sort
+    __slots__ = ("entries", "keys")
+
+    def __init__(self, pairs: Iterable[tuple]):
+        self.entries: List[tuple] = sorted(pairs)
+        self.keys: Dict[int, object] = {cid: key for key, cid in self.entries}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def put(self, cid: int, key):
+        old = self.keys.get(cid, self)
+        if old == key:
+            return
+        if old is not self:
+            del self.entries[bisect_left(self.entries, (old, cid))]
+        self.keys[cid] = key
+        entry = (key, cid)
+        self.entries.insert(bisect_left(self.entries, entry), entry)
+
+    def discard(self, cid: int):
+        old = self.keys.pop(cid, self)
+        if old is not self:
+            del self.entries[bisect_left(self.entries, (old, cid))]
+
+    def span(self, lo=None, hi=None) -> tuple:
+        # Index range of the entries with lo <= key < hi (either end open)
+        entries = self.entries
+        i = 0 if lo is None else bisect_left(entries, (lo,))
+        j = len(entries) if hi is None else bisect_left(entries, (hi,), i)
+        return i, j
+
+class CardIndexes:
+    # One SortedIndex per VIEW_SORTS field, each built the first time a view
+    # uses it and then kept current from model events. Timed fields read
+    # CardTimes, which must be subscribed to the model first (it is: CardTimes
+    # is made with the board, these on demand).
+    def __init__(self, model: BoardModel, times: CardTimes):
+        self.model = model
+        self.times = times
+        self.lane_order = {name: i for i, name in enumerate(LANES)}
+        self._indexes: Dict[str, SortedIndex] = {}
+        model.subscribe(self._on_model_change)
+
+    def _key(self, field: str, card: Card):
+        if field == "title":
+            return card.title.casefold()
+        if field == "lane":
+            return self.lane_order.get(card.lane, len(self.lane_order))
+        return self.times.get(card.id)[VIEW_TIMES.index(field)]
+
+    def index(self, field: str) -> SortedIndex:
+        ix = self._indexes.get(field)
+        if ix is None:
+            key = self._key
+            ix = self._indexes[field] = SortedIndex((key(field, c), c.id) for c in self.model.cards.values())
+        return ix
+
+    def _on_model_change(self, events: List[dict]):
+        indexes = self._indexes
+        if not indexes:
+            return
+        cards = self.model.cards
+        key = self._key
+        for ev in events:
+            op = ev["op"]
+            if op == "reset":
+                indexes.clear()   # built again on next use
+                return
+            if op == "remove":
+                for ix in indexes.values():
+                    ix.discard(ev["id"])
+                continue
+            if op == "load":
+                changed, fields = ev["ids"], indexes
+            elif op == "add":
+                changed, fields = (ev["id"],), indexes
+            elif op == "edit":
+                changed, fields = (ev["id"],), ("title", "updated")
+            elif op == "move" and ev["lane"] != ev["from_lane"]:
+                changed, fields = (ev["id"],), ("lane", "updated", "entered")
+            else:
+                continue
+            for field in fields:
+                ix = indexes.get(field)
+                if ix is not None:
+                    for cid in changed:
+                        card = cards.get(cid)
+                        if card is not None:
+                            ix.put(cid, key(field, card))
+
+    def select(self, view: dict, search: "SearchIndex", now: Optional[float] = None,
+               partial: bool = False) -> List[int]:
+        # Ids of the cards matching `view`, in its order. The narrowest of the
+        # filters (search matches, the lane, the age range of a time index)
+        # supplies the candidates; the others are checked on those alone, so
+        # no filter walks the whole board unless it is the only one.
+        model = self.model
+        cards = model.cards
+        sort = view.get("sort") if view.get("sort") in dict(VIEW_SORTS) else "created"
+        sources = []   # (size, ids in some order, ordered by the sort field)
+
+        matches = search.query(view.get("query") or "", partial)
+        if matches is not None:
+            sources.append((len(matches), matches, False))
+        lane = view.get("lane")
+        if lane in model.lanes:
+            ids = model.ids(lane)
+            sources.append((len(ids), ids, False))
+        else:
+            lane = None
+        age_field = view.get("age_field")
+        lo = hi = None
+        if age_field in VIEW_TIMES:
+            now = time.time() if now is None else now
+            if view.get("older_than_days") is not None:
+                hi = now - float(view["older_than_days"]) * 86400
+            if view.get("newer_than_days") is not None:
+                lo = now - float(view["newer_than_days"]) * 86400
+        if lo is not None or hi is not None:
+            ix = self.index(age_field)
+            i, j = ix.span(lo, hi)
+            sources.append((j - i, [cid for _, cid in ix.entries[i:j]], age_field == sort))
+        else:
+            age_field = None
+        if not sources:
+            ix = self.index(sort)
+            sources.append((len(ix), [cid for _, cid in ix.entries], True))
+
+        size, ids, ordered = min(sources, key=lambda s: s[0])
+        if matches is not None and ids is not matches:
+            ids = [cid for cid in ids if cid in matches]
+        if lane is not None:
+            ids = [cid for cid in ids if cid in cards and cards[cid].lane == lane]
+        if age_field is not None and not ordered:
+            keys = self.index(age_field).keys
+            ids = [cid for cid in ids if (lo is None or keys[cid] >= lo) and (hi is None or keys[cid] < hi)]
+        if not ordered:
+            keys = self.index(sort).keys
+            ids = sorted((cid for cid in ids if cid in keys), key=lambda cid: (keys[cid], cid))
+        elif not isinstance(ids, list):
+            ids = list(ids)
+        if view.get("descending"):
+            ids.reverse()
+        return ids
+
+class ViewStore:
+    # Saved views, in order, as a JSON list in `path`; DEFAULT_VIEWS until saved
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                views = json.load(f).get("views")
+        except (OSError, ValueError, AttributeError):
+            views = None
+        if not isinstance(views, list):
+            views = DEFAULT_VIEWS
+        self.views: List[dict] = [dict(v) for v in views if isinstance(v, dict) and isinstance(v.get("name"), str)]
+
+    def get(self, name: str) -> Optional[dict]:
+        for v in self.views:
+            if v["name"] == name:
+                return v
+        return None
+
+    def put(self, view: dict):
+        for i, v in enumerate(self.views):
+            if v["name"] == view["name"]:
+                self.views[i] = view
+                break
+        else:
+            self.views.append(view)
+        self.save()
+
+    def remove(self, name: str):
+        self.views = [v for v in self.views if v["name"] != name]
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        write_json_atomic(self.path, {"views": self.views})
+
+def log(msg: str):
+    # Windowed EXE builds have no console, so stderr may be None
+    if sys.stderr is not None:
+        try:
+            print(f"notTrello: {msg}", file=sys.stderr)
+        except Exception:
+            pass
+
+_PROBE: Optional["Instrumentation"] = None  # set while instrumentation is on
+
+def instrumented(name: str):
+    # Time calls to the decorated handler while instrumentation is on. When it is
+    # off the cost is one extra call and a global lookup.
+    def wrap(fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            probe = _PROBE
+            if probe is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                probe.record(name, t0, time.perf_counter())
+        return timed
+    return wrap
+
+class Instrumentation:
+    # Collects handler timings (see `instrumented`), main-loop lag from an after()
+    # heartbeat, widget counts and optionally tracemalloc, shows them in an overlay
+    # and dumps them as JSON that also loads in chrome://tracing / Perfetto.
+    def __init__(self, app: "App"):
+        self.app = app
+        self.enabled = False
+        self.stats: Dict[str, list] = {}   # name -> [calls, total s, max s, recent durations]
+        self.trace: List[tuple] = []       # (name, start, duration)
+        self._expected = 0.0
+        self._beat_job = None
+        self._overlay: Optional[tk.Label] = None
+        self._overlay_job = None
+        self._tracemalloc = False
+
+    def enable(self, overlay: bool = True):
+        global _PROBE
+        if not self.enabled:
+            self.enabled = True
+            _PROBE = self
+            self._expected = time.perf_counter() + HEARTBEAT_MS / 1000.0
+            self._beat_job = self.app.after(HEARTBEAT_MS, self._beat)
+            if INSTRUMENT_TRACEMALLOC:
+                import tracemalloc
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._tracemalloc = True
+        if overlay:
+            self.show_overlay()
+
+    def disable(self):
+        global _PROBE
+        if _PROBE is self:
+            _PROBE = None
+        self.enabled = False
+        for job in (self._beat_job, self._overlay_job):
+            if job is not None:
+                try:
+                    self.app.after_cancel(job)
+                except Exception:
+                    pass
+        self._beat_job = self._overlay_job = None
+        if self._tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._tracemalloc = False
+        self.hide_overlay()
+
+    def toggle(self, _=None):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def record(self, name: str, t0: float, t1: float, trace: bool = True):
+        d = t1 - t0
+        s = self.stats.get(name)
+        if s is None:
+            s = self.stats[name] = [0, 0.0, 0.0, deque(maxlen=STAT_WINDOW)]
+        s[0] += 1
+        s[1] += d
+        if d > s[2]:
+            s[2] = d
+        s[3].append(d)
+        if trace and len(self.trace) < TRACE_MAX:
+            self.trace.append((name, t0, d))
+
+    def _beat(self):
+        # How late this tick ran is how long the main loop was busy
+        now = time.perf_counter()
+        self.record("main-loop lag", min(self._expected, now), now, trace=False)
+        self._expected = now + HEARTBEAT_MS / 1000.0
+        self._beat_job = self.app.after(HEARTBEAT_MS, self._beat)
+
+    def widget_counts(self) -> Dict[str, int]:
+        # Card widgets built per column (visible + pooled) and all Tk widgets
+        counts = {title: len(col._active) + len(col._pool) for title, col in self.app.columns.items()}
+        total = 0
+        stack = [self.app]
+        while stack:
+            w = stack.pop()
+            total += 1
+            stack.extend(w.winfo_children())
+        counts["all widgets"] = total
+        return counts
+
+    def memory(self) -> Optional[dict]:
+        if not self._tracemalloc:
+            return None
+        import tracemalloc
+        current, peak = tracemalloc.get_traced_memory()
+        return {"current_kb": current // 1024, "peak_kb": peak // 1024}
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for name, (calls, total, worst, recent) in self.stats.items():
+            ordered = sorted(recent)
+            out[name] = {
+                "calls": calls,
+                "avg_ms": round(total / calls * 1000.0, 3),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000.0, 3),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000.0, 3),
+                "max_ms": round(worst * 1000.0, 3),
+            }
+        return out
+
+    def show_overlay(self):
+        if self._overlay is None:
+            self._overlay = tk.Label(self.app, bg="#000000", fg="#A7F3D0", justify=tk.LEFT, anchor="nw",
+                                     font=("Consolas", 9), padx=8, pady=6)
+        self._overlay.place(relx=1.0, x=-12, y=44, anchor="ne")
+        self._overlay.lift()
+        self._update_overlay()
+
+    def hide_overlay(self):
+        if self._overlay is not None:
+            self._overlay.place_forget()
+
+    def _update_overlay(self):
+        self._overlay_job = None
+        if self._overlay is None:
+            return
+        lines = [f"{'handler':<22}{'calls':>7}{'avg':>8}{'p95':>8}{'max':>8}  ms"]
+        for name, s in sorted(self.summary().items()):
+            lines.append(f"{name[:22]:<22}{s['calls']:>7}{s['avg_ms']:>8.2f}{s['p95_ms']:>8.2f}{s['max_ms']:>8.1f}")
+        counts = self.widget_counts()
+        lines.append("")
+        lines.append("cards built: " + "  ".join(f"{t} {n}" for t, n in counts.items() if t != "all widgets"))
+        lines.append(f"Tk widgets: {counts['all widgets']:,}   board: {len(self.app.model):,} cards")
+        mem = self.memory()
+        if mem is not None:
+            lines.append(f"python heap: {mem['current_kb']:,} KB (peak {mem['peak_kb']:,} KB)")
+        lines.append("F12: hide   Ctrl+F12: dump trace")
+        self._overlay.configure(text="\n".join(lines))
+        if self.enabled:
+            self._overlay_job = self.app.after(OVERLAY_MS, self._update_overlay)
+
+    def dump(self, path: Optional[str] = None) -> str:
+        if path is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(os.path.dirname(self.app.state_path), f"notTrello-trace-{stamp}.json")
+        data = {
+            "stats": self.summary(),
+            "widgets": self.widget_counts(),
+            "memory": self.memory(),
+            "traceEvents": [
+                {"name": name, "ph": "X", "pid": 0, "tid": 0,
+                 "ts": round((t0 - _START) * 1e6, 1), "dur": round(d * 1e6, 1)}
+                for name, t0, d in self.trace
+            ],
+        }
+        if self._tracemalloc:
+            import tracemalloc
+            top = tracemalloc.take_snapshot().statistics("lineno")[:20]
+            data["memory"]["top"] = [{"where": str(st.traceback), "kb": st.size // 1024} for st in top]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        log(f"instrumentation written to {path}")
+        return path
+
+def write_json_atomic(path: str, data: dict):
+    # Write to a temp file next to `path`, fsync, then rename over it, so a crash
+    # leaves either the old or the new file, never a truncated one
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+@contextmanager
+def file_lock(path: str):
+    # Exclusive lock shared with other processes, held on a small file next to the
+    # board (created on first use); waits until it is free. Not reentrant.
+    fh = open(path, "a+b")
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            fh.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after ~10 s; keep waiting
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    finally:
+        fh.close()
+
+def journal_record(ev: dict) -> Optional[dict]:
+    # The minimal fields BoardModel.apply needs to replay an event
+    op = ev["op"]
+    if op == "add":
+        rec = {"op": op, "id": ev["id"], "lane": ev["lane"], "index": ev["index"],
+               "title": ev["title"], "desc": ev["desc"]}
+    elif op == "remove":
+        return {"op": op, "id": ev["id"]}
+    elif op == "move":
+        return {"op": op, "id": ev["id"], "lane": ev["lane"], "index": ev["index"]}
+    elif op == "edit":
+        rec = {"op": op, "id": ev["id"], "title": ev["title"], "desc": ev["desc"]}
+    else:
+        return None
+    if ev.get("desc_ref"):
+        rec["desc_ref"] = ev["desc_ref"]
+    return rec
+
+def sync_line(msg: dict) -> bytes:
+    # One message of the sync protocol (see SyncServer)
+    return (json.dumps(msg, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def replay(model: "BoardModel", ops: List[dict]):
+    # Apply journal records written since a snapshot, skipping any that no longer fit
+    with model.batch():
+        for rec in ops:
+            try:
+                model.apply(rec)
+            except (KeyError, TypeError, ValueError):
+                pass
+
+def rebase(model: "BoardModel", events: List[dict]):
+    # Apply changes made to an older copy of the board, after another process's
+    # changes were merged into `model`. Cards added here may have been given ids
+    # the other process used too; those cards get new ids.
+    recs = [rec for rec in map(journal_record, events) if rec is not None]
+    renamed: Dict[int, int] = {}
+    fresh = model.next_id
+    for rec in recs:
+        if rec["op"] == "add" and rec["id"] in model.cards:
+            renamed[rec["id"]] = fresh
+            fresh += 1
+        rec["id"] = renamed.get(rec["id"], rec["id"])
+    replay(model, recs)
+
+class StaleBoard(Exception):
+    # Storage.append refused to write: another process changed the board since it
+    # was read. Nothing was written; merge those changes, then rebase `events`.
+    def __init__(self, events: List[dict]):
+        super().__init__("the board was changed by another process")
+        self.events = events
+
+class BlobStore:
+    # Content-addressed description bodies: one file per distinct text, named by
+    # its SHA-256 (ab/cdef...), so equal descriptions are stored once and a card
+    # only holds the ref "sha256:<hex>" (Card.ref). Refs and texts never share a
+    # field, so a description that happens to look like a ref stays text.
+    # put() only hashes and keeps the body in memory, so it is cheap on the Tk
+    # thread; flush() writes them (to a temp name, renamed, never fsynced, like
+    # the journal) and storage calls it before saving anything that holds refs.
+    # Refs held by undo steps are pinned so gc leaves their bodies.
+    # Used from the Tk thread and I/O threads; the LRU, pins and unwritten
+    # bodies have a lock.
+    PREFIX = "sha256:"
+    REF_LEN = len(PREFIX) + 64
+    STAMP = "last-gc"
+
+    def __init__(self, root: str, cache_bytes: int = BLOB_CACHE_BYTES):
+        self.root = root
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cached = 0
+        self._pins: Counter = Counter()
+        self._unwritten: Dict[str, str] = {}   # ref -> body put() but not flushed yet
+        self._lock = threading.Lock()
+
+    @classmethod
+    def is_ref(cls, value: str) -> bool:
+        return len(value) == cls.REF_LEN and value.startswith(cls.PREFIX)
+
+    def _path(self, ref: str) -> str:
+        digest = ref[len(self.PREFIX):]
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def has(self, ref: str) -> bool:
+        if not self.is_ref(ref):
+            return False
+        with self._lock:
+            if ref in self._unwritten:
+                return True
+        return os.path.exists(self._path(ref))
+
+    def put(self, text: str) -> Optional[str]:
+        # -> the ref for `text` (None for ""); the body is written by flush()
+        if not text:
+            return None
+        import hashlib
+        ref = self.PREFIX + hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._unwritten[ref] = text
+        self._remember(ref, text)
+        return ref
+
+    def pending(self) -> bool:
+        with self._lock:
+            return bool(self._unwritten)
+
+    def flush(self):
+        # Write the bodies put() since the last flush, skipping any already
+        # stored. Raises OSError with the rest still queued for the next flush.
+        with self._lock:
+            todo = list(self._unwritten.items())
+        for ref, text in todo:
+            path = self._path(ref)
+            if os.path.exists(path):
+                # Referenced again: young files are safe from gc
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(text.encode("utf-8"))
+                os.replace(tmp, path)
+            with self._lock:
+                self._unwritten.pop(ref, None)
+
+    def get(self, ref: str, cache: bool = True) -> str:
+        # The text for `ref`. Bulk readers (search, export, sync) pass cache=False
+        # so they don't push out what the user viewed recently. "" if not stored.
+        if not self.is_ref(ref):
+            return ""
+        with self._lock:
+            text = self._cache.get(ref)
+            if text is not None:
+                self._cache.move_to_end(ref)
+                return text
+            text = self._unwritten.get(ref)
+            if text is not None:
+                return text
+        try:
+            with open(self._path(ref), "rb") as f:
+                text = f.read().decode("utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            log(f"description {ref} is unreadable: {e}")
+            return ""
+        if cache:
+            self._remember(ref, text)
+        return text
+
+    def _remember(self, ref: str, text: str):
+        if len(text) > self.cache_bytes:
+            return
+        with self._lock:
+            if ref in self._cache:
+                self._cache.move_to_end(ref)
+                return
+            self._cache[ref] = text
+            self._cached += len(text)
+            while self._cached > self.cache_bytes:
+                _, old = self._cache.popitem(last=False)
+                self._cached -= len(old)
+
+    def pin(self, refs: Iterable[str]):
+        # Keep these bodies through gc until unpinned (as often as pinned)
+        with self._lock:
+            self._pins.update(r for r in refs if r)
+
+    def unpin(self, refs: Iterable[str]):
+        with self._lock:
+            pins = self._pins
+            for r in refs:
+                if r and pins[r] > 0:
+                    pins[r] -= 1
+                    if not pins[r]:
+                        del pins[r]
+
+    def gc_due(self) -> bool:
+        try:
+            return time.time() - os.path.getmtime(os.path.join(self.root, self.STAMP)) >= BLOB_GC_EVERY
+        except OSError:
+            return os.path.isdir(self.root)
+
+    def gc(self, live: Iterable[str], min_age: float = BLOB_GC_AGE) -> int:
+        # Delete bodies not in `live` (refs the board holds), not pinned by undo
+        # steps or waiting to be flushed, and older than `min_age`; the age covers changes other processes
+        # have not written yet. -> number of files deleted
+        with self._lock:
+            pinned = list(self._pins) + list(self._unwritten)
+        keep = {ref[len(self.PREFIX):] for ref in itertools.chain(live, pinned) if self.is_ref(ref)}
+        cutoff = time.time() - min_age
+        removed = 0
+        try:
+            shards = [e for e in os.scandir(self.root) if e.is_dir() and len(e.name) == 2]
+        except OSError:
+            return 0
+        for shard in shards:
+            try:
+                entries = list(os.scandir(shard.path))
+            except OSError:
+                continue
+            for e in entries:
+                if shard.name + e.name in keep:
+                    continue
+                try:
+                    if e.stat().st_mtime < cutoff:
+                        os.remove(e.path)
+                        removed += 1
+                except OSError:
+                    pass
+        try:
+            with open(os.path.join(self.root, self.STAMP), "w"):
+                pass
+        except OSError:
+            pass
+        return removed
+
+def inline_desc(rec: dict, blobs: Optional[BlobStore]) -> dict:
+    # A record or saved card with its description ref replaced by the text (in
+    # place), for readers outside this board's blob store (exports, sync peers)
+    ref = rec.pop("desc_ref", None)
+    if ref and blobs is not None and not rec.get("desc"):
+        rec["desc"] = blobs.get(ref, cache=False)
+    return rec
+
+def inline_descs(data: dict, blobs: Optional[BlobStore]) -> dict:
+    # inline_desc for every card of BoardModel.to_dict output
+    for items in list(data.get("columns", {}).values()) + [data.get("backlog", [])]:
+        for it in items:
+            inline_desc(it, blobs)
+    return data
+
+class Archive:
+    # Cards taken off a board, kept in <board>.archive/ next to its file. Each
+    # add() appends one gzip member to the month's segment (2026-10.jsonl.gz),
+    # a JSON line per card with its description text (the blob store drops bodies
+    # no card on the board uses), and a line per card to index.jsonl: id, lane,
+    # title, time, segment and the member's offset. Browsing reads the index only;
+    # restoring decompresses just the members it needs. Nothing is ever rewritten:
+    # a card archived again gets a newer index line, and cards that are back on
+    # the board (restored, or by undo) are skipped by readers, not erased.
+    # A lock file keeps windows and commands from interleaving appends.
+    INDEX = "index.jsonl"
+    MARKS = "complete.json"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def add(self, records: List[dict], now: Optional[float] = None):
+        # records: {"id", "lane", "title", "desc" (text)}. Written and fsynced
+        # before returning, so the cards can be removed; raises OSError otherwise.
+        import gzip
+        if not records:
+            return
+        now = time.time() if now is None else now
+        seg = time.strftime("%Y-%m", time.localtime(now)) + ".jsonl.gz"
+        at = round(now, 3)
+        body = "".join(json.dumps(dict(rec, at=at), ensure_ascii=False, separators=(",", ":")) + "\n"
+                       for rec in records)
+        member = gzip.compress(body.encode("utf-8"))
+        os.makedirs(self.root, exist_ok=True)
+        with file_lock(os.path.join(self.root, "lock")):
+            with open(os.path.join(self.root, seg), "ab") as f:
+                f.seek(0, os.SEEK_END)
+                off = f.tell()
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+            index = "".join(json.dumps({"id": rec["id"], "lane": rec["lane"], "title": rec["title"],
+                                        "at": at, "seg": seg, "off": off},
+                                       ensure_ascii=False, separators=(",", ":")) + "\n"
+                            for rec in records)
+            with open(os.path.join(self.root, self.INDEX), "a", encoding="utf-8") as f:
+                f.write(index)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def entries(self) -> List[dict]:
+        # Index entries, newest first, the latest one per card id
+        latest: Dict[int, dict] = {}
+        try:
+            with open(os.path.join(self.root, self.INDEX), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a torn last line from a crash mid-append
+                    if isinstance(entry, dict) and isinstance(entry.get("id"), int):
+                        latest[entry["id"]] = entry
+        except FileNotFoundError:
+            return []
+        return sorted(latest.values(), key=lambda e: e.get("at", 0), reverse=True)
+
+    def fetch(self, entries: List[dict]) -> List[dict]:
+        # The archived records behind index entries, in the same order (missing
+        # ones left out); raises OSError or EOFError for damaged segments
+        import gzip
+        wanted: Dict[tuple, set] = {}
+        for e in entries:
+            wanted.setdefault((e["seg"], e["off"]), set()).add(e["id"])
+        found: Dict[tuple, dict] = {}
+        for (seg, off), ids in wanted.items():
+            with open(os.path.join(self.root, os.path.basename(seg)), "rb") as f:
+                f.seek(off)
+                # Reads on into later members only if the card is not in this one
+                with gzip.GzipFile(fileobj=f) as gz:
+                    for line in gz:
+                        rec = json.loads(line)
+                        if rec.get("id") in ids:
+                            found[(seg, off, rec["id"])] = rec
+                            ids.discard(rec["id"])
+                            if not ids:
+                                break
+        return [found[key] for key in ((e["seg"], e["off"], e["id"]) for e in entries) if key in found]
+
+    def load_marks(self) -> Dict[int, float]:
+        # When each card now in Complete got there (see OpenBoard.aged)
+        try:
+            with open(os.path.join(self.root, self.MARKS), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {int(k): float(v) for k, v in data.items()}
+        except (OSError, ValueError, TypeError, AttributeError):
+            return {}
+
+    def save_marks(self, marks: Dict[int, float]):
+        os.makedirs(self.root, exist_ok=True)
+        write_json_atomic(os.path.join(self.root, self.MARKS), {str(k): v for k, v in marks.items()})
+
+def _numpy():
+    # NumPy if installed, else None; imported on first use, not at startup
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def _gather(seq, indexes):
+    # [seq[i] for i in indexes], in C
+    if len(indexes) > 1:
+        return operator.itemgetter(*indexes)(seq)
+    return [seq[i] for i in indexes]
+
+def percentiles(values, ps: List[float]) -> List[Optional[float]]:
+    # Nearest-rank percentiles of a sequence of numbers (None when empty)
+    n = len(values)
+    if not n:
+        return [None] * len(ps)
+    np = _numpy()
+    if np is not None:
+        arr = np.frombuffer(values, dtype=np.float64) if isinstance(values, array) else np.asarray(values, dtype=float)
+        return [float(v) for v in np.percentile(arr, ps, method="inverted_cdf")]
+    ordered = sorted(values)
+    return [ordered[min(n - 1, max(0, int(-(-p * n // 100)) - 1))] for p in ps]
+
+def format_span(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+class TransitionLog:
+    # Every change of column of a board's cards, in <board>.flow next to its file.
+    # The file is a run of blocks, one per model notification, each stored column
+    # by column: a record count, then the times (float64), card ids (uint32),
+    # from-lanes and to-lanes (int8 indexes into LANES; NONE where a card was
+    # created or deleted), little-endian. Reading is one frombytes per column and
+    # block into array-backed columns, with no per-record parsing. A block is a
+    # few dozen bytes per record. record() runs on the Tk thread and only buffers
+    # blocks; flush() writes them (from the save worker, like board saves) with a
+    # single O_APPEND write, so windows sharing the board never interleave
+    # within a block.
+    NONE = -1
+    HEADER = 4
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lane_codes = {name: i for i, name in enumerate(LANES)}
+        self._listeners: List[Callable] = []
+        self._buffer: List[tuple] = []   # blocks recorded but not written yet
+        self._lock = threading.Lock()    # held while blocks move from the buffer to the file
+
+    def subscribe(self, fn: Callable):
+        # fn(times, ids, src, dst) for every block recorded from now on
+        self._listeners.append(fn)
+
+    def unsubscribe(self, fn: Callable):
+        try:
+            self._listeners.remove(fn)
+        except ValueError:
+            pass
+
+    def record(self, events: List[dict], now: Optional[float] = None):
+        codes = self.lane_codes
+        none = self.NONE
+        ids = array("I")
+        src = array("b")
+        dst = array("b")
+        for ev in events:
+            op = ev["op"]
+            if op == "add":
+                ids.append(ev["id"]); src.append(none); dst.append(codes.get(ev["lane"], none))
+            elif op == "move" and ev["lane"] != ev["from_lane"]:
+                ids.append(ev["id"]); src.append(codes.get(ev["from_lane"], none)); dst.append(codes.get(ev["lane"], none))
+            elif op == "remove":
+                ids.append(ev["id"]); src.append(codes.get(ev["lane"], none)); dst.append(none)
+        if not ids:
+            return
+        times = array("d", [time.time() if now is None else now]) * len(ids)
+        block = (times, ids, src, dst)
+        with self._lock:
+            self._buffer.append(block)
+        for fn in list(self._listeners):
+            fn(*block)
+
+    def flush(self):
+        # Write the buffered blocks; any thread. Blocks that cannot be written
+        # are dropped (the history is a best-effort record)
+        with self._lock:
+            blocks, self._buffer = self._buffer, []
+            if not blocks:
+                return
+            try:
+                self._write(blocks)
+            except OSError as e:
+                log(f"could not record column changes: {e}")
+
+    def tail(self) -> tuple:
+        # (bytes in the file, blocks not written yet) at one instant: reading the
+        # first and adding the second sees every block exactly once
+        with self._lock:
+            return self.size(), list(self._buffer)
+
+    def _write(self, blocks: List[tuple]):
+        data = []
+        for block in blocks:
+            cols = list(block)
+            if sys.byteorder != "little":
+                cols = [array(c.typecode, c) for c in cols]
+                for c in cols:
+                    c.byteswap()
+            data.append(len(block[1]).to_bytes(self.HEADER, "little"))
+            data.extend(c.tobytes() for c in cols)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            os.write(fd, b"".join(data))
+        finally:
+            os.close(fd)
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def read(self, limit: Optional[int] = None):
+        # -> (times, ids, src, dst) arrays of every complete block in the first
+        # `limit` bytes (all of the file by default); a torn last block is ignored
+        times, ids, src, dst = array("d"), array("I"), array("b"), array("b")
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read() if limit is None else f.read(limit)
+        except FileNotFoundError:
+            data = b""
+        pos = 0
+        end = len(data)
+        width = 8 + 4 + 1 + 1
+        while pos + self.HEADER <= end:
+            n = int.from_bytes(data[pos:pos + self.HEADER], "little")
+            start = pos + self.HEADER
+            if start + n * width > end:
+                break
+            for col, size in ((times, 8), (ids, 4), (src, 1), (dst, 1)):
+                col.frombytes(data[start:start + n * size])
+                start += n * size
+            pos = start
+        if sys.byteorder != "little":
+            for col in (times, ids):
+                col.byteswap()
+        return times, ids, src, dst
+
+class FlowStats:
+    # What the Analytics tab shows, aggregated from a TransitionLog: arrivals and
+    # departures per lane and day, the time spent in a lane per visit, and per
+    # card when it was created, first started (FLOW_START_LANE) and last finished
+    # (DONE_LANE). bulk() builds it from the whole log column-wise, with NumPy
+    # when installed; add_block() then keeps it current as blocks come.
+    # Days are local calendar days, numbered from 1970-01-01, each timestamp
+    # bucketed with the UTC offset in effect at that moment (DST changes apply).
+    GMTOFF_STEP = 900   # offsets change on quarter hours (UTC) in every zone in use
+
+    def __init__(self, lanes: List[str] = LANES):
+        self.lanes = list(lanes)
+        self.start = self.lanes.index(FLOW_START_LANE)
+        self.done = self.lanes.index(DONE_LANE)
+        self._slot = None                          # quarter hour of the last offset looked up
+        self._gmtoff = 0
+        self.records = 0
+        self.arrive: Dict[int, List[int]] = {}     # day -> arrivals per lane
+        self.leave: Dict[int, List[int]] = {}      # day -> departures per lane
+        self.durations = [array("d") for _ in self.lanes]   # seconds per visit, per lane...
+        self.ended = [array("d") for _ in self.lanes]       # ...and when each visit ended
+        self.entered: Dict[int, tuple] = {}        # card -> (lane, time) of its open visit
+        self.created: Dict[int, float] = {}
+        self.started: Dict[int, float] = {}
+        self.finished: Dict[int, float] = {}
+
+    def _offset(self, t: float) -> int:
+        # UTC offset at `t`; records come in time order, so one lookup is reused
+        slot = int(t // self.GMTOFF_STEP)
+        if slot != self._slot:
+            self._slot = slot
+            self._gmtoff = time.localtime(slot * self.GMTOFF_STEP).tm_gmtoff
+        return self._gmtoff
+
+    def day(self, t: float) -> int:
+        return int((t + self._offset(t)) // 86400)
+
+    @staticmethod
+    def day_start(day: int) -> float:
+        # The timestamp of local midnight starting `day`
+        return time.mktime(time.gmtime(day * 86400)[:8] + (-1,))
+
+    def add_block(self, times, ids, src, dst):
+        # Records in time order (a TransitionLog block)
+        nl = len(self.lanes)
+        day_of = self.day
+        arrive, leave, durations, ended = self.arrive, self.leave, self.durations, self.ended
+        entered, created, started, finished = self.entered, self.created, self.started, self.finished
+        start, done = self.start, self.done
+        for t, cid, s, d in zip(times, ids, src, dst):
+            day = day_of(t)
+            if d >= 0:
+                counts = arrive.get(day)
+                if counts is None:
+                    counts = arrive[day] = [0] * nl
+                counts[d] += 1
+            if s >= 0:
+                counts = leave.get(day)
+                if counts is None:
+                    counts = leave[day] = [0] * nl
+                counts[s] += 1
+            elif cid not in created:
+                created[cid] = t
+            visit = entered.pop(cid, None)
+            if visit is not None and visit[0] == s:
+                durations[s].append(t - visit[1])
+                ended[s].append(t)
+            if d >= 0:
+                entered[cid] = (d, t)
+                if d == start:
+                    if cid not in started:
+                        started[cid] = t
+                elif d == done:
+                    finished[cid] = t
+        self.records += len(times)
+
+    def bulk(self, times: array, ids: array, src: array, dst: array, progress: Optional[Callable] = None):
+        # The whole log into an empty FlowStats
+        if not len(times):
+            return
+        np = _numpy()
+        if np is None:
+            self._bulk_columns(times, ids, src, dst, progress)
+            return
+        nl = len(self.lanes)
+        t = np.frombuffer(times, dtype=np.float64)
+        cid = np.frombuffer(ids, dtype=np.uint32).astype(np.int64)
+        s = np.frombuffer(src, dtype=np.int8).astype(np.int64)
+        d = np.frombuffer(dst, dtype=np.int8).astype(np.int64)
+        self.records = len(t)
+
+        # Arrivals and departures per (day, lane), with the offset looked up once
+        # per quarter hour that has records
+        slots, at = np.unique((t // self.GMTOFF_STEP).astype(np.int64), return_inverse=True)
+        gmtoff = np.array([time.localtime(int(q) * self.GMTOFF_STEP).tm_gmtoff for q in slots], dtype=np.float64)
+        day = ((t + gmtoff[at]) // 86400).astype(np.int64)
+        first = int(day.min())
+        ndays = int(day.max()) - first + 1
+        rel = day - first
+        for lanes, out in ((d, self.arrive), (s, self.leave)):
+            ok = lanes >= 0
+            grid = np.bincount(rel[ok] * nl + lanes[ok], minlength=ndays * nl).reshape(ndays, nl)
+            for i in np.flatnonzero(grid.any(axis=1)):
+                out[first + int(i)] = grid[i].tolist()
+
+        # Per card, in time order: consecutive records pair up into visits
+        order = np.lexsort((t, cid))
+        t, cid, s, d = t[order], cid[order], s[order], d[order]
+        same = cid[1:] == cid[:-1]
+        visit = same & (d[:-1] >= 0) & (s[1:] == d[:-1])
+        spent = (t[1:] - t[:-1])[visit]
+        until = t[1:][visit]
+        where = d[:-1][visit]
+        for lane in range(nl):
+            self.durations[lane].frombytes(spent[where == lane].tobytes())
+            self.ended[lane].frombytes(until[where == lane].tobytes())
+        last = np.ones(len(t), dtype=bool)
+        last[:-1] = ~same
+        open_ = last & (d >= 0)
+        self.entered = dict(zip(cid[open_].tolist(), zip(d[open_].tolist(), t[open_].tolist())))
+
+        def first_time(mask, newest=False):
+            ids_m, t_m = cid[mask], t[mask]
+            if newest:
+                ids_m, t_m = ids_m[::-1], t_m[::-1]
+            keys, at = np.unique(ids_m, return_index=True)
+            return dict(zip(keys.tolist(), t_m[at].tolist()))
+        self.created = first_time(s < 0)
+        self.started = first_time(d == self.start)
+        self.finished = first_time(d == self.done, newest=True)
+
+    def _bulk_columns(self, times, ids, src, dst, progress):
+        # bulk() without NumPy. One Python-level pass links each record to the
+        # card's previous one; everything else runs over whole columns in C
+        # (bytes.count per day, translate masks and compress per lane, dict(zip)).
+        n = len(times)
+        report = progress if progress is not None else (lambda i, n: None)
+        if not all(map(operator.le, times, itertools.islice(times, 1, None))):
+            # Blocks from several windows may interleave; order by time, keeping
+            # each card's records in log order, as the NumPy path does
+            order = sorted(range(n), key=times.__getitem__)
+            times, ids, src, dst = (array(col.typecode, map(col.__getitem__, order)) for col in (times, ids, src, dst))
+        report(0, n)
+        nl = len(self.lanes)
+        src_b, dst_b = src.tobytes(), dst.tobytes()
+        self.records = n
+
+        # Arrivals and departures per day: records are in time order, so each
+        # day is a slice, found by bisecting at local midnight
+        day_of = self.day
+        i = 0
+        while i < n:
+            day = day_of(times[i])
+            j = bisect_left(times, self.day_start(day + 1), i + 1)
+            while j > i + 1 and day_of(times[j - 1]) != day:
+                j -= 1
+            while j < n and day_of(times[j]) == day:
+                j += 1
+            for lanes_b, out in ((dst_b, self.arrive), (src_b, self.leave)):
+                counts = [lanes_b.count(lane, i, j) for lane in range(nl)]
+                if any(counts):
+                    have = out.get(day)
+                    out[day] = counts if have is None else [a + b for a, b in zip(have, counts)]
+            i = j
+        report(n // 4, n)
+
+        # prev[k]: 1 + the index of the same card's record before k (0 if none),
+        # so it indexes columns that have a sentinel in front
+        top = max(ids)
+        last = array("l", [0]) * (top + 1) if top < 4 * n + 65536 else defaultdict(int)
+        prev = [p for c, k in zip(ids, range(1, n + 1)) for p in (last[c],) for last[c] in (k,)]
+        report(n // 2, n)
+        t_pre = array("d", [0.0]) + times
+        d_pre = b"\xff" + dst_b
+
+        # A visit ends where a record leaves the lane the card's previous record
+        # entered; take all of them out first, then split them by lane
+        stayed = bytes(map(operator.eq, src_b, _gather(d_pre, prev)))
+        left = src_b.translate(bytes(b < 0x80 for b in range(256)))
+        mask = (int.from_bytes(stayed, "little") & int.from_bytes(left, "little")).to_bytes(n, "little")
+        until = list(itertools.compress(times, mask))
+        spent = list(map(operator.sub, until, _gather(t_pre, list(itertools.compress(prev, mask)))))
+        where = bytes(itertools.compress(src_b, mask))
+        for lane in range(nl):
+            in_lane = where.translate(bytes(b == lane for b in range(256)))
+            self.durations[lane].extend(itertools.compress(spent, in_lane))
+            self.ended[lane].extend(itertools.compress(until, in_lane))
+        # Big lists slow down every garbage collection the dicts below set off
+        del prev, until, spent
+        report(3 * n // 4, n)
+
+        # Each card's last record leaves it in its open visit, if it has one
+        ends = list(filter(None, last.values() if isinstance(last, dict) else last))
+        lanes = bytes(_gather(d_pre, ends))
+        ends = list(itertools.compress(ends, lanes.translate(bytes(b < 0x80 for b in range(256)))))
+        id_pre = array(ids.typecode, [0]) + ids
+        self.entered = dict(zip(_gather(id_pre, ends), zip(_gather(d_pre, ends), _gather(t_pre, ends))))
+
+        # When each card was first created and started, and last finished:
+        # the records of all three are taken out at once, then told apart
+        masks = [lanes_b.translate(bytes(b == lane & 0xFF for b in range(256)))
+                 for lanes_b, lane in ((src_b, -1), (dst_b, self.start), (dst_b, self.done))]
+        either = functools.reduce(operator.or_, (int.from_bytes(m, "little") for m in masks)).to_bytes(n, "little")
+        ids_m = list(itertools.compress(ids, either))
+        t_m = list(itertools.compress(times, either))
+
+        def first_time(mask, newest=False):
+            mask = bytes(itertools.compress(mask, either))
+            if newest:
+                return dict(zip(itertools.compress(ids_m, mask), itertools.compress(t_m, mask)))
+            return dict(zip(reversed(list(itertools.compress(ids_m, mask))), reversed(list(itertools.compress(t_m, mask)))))
+        self.created = first_time(masks[0])
+        self.started = first_time(masks[1])
+        self.finished = first_time(masks[2], newest=True)
+
+    def visits(self, lane: int, since: Optional[float] = None):
+        # Seconds spent per visit to `lane`, for visits that ended at or after `since`
+        spent = self.durations[lane]
+        if since is None:
+            return spent
+        np = _numpy()
+        if np is not None and len(spent):
+            mask = np.frombuffer(self.ended[lane], dtype=np.float64) >= since
+            return np.frombuffer(spent, dtype=np.float64)[mask]
+        return [d for d, t in zip(spent, self.ended[lane]) if t >= since]
+
+    def cycle_times(self, since: Optional[float] = None) -> List[float]:
+        # First start to last finish, for cards finished at or after `since`
+        return self._spans(self.started, since)
+
+    def lead_times(self, since: Optional[float] = None) -> List[float]:
+        return self._spans(self.created, since)
+
+    def _spans(self, begun: Dict[int, float], since: Optional[float]) -> List[float]:
+        since = float("-inf") if since is None else since
+        return [t - begun[cid] for cid, t in self.finished.items()
+                if t >= since and cid in begun and t > begun[cid]]
+
+    def series(self, days: List[int], current: List[int]):
+        # -> (cumulative arrivals per lane, cards in each lane) at the end of each
+        # of `days` (ascending). Lane counts are taken back from the `current`
+        # ones, so cards from before the log started are counted too.
+        nl = len(self.lanes)
+        if not days:
+            return [], []
+        zero = [0] * nl
+        first = days[0]
+        cum = [0] * nl
+        for day, counts in self.arrive.items():
+            if day < first:
+                cum = [a + b for a, b in zip(cum, counts)]
+        arrived = []
+        for day in days:
+            cum = [a + b for a, b in zip(cum, self.arrive.get(day, zero))]
+            arrived.append(cum)
+        held = list(current)
+        for day, counts in self.arrive.items():
+            if day > days[-1]:
+                held = [h - c for h, c in zip(held, counts)]
+        for day, counts in self.leave.items():
+            if day > days[-1]:
+                held = [h + c for h, c in zip(held, counts)]
+        wip = []
+        for day in reversed(days):
+            wip.append([max(0, h) for h in held])
+            arr = self.arrive.get(day, zero)
+            dep = self.leave.get(day, zero)
+            held = [h - a + b for h, a, b in zip(held, arr, dep)]
+        wip.reverse()
+        return arrived, wip
+
+def read_flow_stats(progress: Callable, path: str, limit: int) -> FlowStats:
+    # Job for the process pool (see JobRunner)
+    stats = FlowStats()
+    stats.bulk(*TransitionLog(path).read(limit), progress=progress)
+    return stats
+
+class Storage(ABC):
+    # Where a board is persisted. Implementations exchange data in the JSON layout
+    # of BoardModel.to_dict, so the model never knows which backend is in use.
+    #   load()   -> (snapshot dict, events recorded after it that must be replayed)
+    #   append() records model events incrementally (when `incremental`); raises
+    #            StaleBoard instead if another process wrote since our last read
+    #   save()   writes a full snapshot
+    #   changed_externally() -> True once per change another process made since
+    #            this object last read or wrote the board
+    # With `blobs` set (see BlobStore), saved cards hold the ref in "desc_ref" and
+    # no text; "desc" is only filled for a card whose body could not be stored.
+    name = ""
+    incremental = False        # append() persists events; otherwise save() is needed
+    snapshot_on_close = True   # write a full snapshot when the app closes
+    blobs: Optional[BlobStore] = None
+
+    @abstractmethod
+    def exists(self) -> bool:
+        pass
+
+    @abstractmethod
+    def load(self):
+        pass
+
+    def load_parsed(self, lane_names: Iterable[str]):
+        # load() normalized by BoardModel.parse_state
+        #   -> (lanes, next_id, restored_any, events to replay)
+        data, ops = self.load()
+        lanes, next_id, restored = BoardModel.parse_state(data, lane_names)
+        return lanes, next_id, restored, ops
+
+    @abstractmethod
+    def append(self, events: List[dict]):
+        pass
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    @abstractmethod
+    def save(self, data: dict):
+        pass
+
+    def changed_externally(self) -> bool:
+        return False
+
+    def close(self):
+        pass
+
+class JsonStorage(Storage):
+    # The board_state.json snapshot, optionally with an append-only journal of
+    # operations next to it (one JSON object per line, each tagged with a sequence
+    # number). The snapshot records the last sequence number it includes, so replay
+    # skips journal lines it already covers even if a crash happened between
+    # writing the snapshot and trimming the journal.
+    #
+    # Every snapshot written is also kept parsed in a marshal file (.cache), keyed
+    # by the snapshot's mtime and size, so startup can skip json.load and
+    # parse_state when the snapshot has not changed since. The cache holds
+    # description refs only; the snapshot and journal also carry the texts.
+    #
+    # Reads and writes hold a lock file (.lock) shared with other processes on the
+    # same board, so none of them sees half a compaction. The files' mtime and size
+    # are remembered after each of our own reads and writes; any other change to
+    # them was made elsewhere (changed_externally).
+    name = "json"
+    CACHE_VERSION = 2
+
+    def __init__(self, snapshot_path: str, journal: bool = True):
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + ".journal"
+        self.cache_path = os.path.splitext(snapshot_path)[0] + ".cache"
+        self.lock_path = os.path.splitext(snapshot_path)[0] + ".lock"
+        self.blobs = BlobStore(os.path.splitext(snapshot_path)[0] + ".blobs")
+        self.cache_hit: Optional[bool] = None  # outcome of the last load_parsed
+        self.incremental = journal
+        self.seq = 0
+        self._lock = threading.RLock()
+        self._held = False  # the lock file is held (by the thread holding _lock)
+        self._bytes = 0
+        self._oldest = None
+        self._known = self._signature()
+
+    @contextmanager
+    def _locked(self):
+        # This process's threads first, then other processes; nested use is fine
+        with self._lock:
+            if self._held:
+                yield
+                return
+            with file_lock(self.lock_path):
+                self._held = True
+                try:
+                    yield
+                finally:
+                    self._held = False
+
+    def _signature(self):
+        # (mtime_ns, size) of the snapshot and of the journal, None where missing
+        sig = []
+        for path in (self.snapshot_path, self.journal_path):
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+
+    def changed_externally(self) -> bool:
+        # The save worker writes and then updates _known under the lock; while it
+        # holds it, look again next time rather than wait on the Tk thread
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            return self._signature() != self._known
+        finally:
+            self._lock.release()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.snapshot_path) or (self.incremental and os.path.exists(self.journal_path))
+
+    def load(self):
+        with self._locked():
+            self._known = self._signature()
+            data = {}
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    data = {}
+            base = data.get("seq", 0) if isinstance(data.get("seq"), int) else 0
+            return data, self._read_journal(base)
+
+    def _read_journal(self, base: int) -> List[dict]:
+        # Journal records newer than the snapshot's sequence number `base`
+        self.seq = base
+        ops = []
+        if self.incremental and os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-append
+                        break
+                    seq = rec.get("seq", 0)
+                    if seq > base:
+                        ops.append(rec)
+                        self.seq = max(self.seq, seq)
+            self._bytes = os.path.getsize(self.journal_path)
+            self._oldest = time.time() if ops else None
+        return ops
+
+    def load_parsed(self, lane_names: Iterable[str]):
+        lane_names = list(lane_names)
+        with self._locked():
+            self._known = self._signature()
+            cached = self._read_cache(lane_names)
+            self.cache_hit = cached is not None
+            if cached is not None:
+                seq, lanes, next_id, restored = cached
+                return lanes, next_id, restored, self._read_journal(seq)
+            # Miss: parse as usual; the next snapshot written (save) refreshes the cache
+            return Storage.load_parsed(self, lane_names)
+
+    def _cache_key(self, lane_names: List[str]):
+        try:
+            st = os.stat(self.snapshot_path)
+        except OSError:
+            return None
+        return (self.CACHE_VERSION, marshal.version, tuple(sys.version_info[:2]),
+                st.st_mtime_ns, st.st_size, tuple(lane_names))
+
+    def _read_cache(self, lane_names: List[str]):
+        # (seq, lanes, next_id, restored_any) if the cache matches the snapshot
+        key = self._cache_key(lane_names)
+        if key is None or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "rb") as f:
+                # A length-prefixed key comes first, so a stale cache is rejected
+                # without reading the rest
+                size = int.from_bytes(f.read(4), "little")
+                if marshal.loads(f.read(size)) != key:
+                    return None
+                seq, lanes, next_id, restored = marshal.loads(f.read())
+            return seq, lanes, next_id, restored
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
 
-# Scrolling behavior
-NATURAL_SCROLL = True  # If True, content moves in the same direction as wheel/gesture
+    def _write_cache(self, lane_names: List[str], seq: int, lanes: Dict[str, list], next_id: int, restored: bool):
+        # Best effort: a missing or broken cache only means a slower start
+        key = self._cache_key(lane_names)
+        if key is None:
+            return
+        tmp = self.cache_path + ".tmp"
+        try:
+            head = marshal.dumps(key)
+            with open(tmp, "wb") as f:
+                f.write(len(head).to_bytes(4, "little"))
+                f.write(head)
+                f.write(marshal.dumps((seq, lanes, next_id, restored)))
+            os.replace(tmp, self.cache_path)
+        except (OSError, ValueError):
+            pass
+
+    def append(self, events: List[dict]):
+        recs = [rec for rec in map(journal_record, events) if rec is not None]
+        if not recs:
+            return
+        # Bodies first: a record never refers to one that is not on disk
+        self.blobs.flush()
+        with self._locked():
+            if self._signature() != self._known:
+                raise StaleBoard(events)
+            lines = []
+            for rec in recs:
+                self.seq += 1
+                rec["seq"] = self.seq
+                lines.append(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+            chunk = "\n".join(lines) + "\n"
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(chunk)
+            self._bytes += len(chunk)
+            self._known = self._signature()
+        if self._oldest is None:
+            self._oldest = time.time()
+
+    def needs_compaction(self) -> bool:
+        if not self.incremental:
+            return False
+        if self._bytes >= JOURNAL_MAX_BYTES:
+            return True
+        return self._oldest is not None and time.time() - self._oldest >= JOURNAL_MAX_AGE
+
+    def save(self, data: dict):
+        # `data` must be a snapshot taken on the Tk thread (BoardModel.to_dict).
+        # With a journal this is the compaction step: snapshot, then trim.
+        with self._locked():
+            if self.incremental and self._signature() != self._known:
+                # Another process changed the board since we read it. Compacting now
+                # would overwrite that; the journal already holds all of ours, so
+                # wait until the change has been merged (App.sync_external).
+                return
+            data["seq"] = self.seq
+            self._oldest = None
+            lanes, next_id, restored = BoardModel.parse_state(data, LANES)
+            self.blobs.flush()
+            write_json_atomic(self.snapshot_path, data)
+            live = set()
+            if self.incremental:
+                live = self._trim(data["seq"])
+            self._known = self._signature()
+            self._write_cache(LANES, data["seq"], lanes, next_id, restored)
+        if self.blobs.gc_due():
+            for items in lanes.values():
+                live.update(ref for _, _, _, ref in items if ref)
+            self.blobs.gc(live)
+
+    def _trim(self, upto: int) -> set:
+        # Drop journal lines the snapshot now covers; appends wait on the lock.
+        # -> the description refs in the lines kept
+        with self._locked():
+            keep = []
+            live = set()
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                        except ValueError:
+                            break
+                        if rec.get("seq", 0) > upto:
+                            keep.append(line)
+                            if rec.get("desc_ref"):
+                                live.add(rec["desc_ref"])
+            if keep:
+                tmp = self.journal_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(keep)
+                os.replace(tmp, self.journal_path)
+            elif os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._bytes = sum(len(line) for line in keep)
+            return live
+
+class SqliteStorage(Storage):
+    # One row per card (backlog items are rows in the "Backlog" lane) with its own
+    # float order key, indexed on (lane, pos). Each batch of model events becomes
+    # a handful of row updates inside one transaction; WAL keeps readers unblocked.
+    # Order keys are derived here from the lane indexes carried by the events.
+    # SQLite does its own locking between processes; PRAGMA data_version tells
+    # commits made by other connections apart from ours.
+    name = "sqlite"
+    incremental = True
+    snapshot_on_close = False
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS columns (name TEXT PRIMARY KEY, ord INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS cards (
+            id INTEGER PRIMARY KEY,
+            lane TEXT NOT NULL,
+            pos REAL NOT NULL,
+            title TEXT NOT NULL,
+            desc TEXT NOT NULL DEFAULT '',
+            desc_ref TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS cards_lane_pos ON cards (lane, pos);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.blobs = BlobStore(os.path.splitext(path)[0] + ".blobs")
+        self._conn = None
+        self._lock = threading.Lock()  # the save worker and the watcher share the connection
+        self._version = None           # data_version as of our last load
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def changed_externally(self) -> bool:
+        if self._conn is None or self._version is None:
+            return False
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0] != self._version
+
+    def _db(self):
+        if self._conn is None:
+            import sqlite3
+            # Used from the Tk thread and the save worker, under self._lock
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+            if "desc_ref" not in [r[1] for r in self._conn.execute("PRAGMA table_info(cards)")]:
+                # Created before descriptions got a ref column
+                with self._conn:
+                    self._conn.execute("ALTER TABLE cards ADD COLUMN desc_ref TEXT NOT NULL DEFAULT ''")
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO columns (name, ord) VALUES (?, ?)",
+                    [(title, i) for i, (title, _) in enumerate(COLUMNS)] + [(BACKLOG, len(COLUMNS))],
+                )
+        return self._conn
+
+    def load(self):
+        db = self._db()
+        lanes: Dict[str, list] = {}
+        with self._lock:
+            # Read first: a commit landing mid-read shows up as a change next time
+            self._version = db.execute("PRAGMA data_version").fetchone()[0]
+            # Rows saved before descriptions moved to the blob store have the text
+            # in desc; the model stores those bodies as it loads them
+            for cid, lane, title, desc, ref in db.execute(
+                    "SELECT id, lane, title, desc, desc_ref FROM cards ORDER BY lane, pos, id"):
+                if ref:
+                    lanes.setdefault(lane, []).append({"id": cid, "title": title, "desc": desc, "desc_ref": ref})
+                else:
+                    lanes.setdefault(lane, []).append({"id": cid, "title": title, "desc": desc})
+            row = db.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        data = {
+            "columns": {name: items for name, items in lanes.items() if name != BACKLOG},
+            "backlog": lanes.get(BACKLOG, []),
+        }
+        if row is not None:
+            data["next_id"] = int(row[0])
+        return data, []
+
+    def append(self, events: List[dict]):
+        db = self._db()
+        next_id = None
+        counts: Dict[str, int] = {}  # lane sizes, tracked while this transaction runs
+        # Bodies first: a row never refers to one that is not on disk
+        self.blobs.flush()
+        with self._lock, db:
+            # Take the write lock first, so no other process commits between the
+            # check and our writes
+            db.execute("BEGIN IMMEDIATE")
+            if self._version is not None and db.execute("PRAGMA data_version").fetchone()[0] != self._version:
+                raise StaleBoard(events)
+            for ev in events:
+                op = ev["op"]
+                if op == "add":
+                    lane = ev["lane"]
+                    pos = self._key_at(db, lane, ev["index"], None, counts)
+                    ref = ev.get("desc_ref", "")
+                    db.execute("INSERT OR REPLACE INTO cards (id, lane, pos, title, desc, desc_ref) VALUES (?, ?, ?, ?, ?, ?)",
+                               (ev["id"], lane, pos, ev["title"], ev["desc"], ref))
+                    if lane in counts:
+                        counts[lane] += 1
+                    next_id = max(next_id or 0, ev["id"] + 1)
+                elif op == "remove":
+                    db.execute("DELETE FROM cards WHERE id = ?", (ev["id"],))
+                    counts.clear()
+                elif op == "move":
+                    pos = self._key_at(db, ev["lane"], ev["index"], ev["id"])
+                    db.execute("UPDATE cards SET lane = ?, pos = ? WHERE id = ?", (ev["lane"], pos, ev["id"]))
+                    counts.clear()
+                elif op == "edit":
+                    ref = ev.get("desc_ref", "")
+                    db.execute("UPDATE cards SET title = ?, desc = ?, desc_ref = ? WHERE id = ?",
+                               (ev["title"], ev["desc"], ref, ev["id"]))
+            if next_id is not None:
+                db.execute("INSERT INTO meta (key, value) VALUES ('next_id', ?) "
+                           "ON CONFLICT(key) DO UPDATE SET value = MAX(CAST(value AS INTEGER), excluded.value)",
+                           (str(next_id),))
+        if self.blobs.gc_due():
+            with self._lock:
+                live = [row[0] for row in db.execute("SELECT DISTINCT desc_ref FROM cards WHERE desc_ref != ''")]
+            self.blobs.gc(live)
+
+    def _key_at(self, db, lane: str, index: Optional[int], exclude: Optional[int],
+                counts: Optional[Dict[str, int]] = None) -> float:
+        # Order key placing a row at `index` among the lane's other rows. With
+        # `counts` (lane sizes known to the caller) appends skip the OFFSET scan.
+        exclude = -1 if exclude is None else exclude
+        if index is None:
+            index = 1 << 62
+        if counts is not None and exclude == -1:
+            if lane not in counts:
+                counts[lane] = db.execute("SELECT COUNT(*) FROM cards WHERE lane = ?", (lane,)).fetchone()[0]
+            if index >= counts[lane]:
+                row = db.execute("SELECT MAX(pos) FROM cards WHERE lane = ?", (lane,)).fetchone()
+                return row[0] + 1.0 if row[0] is not None else 0.0
+        for _ in range(2):
+            if index <= 0:
+                row = db.execute("SELECT MIN(pos) FROM cards WHERE lane = ? AND id != ?", (lane, exclude)).fetchone()
+                return row[0] - 1.0 if row[0] is not None else 0.0
+            rows = db.execute(
+                "SELECT pos FROM cards WHERE lane = ? AND id != ? ORDER BY pos, id LIMIT 2 OFFSET ?",
+                (lane, exclude, index - 1),
+            ).fetchall()
+            if not rows:
+                row = db.execute("SELECT MAX(pos) FROM cards WHERE lane = ? AND id != ?", (lane, exclude)).fetchone()
+                return row[0] + 1.0 if row[0] is not None else 0.0
+            if len(rows) == 1:
+                return rows[0][0] + 1.0
+            lo, hi = rows[0][0], rows[1][0]
+            mid = (lo + hi) / 2.0
+            if lo < mid < hi:
+                return mid
+            self._renumber(db, lane)
+        return float(index)
+
+    def _renumber(self, db, lane: str):
+        ids = [r[0] for r in db.execute("SELECT id FROM cards WHERE lane = ? ORDER BY pos, id", (lane,))]
+        db.executemany("UPDATE cards SET pos = ? WHERE id = ?", [(float(i), cid) for i, cid in enumerate(ids)])
+
+    def save(self, data: dict):
+        lanes, next_id, _ = BoardModel.parse_state(data, LANES)
+        blobs = self.blobs
+        rows = []
+        for lane, items in lanes.items():
+            for i, (cid, title, desc, ref) in enumerate(items):
+                if desc and not ref:
+                    # Inline text (e.g. a board file saved by an older version)
+                    stored = blobs.put(desc)
+                    if stored is not None:
+                        desc, ref = "", stored
+                rows.append((cid, lane, float(i), title, desc, ref))
+        blobs.flush()
+        db = self._db()
+        with self._lock, db:
+            db.execute("DELETE FROM cards")
+            db.executemany("INSERT INTO cards (id, lane, pos, title, desc, desc_ref) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (str(next_id),))
+
+    def import_json(self, json_path: str) -> bool:
+        # Migrate a board_state.json (any format load_state accepts) into this
+        # database. -> False if it holds no cards (nothing is written); raises if
+        # it cannot be read or the database cannot be written
+        source = JsonStorage(json_path)
+        data, ops = source.load()
+        if ops:
+            # A journal next to the snapshot holds newer changes: fold them in first
+            model = BoardModel()
+            model.load(data)
+            replay(model, ops)
+            data = model.to_dict()
+        if os.path.normcase(os.path.abspath(source.blobs.root)) != os.path.normcase(os.path.abspath(self.blobs.root)):
+            # Another folder (the legacy location): its bodies are stored here by save
+            inline_descs(data, source.blobs)
+        lanes, _, _ = BoardModel.parse_state(data, LANES)
+        if not any(lanes.values()):
+            return False
+        self.save(data)
+        return True
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def discard(self):
+        # Close and delete the database (with its WAL files), e.g. after a failed import
+        self.close()
+        for path in (self.path, self.path + "-wal", self.path + "-shm"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class SyncClient(Storage):
+    # A board held by `python app.py serve`, for a window started with --connect.
+    # Nothing is written to disk here: append() queues local changes, which go to
+    # the server once per tick (send). A reader thread parses the server's lines
+    # into a bounded queue the Tk thread drains (App._pump_remote); a window that
+    # stops draining stops reading, and the server then falls back to sending it
+    # a snapshot.
+    #
+    # Our changes are applied locally before the server has ordered them among
+    # other clients'. When that may have come out differently (other clients'
+    # changes arrived while ours were in flight, or the server had to adjust ours),
+    # a snapshot is requested once our changes are acknowledged and merged with
+    # BoardModel.sync, which is a no-op when nothing actually diverged.
+    #
+    # Descriptions travel as text; with `blob_root` they are kept in a local
+    # BlobStore (content-addressed, so one directory serves every server).
+    name = "remote"
+    incremental = True
+    snapshot_on_close = False
+
+    def __init__(self, address: str, blob_root: Optional[str] = None):
+        host, _, port = address.rpartition(":")
+        self.address = address
+        self.blobs = BlobStore(blob_root) if blob_root else None
+        self.host = host or "127.0.0.1"
+        self.port = int(port) if port else SYNC_PORT
+        self.client_id: Optional[int] = None
+        self.rev = 0            # last server revision seen
+        self.sent = 0           # sequence number of the last batch sent...
+        self.acked = 0          # ...and of the last one the server applied
+        self.stale = False      # our copy may differ from the server's
+        self._asked = None      # when a snapshot was last requested
+        self._out: List[dict] = []
+        self._inbox: "queue.Queue" = queue.Queue(maxsize=SYNC_CLIENT_BUFFER)
+        self._first: Optional[dict] = None
+        self._sock = None
+
+    def connect(self):
+        # Connect and wait for the first snapshot; raises OSError on failure
+        import socket
+        self._sock = socket.create_connection((self.host, self.port), timeout=SYNC_TIMEOUT)
+        self._sock.settimeout(None)
+        threading.Thread(target=self._read, daemon=True).start()
+        try:
+            msg = self._inbox.get(timeout=SYNC_TIMEOUT)
+        except queue.Empty:
+            msg = {}
+        if msg.get("type") != "snapshot":
+            self.close()
+            raise OSError(f"no board received from {self.address}")
+        self.client_id = msg["client"]
+        self.rev = msg["rev"]
+        self._first = msg["board"]
+
+    def _read(self):
+        try:
+            with self._sock.makefile("rb") as f:
+                for line in f:
+                    self._inbox.put(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        self._inbox.put({"type": "closed"})
+
+    def exists(self) -> bool:
+        return self._first is not None
+
+    def load(self):
+        data, self._first = self._first or {}, None
+        return data, []
+
+    def append(self, events: List[dict]):
+        # Bodies just stored are still in the LRU, so this rarely reads a file
+        blobs = self.blobs
+        self._out.extend(inline_desc(rec, blobs) for rec in map(journal_record, events) if rec is not None)
+
+    def save(self, data: dict):
+        # The server owns the board and writes its snapshots
+        pass
+
+    def send(self):
+        # Tk thread, once per tick: local changes since the last tick as one message
+        if self._out:
+            ops, self._out = self._out, []
+            self.sent += 1
+            self._sock.sendall(sync_line({"op": "ops", "seq": self.sent, "ops": ops}))
+        if self.stale and self.sent == self.acked:
+            now = time.monotonic()
+            if self._asked is None or now - self._asked >= SYNC_RESYNC_MS / 1000:
+                self._asked = now
+                self._sock.sendall(sync_line({"op": "snapshot"}))
+
+    def poll(self) -> Optional[dict]:
+        try:
+            return self._inbox.get_nowait()
+        except queue.Empty:
+            return None
+
+    def received(self, msg: dict) -> List[dict]:
+        # An "events" message -> the records of other clients still to apply here
+        if msg["rev"] <= self.rev:
+            return []  # covered by a snapshot already applied
+        self.rev = msg["rev"]
+        busy = self.sent > self.acked or bool(self._out)
+        me = self.client_id
+        ack = msg.get("acks", {}).get(str(me))
+        if ack is not None:
+            self.acked = ack
+        if me in msg.get("redo", ()):
+            self.stale = True
+        recs = [rec for rec in msg["events"] if rec.get("by") != me]
+        if recs and busy:
+            self.stale = True
+        return recs
+
+    def snapshot(self, msg: dict) -> Optional[dict]:
+        # A "snapshot" message -> the board to adopt, or None while our own changes
+        # are in flight (it would roll them back); another is requested later
+        self.rev = msg["rev"]
+        if msg.get("acked") is not None:
+            self.acked = max(self.acked, msg["acked"])
+        if self.sent > self.acked or self._out:
+            self.stale = True
+            return None
+        self.stale = False
+        return msg["board"]
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                if self._out:
+                    self.send()
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+def default_state_path() -> str:
+    # Where to store state (use AppData to work in a frozen EXE)
+    appdata = os.environ.get("APPDATA", os.path.expanduser("~"))
+    data_dir = os.path.join(appdata, "notTrello")
+    try:
+        os.makedirs(data_dir, exist_ok=True)
+    except Exception:
+        pass
+    return os.path.join(data_dir, "board_state.json")
+
+def legacy_state_path() -> Optional[str]:
+    try:
+        base_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(__file__)
+    except Exception:
+        base_dir = os.getcwd()
+    legacy_path = os.path.join(base_dir, "board_state.json")
+    return legacy_path if os.path.exists(legacy_path) else None
+
+def make_storage(json_path: str) -> Storage:
+    if STORAGE_BACKEND == "sqlite":
+        return SqliteStorage(os.path.splitext(json_path)[0] + ".db")
+    return JsonStorage(json_path, journal=(PERSISTENCE == "journal"))
+
+def open_storage(state_path: str, fallback: bool = True):
+    # Storage for the board at `state_path`, applying the first-run rules shared by
+    # the window and the CLI. -> (storage, state_path actually used)
+    storage = make_storage(state_path)
+    if isinstance(storage, SqliteStorage) and not storage.exists():
+        # First run on SQLite: migrate the JSON board (any saved format) if there is one
+        json_path = state_path if os.path.exists(state_path) else (legacy_state_path() if fallback else None)
+        if json_path is not None:
+            try:
+                storage.import_json(json_path)
+            except Exception as e:
+                # Keep nothing of a half-done migration, so the next start tries
+                # again; until then the JSON board is used as it is
+                storage.discard()
+                log(f"could not move {json_path} to SQLite, using it as is: {e}")
+                return JsonStorage(json_path, journal=(PERSISTENCE == "journal")), json_path
+    elif isinstance(storage, JsonStorage) and not storage.exists() and fallback:
+        # Fallback: try legacy location next to script (pre-EXE builds)
+        legacy_path = legacy_state_path()
+        if legacy_path is not None:
+            state_path = legacy_path
+            storage = make_storage(legacy_path)
+    return storage, state_path
+
+def read_board(progress: Callable, state_path: str, fallback: bool, lane_names: List[str]):
+    # Job for the thread pool (the storage object comes back): open_storage, then
+    # parse. -> (storage, state_path, load_parsed result or None if nothing is
+    # saved, parse ms)
+    storage, state_path = open_storage(state_path, fallback=fallback)
+    if not storage.exists():
+        return storage, state_path, None, 0.0
+    t0 = time.perf_counter()
+    parsed = storage.load_parsed(lane_names)
+    return storage, state_path, parsed, (time.perf_counter() - t0) * 1000
+
+class BoardRegistry:
+    # boards.json in the data directory: each board's name and state file
+    # (relative to the data directory) and the board shown last. The original
+    # board_state.json is the default board.
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, "boards.json")
+        self.boards: Dict[str, str] = {DEFAULT_BOARD: "board_state.json"}
+        self.active = DEFAULT_BOARD
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        entries = data.get("boards")
+        if isinstance(entries, list):
+            for it in entries:
+                if isinstance(it, dict) and isinstance(it.get("name"), str) and isinstance(it.get("file"), str):
+                    self.boards[it["name"]] = it["file"]
+        if data.get("active") in self.boards:
+            self.active = data["active"]
+
+    def names(self) -> List[str]:
+        return list(self.boards)
+
+    def state_path(self, name: str) -> str:
+        return os.path.join(self.data_dir, self.boards[name])
+
+    def is_default(self, name: str) -> bool:
+        return self.boards[name] == "board_state.json"
+
+    def add(self, name: str) -> str:
+        # Register a new, empty board; raises ValueError for unusable names
+        name = name.strip()
+        if not name:
+            raise ValueError("the board needs a name")
+        if name in self.boards:
+            raise ValueError(f"there is already a board called {name!r}")
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "-", name).strip("-").lower() or "board"
+        taken = set(self.boards.values())
+        file, n = f"boards/{slug}.json", 2
+        while file in taken or os.path.exists(os.path.join(self.data_dir, file)):
+            file, n = f"boards/{slug}-{n}.json", n + 1
+        os.makedirs(os.path.join(self.data_dir, "boards"), exist_ok=True)
+        self.boards[name] = file
+        self.save()
+        return name
+
+    def save(self):
+        write_json_atomic(self.path, {
+            "boards": [{"name": name, "file": file} for name, file in self.boards.items()],
+            "active": self.active,
+        })
+
+class SaveScheduler:
+    # Coalesces model changes and writes them on a worker thread. The Tk thread
+    # only collects events and, when a full snapshot is due, copies the model
+    # (BoardModel.to_dict); serializing and disk I/O happen on the worker.
+    # Failures come back through a queue polled with after(), never by calling
+    # Tk from the worker.
+    def __init__(self, app: "App", board: "OpenBoard", window_ms: int = SAVE_DEBOUNCE_MS):
+        self.app = app
+        self.board = board
+        self.window_ms = window_ms
+        self._pending: List[dict] = []
+        self._job = None
+        self._poll_job = None
+        self._work: "queue.Queue" = queue.Queue()
+        self._errors: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def mark_dirty(self, events: List[dict]):
+        self._pending.extend(events)
+        if self._job is None:
+            self._job = self.app.after(self.window_ms, self._flush_async)
+
+    def _flush_async(self):
+        self._job = None
+        storage = self.board.storage
+        if not storage.incremental and storage.changed_externally():
+            # A snapshot would overwrite the other process's change: merge it first
+            # (that puts our pending changes back and schedules this again)
+            self.app.sync_external(self.board)
+            return
+        work = self._take()
+        if work is not None:
+            self._submit(work)
+
+    def write_bodies(self):
+        # Shared boards save nothing here but the local copies of descriptions
+        # (BlobStore.flush); one write at a time is queued
+        blobs = self.board.storage.blobs
+        if blobs is not None and blobs.pending() and not self._work.unfinished_tasks:
+            self._submit(blobs.flush)
+
+    def _submit(self, work: Callable):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+        self._work.put(work)
+        if self._poll_job is None:
+            self._poll_job = self.app.after(100, self._poll)
+
+    def _take(self):
+        # Runs on the Tk thread: grab what the worker needs, nothing more
+        storage = self.board.storage
+        loading = self.app.loader is not None and self.app.board is self.board
+        if self.board.reading is not None or (not storage.incremental and loading):
+            # Not read yet: held for App._board_read to rebase. A snapshot while
+            # loading would drop the cards that are still loading.
+            if self._pending:
+                self._job = self.app.after(self.window_ms, self._flush_async)
+            return None
+        events, self._pending = self._pending, []
+        if not events:
+            return None
+        flow = self.board.flow_log()
+        data = self.board.model.to_dict() if not storage.incremental else None
+        snapshot = self.board.model.to_dict() if storage.incremental and not loading and storage.needs_compaction() else None
+
+        def work():
+            if data is not None:
+                storage.save(data)
+            else:
+                storage.append(events)
+                if snapshot is not None:
+                    storage.save(snapshot)
+            if flow is not None:
+                # Column changes recorded with these events (App._on_model_change)
+                flow.flush()
+        return work
+
+    def _run(self):
+        while True:
+            work = self._work.get()
+            if work is None:
+                # close(): the board is gone
+                self._work.task_done()
+                return
+            try:
+                work()
+            except Exception as e:
+                self._errors.put(e)
+            finally:
+                self._work.task_done()
+
+    def _failed(self) -> List[dict]:
+        # Report failed writes; returns the events refused as stale (StaleBoard)
+        stale: List[dict] = []
+        while True:
+            try:
+                err = self._errors.get_nowait()
+            except queue.Empty:
+                return stale
+            if isinstance(err, StaleBoard):
+                stale.extend(err.events)
+                continue
+            try:
+                messagebox.showwarning("Save failed", f"Could not save board: {err}")
+            except Exception:
+                pass
+
+    def _poll(self):
+        self._poll_job = None
+        stale = self._failed()
+        if stale:
+            # Writes queued behind the refused one are refused too; merge the other
+            # process's changes, then ours go out again on top (sync_external)
+            self._work.join()
+            stale.extend(self._failed())
+            self._pending[:0] = stale
+            self.app.sync_external(self.board)
+        if self._work.unfinished_tasks:
+            self._poll_job = self.app.after(100, self._poll)
+
+    def drain(self) -> List[dict]:
+        # Wait for queued writes and hand back the changes not written yet
+        if self._job is not None:
+            self.app.after_cancel(self._job)
+            self._job = None
+        self._work.join()
+        events, self._pending = self._pending, []
+        return events
+
+    def flush(self):
+        # Synchronous: wait for queued writes, then persist what is left (used on close)
+        if self._job is not None:
+            self.app.after_cancel(self._job)
+            self._job = None
+        self._work.join()
+        stale = self._failed()
+        self._pending[:0] = stale
+        flow = self.board.flow_log()
+        if flow is not None:
+            flow.flush()
+        storage = self.board.storage
+        if stale or storage.changed_externally():
+            # Merge another process's changes first so nothing below overwrites them
+            self.app.sync_external(self.board)
+            if self._job is not None:
+                self.app.after_cancel(self._job)
+                self._job = None
+        if storage.snapshot_on_close:
+            self._pending = []
+            self.app.save_state(self.board)
+        elif self._pending:
+            events, self._pending = self._pending, []
+            try:
+                storage.append(events)
+            except Exception as e:
+                try:
+                    messagebox.showwarning("Save failed", f"Could not save board: {e}")
+                except Exception:
+                    pass
+
+    def close(self):
+        # Flush, then let the worker thread exit
+        self.flush()
+        if self._worker is not None:
+            self._work.put(None)
+            self._worker = None
+
+class ProgressiveLoader:
+    # Appends the rest of a parsed board to the model in slices of at most
+    # LOAD_SLICE_MS, yielding to the event loop between slices so the window
+    # stays responsive. Columns show a loading indicator until done.
+    def __init__(self, app: "App", rest: Dict[str, list]):
+        self.app = app
+        self.rest = {lane: items for lane, items in rest.items() if items}
+        self.offsets = {lane: 0 for lane in self.rest}
+        self._job = None
+
+    def start(self):
+        self._update_indicators()
+        self._job = self.app.after(1, self._step)
+
+    def _step(self):
+        self._job = None
+        deadline = time.perf_counter() + LOAD_SLICE_MS / 1000.0
+        while self.rest and time.perf_counter() < deadline:
+            self._load_chunk()
+        self._update_indicators()
+        if self.rest:
+            self._job = self.app.after(1, self._step)
+        else:
+            self._done()
+
+    def _load_chunk(self):
+        lane = next(iter(self.rest))
+        items = self.rest[lane]
+        start = self.offsets[lane]
+        end = min(len(items), start + LOAD_CHUNK)
+        self.app.model.extend(lane, items[start:end])
+        if end >= len(items):
+            del self.rest[lane]
+            del self.offsets[lane]
+        else:
+            self.offsets[lane] = end
+
+    def remaining(self) -> int:
+        return sum(len(items) - self.offsets[lane] for lane, items in self.rest.items())
+
+    def finish(self):
+        # Load everything left right now (e.g. the window is closing)
+        if self._job is not None:
+            self.app.after_cancel(self._job)
+            self._job = None
+        with self.app.model.batch():
+            while self.rest:
+                self._load_chunk()
+        self._done()
+
+    def _update_indicators(self):
+        for title, col in self.app.columns.items():
+            items = self.rest.get(title)
+            if items is None:
+                col.set_loading(None)
+            else:
+                done = len(self.app.model.ids(title))
+                left = len(items) - self.offsets[title]
+                col.set_loading(f"loading {done:,}/{done + left:,}")
+
+    def _done(self):
+        self._update_indicators()
+        self.app.loader = None
+        loaded_ms = (time.perf_counter() - _START) * 1000
+        log(f"board loaded after {loaded_ms:.0f} ms ({len(self.app.model):,} cards)")
+        if PROFILE_STARTUP:
+            self.app.startup["full load"] = loaded_ms
+            self.app.report_startup()
+
+class JobCancelled(Exception):
+    pass
+
+class Job:
+    # A job submitted to JobRunner. Its function is called as fn(progress, *args);
+    # progress(done, total) reports how far it got. In a thread job it raises
+    # JobCancelled once the job is cancelled; a process job that has started
+    # runs to the end and its result is dropped.
+    def __init__(self, runner: "JobRunner", key: int, name: str,
+                 on_done: Optional[Callable], on_error: Optional[Callable]):
+        self.runner = runner
+        self.key = key
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self.done = 0
+        self.total = 0   # 0 until the job reports progress
+        self.cancelled = False
+        self.future = None
+
+    def progress(self, done: int, total: int):
+        # Worker thread
+        if self.cancelled:
+            raise JobCancelled()
+        self.runner._inbox.put((self.key, done, total))
+
+    def cancel(self):
+        self.runner.cancel(self)
+
+_job_progress = None   # in a job process: where progress goes (see JobRunner)
+
+def _init_job_process(progress_queue):
+    global _job_progress
+    _job_progress = progress_queue
+
+class _ProcessProgress:
+    # The progress callable a process job gets
+    def __init__(self, key: int):
+        self.key = key
+
+    def __call__(self, done: int, total: int):
+        _job_progress.put((self.key, done, total))
+
+class JobRunner:
+    # Runs jobs off the Tk thread: cpu=True ones in a pool of JOB_PROCESSES
+    # processes (module-level functions and picklable arguments only), the rest
+    # in a pool of JOB_THREADS threads. Pools start on first use; processes are
+    # spawned, never forked from the Tk process. Completion and progress are
+    # queued by the workers and handled here every JOB_POLL_MS, on the Tk
+    # thread: on_done(result) or on_error(exception) is called there, and
+    # on_error(JobCancelled()) when a job is cancelled.
+    def __init__(self, app: "App", on_change: Callable[[], None]):
+        self.app = app
+        self.on_change = on_change   # jobs started, finished or made progress
+        self.jobs: Dict[int, Job] = {}   # unfinished, oldest first
+        self._next_key = 1
+        self._threads = None
+        self._processes = None
+        self._process_inbox = None
+        self._inbox: "queue.Queue" = queue.Queue()
+        self._poll_job = None
+
+    def submit(self, name: str, fn: Callable, *args, cpu: bool = False,
+               on_done: Optional[Callable] = None, on_error: Optional[Callable] = None) -> Job:
+        job = Job(self, self._next_key, name, on_done, on_error)
+        self._next_key += 1
+        if cpu:
+            try:
+                job.future = self._process_pool().submit(fn, _ProcessProgress(job.key), *args)
+            except (OSError, RuntimeError) as e:
+                # No processes to be had (or the pool broke): run it on a thread
+                log(f"job processes unavailable, using a thread: {e}")
+                self._processes = None
+        if job.future is None:
+            job.future = self._thread_pool().submit(fn, job.progress, *args)
+        self.jobs[job.key] = job
+        job.future.add_done_callback(lambda f: self._inbox.put((job.key, None, None)))
+        if self._poll_job is None:
+            self._poll_job = self.app.after(JOB_POLL_MS, self._poll)
+        self.on_change()
+        return job
+
+    def _thread_pool(self):
+        if self._threads is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._threads = ThreadPoolExecutor(max_workers=JOB_THREADS, thread_name_prefix="job")
+        return self._threads
+
+    def _process_pool(self):
+        if self._processes is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            ctx = multiprocessing.get_context("spawn")
+            self._process_inbox = ctx.Queue()
+            self._processes = ProcessPoolExecutor(max_workers=JOB_PROCESSES, mp_context=ctx,
+                                                  initializer=_init_job_process,
+                                                  initargs=(self._process_inbox,))
+        return self._processes
+
+    def cancel(self, job: Job, notify: bool = True):
+        if self.jobs.pop(job.key, None) is None:
+            return
+        job.cancelled = True
+        job.future.cancel()
+        if notify:
+            if job.on_error is not None:
+                job.on_error(JobCancelled())
+            self.on_change()
+
+    def _poll(self):
+        # Keeps polling while jobs are left, even if a callback below raises
+        self._poll_job = self.app.after(JOB_POLL_MS, self._poll)
+        reports = []
+        for inbox in (self._inbox, self._process_inbox):
+            while inbox is not None:
+                try:
+                    reports.append(inbox.get_nowait())
+                except (queue.Empty, OSError, EOFError):
+                    break
+        try:
+            for key, done, total in reports:
+                job = self.jobs.get(key)
+                if job is None:
+                    continue   # cancelled, or a late progress report
+                if done is not None:
+                    job.done, job.total = done, total
+                elif job.future.done():
+                    self._finish(job)
+        finally:
+            if not self.jobs:
+                self.app.after_cancel(self._poll_job)
+                self._poll_job = None
+            if reports:
+                self.on_change()
+
+    def _finish(self, job: Job):
+        del self.jobs[job.key]
+        try:
+            result = job.future.result()
+        except Exception as e:
+            if job.on_error is not None:
+                job.on_error(e)
+            else:
+                log(f"{job.name} failed: {e}")
+            return
+        if job.on_done is not None:
+            job.on_done(result)
+
+    def shutdown(self):
+        # Closing: drop every job; a process job that has started still runs to
+        # its end before the app exits
+        for job in list(self.jobs.values()):
+            self.cancel(job, notify=False)
+        if self._poll_job is not None:
+            self.app.after_cancel(self._poll_job)
+            self._poll_job = None
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
 
 class DragState:
-    def __init__(self):
-        self.card: Optional[tk.Frame] = None
+    # Drag-and-drop of cards. The state lives here rather than on the pressed
+    # widget: card widgets are pooled and may be rebound or hidden mid-drag, so
+    # motion and release events from any card or column are routed to this one
+    # object. A single ghost window is created on first use and reused.
+    def __init__(self, app: "App"):
+        self.app = app
+        self.card_id: Optional[int] = None
         self.ghost: Optional[tk.Toplevel] = None
+        self.ghost_lbl: Optional[tk.Label] = None
         self.offset_x = 0
         self.offset_y = 0
+        self.target: Optional[str] = None       # column under the pointer
+        self.row: Optional[int] = None          # insertion row in that column's view
+        self._marker_col: Optional["ScrollableColumn"] = None
+        self._scroll_job = None
+
+    def _ensure_ghost(self):
+        if self.ghost is None:
+            ghost = tk.Toplevel(self.app)
+            ghost.withdraw()
+            ghost.overrideredirect(True)
+            try:
+                ghost.attributes("-alpha", 0.85)
+            except Exception:
+                pass
+            ghost.configure(bg=CARD_BG)
+            self.ghost_lbl = tk.Label(ghost, bg=CARD_BG, fg=FG, padx=10, pady=6, justify=tk.LEFT, wraplength=240)
+            self.ghost_lbl.pack()
+            self.ghost = ghost
+
+    def press(self, card: "TaskCard", event):
+        data = self.app.model.get(card.card_id)
+        if data is None:
+            return
+        self.card_id = data.id
+        x, y = card.winfo_rootx(), card.winfo_rooty()
+        self.offset_x = event.x_root - x
+        self.offset_y = event.y_root - y
+        self._ensure_ghost()
+        self.ghost_lbl.configure(text=data.title, wraplength=max(100, card.winfo_width() - 20))
+        self.ghost.geometry(f"+{x}+{y}")
+        self.ghost.deiconify()
+        self.ghost.lift()
+
+    @property
+    def active(self) -> bool:
+        return self.card_id is not None
+
+    def motion(self, px: int, py: int):
+        if self.card_id is None:
+            return
+        self.ghost.geometry(f"+{px - self.offset_x}+{py - self.offset_y}")
+        self._track(px, py)
+        if self._scroll_job is None and self._edge_speed(py):
+            self._scroll_job = self.app.after(DRAG_TICK_MS, self._autoscroll)
+
+    def _track(self, px: int, py: int):
+        # Update the drop target and insertion marker for the pointer position
+        self.target = self.app.column_under_pointer(px, py)
+        col = self.app.columns.get(self.target) if self.target else None
+        if self._marker_col is not None and self._marker_col is not col:
+            self._marker_col.hide_drop_marker()
+        self._marker_col = col
+        if col is None:
+            self.row = None
+            return
+        self.row = col.row_at(py)
+        col.show_drop_marker(self.row)
+
+    def _edge_speed(self, py: int) -> int:
+        col = self.app.columns.get(self.target) if self.target else None
+        return col.edge_scroll_speed(py) if col is not None else 0
+
+    def _autoscroll(self):
+        self._scroll_job = None
+        if self.card_id is None:
+            return
+        px, py = self.app.winfo_pointerxy()
+        speed = self._edge_speed(py)
+        if speed:
+            self.app.columns[self.target].scroll_pixels(speed)
+            self._track(px, py)
+            self._scroll_job = self.app.after(DRAG_TICK_MS, self._autoscroll)
+
+    def release(self, px: int, py: int):
+        if self.card_id is None:
+            return
+        self._track(px, py)
+        cid, target, row = self.card_id, self.target, self.row
+        self.cancel()
+        model = self.app.model
+        card = model.get(cid)
+        if target is None or card is None:
+            return
+        index = self.app.columns[target].lane_index_for_row(row, cid)
+        if target == card.lane:
+            # Dropping a card back into its own slot is not a move
+            current = model.index_of(cid)
+            if index == current or (index is None and current == len(model.ids(target)) - 1):
+                return
+        model.move(cid, target, index)
+
+    def cancel(self):
+        self.card_id = None
+        self.target = None
+        self.row = None
+        if self.ghost is not None:
+            self.ghost.withdraw()
+        if self._marker_col is not None:
+            self._marker_col.hide_drop_marker()
+            self._marker_col = None
+        if self._scroll_job is not None:
+            self.app.after_cancel(self._scroll_job)
+            self._scroll_job = None
+
+class InputCoalescer:
+    # Collapses high-rate pointer input into one update per frame. Drag motion
+    # keeps only the latest pointer position; wheel input is accumulated per
+    # column in fractional notches and applied as pixel scrolling, carrying the
+    # sub-pixel remainder into the next frame.
+    def __init__(self, app: "App"):
+        self.app = app
+        self._motion = None
+        self._wheel: Dict[str, float] = {}
+        self._carry: Dict[str, float] = {}
+        self._job = None
+
+    def motion(self, px: int, py: int):
+        self._motion = (px, py)
+        self._schedule()
+
+    def wheel(self, column: str, notches: float):
+        self._wheel[column] = self._wheel.get(column, 0.0) + notches
+        self._schedule()
+
+    def _schedule(self):
+        if self._job is None:
+            self._job = self.app.after(FRAME_MS, self.flush)
+
+    @instrumented("input frame")
+    def flush(self):
+        if self._job is not None:
+            self.app.after_cancel(self._job)
+            self._job = None
+        motion, self._motion = self._motion, None
+        if motion is not None:
+            self.app.drag.motion(*motion)
+        wheel, self._wheel = self._wheel, {}
+        for title, notches in wheel.items():
+            col = self.app.columns.get(title)
+            if col is None:
+                continue
+            px = notches * WHEEL_NOTCH_FRACTION * max(col.canvas.winfo_height(), 1) + self._carry.get(title, 0.0)
+            whole = int(px)
+            self._carry[title] = px - whole
+            if whole:
+                col.scroll_pixels(whole)
 
 class ScrollableColumn(ttk.Frame):
-    def __init__(self, master, title: str, color: str, allow_add: bool = False, allow_clear: bool = False):
+    def __init__(self, master, title: str, color: str, model: BoardModel, allow_add: bool = False, allow_clear: bool = False):
         super().__init__(master, padding=(6, 6, 6, 6))
         self.title = title
         self.color = color
+        self.model = model
         self.allow_add = allow_add
         self.allow_clear = allow_clear
+        # Virtualization: widgets exist only for rows near the viewport.
+        # Measured heights are cached per card id; row tops are prefix sums.
+        self._active: Dict[int, "CardActions"] = {}   # card id -> card showing it (CARD_RENDERER)
+        self._pool: List["CardActions"] = []           # idle cards kept for reuse
+        self._card_items: Dict[int, "CanvasCard"] = {}  # canvas item -> canvas-drawn card
+        self._pressed = None   # (card, card id, button) while a canvas-drawn button is held
+        self._button_size = None
+        self._heights: Dict[int, int] = {}
+        self._offsets: List[int] = [0]
+        self._layout_dirty = True
+        self._refresh_job = None
+        self._refreshing = False
+        self._refresh_again = False
+        self._suspended = 0           # >0 while a batch insert holds layout back
+        self._suspended_dirty = False
+        self._last_view = None
+        self._width = 1
+        # Search filter: only card ids in this set are shown (None shows all)
+        self._filter: Optional[set] = None
+        self._rows_cache: Optional[List[int]] = None
 
         # Header
         header = ttk.Frame(self)
@@ -50,72 +3810,358 @@ class ScrollableColumn(ttk.Frame):
             ttk.Button(header, text="+ Add", command=self._prompt_new_card).pack(side=tk.RIGHT)
         if self.allow_clear:
             ttk.Button(header, text="Clear", command=self._clear_all).pack(side=tk.RIGHT, padx=(0, 4))
+            ttk.Button(header, text="Archive", command=lambda: self._get_app().show_archive()).pack(
+                side=tk.RIGHT, padx=(0, 4))
+        # Shown only while the board is still loading into this column
+        self.loading_lbl = ttk.Label(header, text="", foreground="#94A3B8")
 
         # Scrollable area
         outer = tk.Frame(self, bg=color, bd=0, highlightthickness=1, highlightbackground=CARD_BORDER)
         outer.pack(fill=tk.BOTH, expand=True, pady=(6, 0))
 
         self.canvas = tk.Canvas(outer, bg=color, highlightthickness=0)
-        vbar = ttk.Scrollbar(outer, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=vbar.set)
-        vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.vbar = ttk.Scrollbar(outer, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        self.inner = tk.Frame(self.canvas, bg=color)
-        self.inner_id = self.canvas.create_window((0, 0), window=self.inner, anchor="nw")
-
-        self.inner.bind("<Configure>", self._on_inner_configure)
         self.canvas.bind("<Configure>", self._on_canvas_configure)
-    # Scrolling is handled globally at the App level; no per-column hover binding needed
+        # The wheel is handled globally (App._on_global_mousewheel); no per-column binding
+        # A pooled card widget can be hidden mid-drag; let the canvas carry the drag on
+        self.canvas.bind("<B1-Motion>", lambda e: self._get_app().input.motion(e.x_root, e.y_root))
+        self.canvas.bind("<ButtonRelease-1>", self._on_canvas_release)
+        self._marker = None  # drop insertion line, created on first drag
+        if CARD_RENDERER == "canvas":
+            # Every canvas-drawn card carries the "card" tag: one set of bindings
+            self.canvas.tag_bind("card", "<Enter>", self._on_card_enter)
+            self.canvas.tag_bind("card", "<Leave>", self._on_card_leave)
+            self.canvas.tag_bind("card", "<ButtonPress-1>", self._on_card_press)
 
-    def _on_inner_configure(self, _):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.model.subscribe(self._on_model_change)
+        self.bind("<Destroy>", self._on_destroy, add="+")
 
-    def _on_canvas_configure(self, event):
-        self.canvas.itemconfig(self.inner_id, width=event.width)
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.model.unsubscribe(self._on_model_change)
+            if self._refresh_job is not None:
+                self.after_cancel(self._refresh_job)
+                self._refresh_job = None
 
-    def _on_mousewheel(self, event):
-        # Windows/macOS: delta in steps of 120 (Windows) or varying (macOS). Only scroll if pointer is over this column.
-        if not self._pointer_inside():
+    def _on_model_change(self, events: List[dict]):
+        touched = False
+        for ev in events:
+            op = ev["op"]
+            if op == "reset":
+                self._release_all()
+                self._heights.clear()
+                touched = True
+            elif op == "load":
+                if ev["lane"] == self.title:
+                    if self._layout_dirty or self._filter is not None:
+                        touched = True
+                    else:
+                        self._append_rows(len(ev["ids"]))
+                        self._schedule_refresh()
+            elif op in ("add", "remove", "move"):
+                mine = ev["lane"] == self.title
+                left = ev.get("from_lane") == self.title
+                if (op == "remove" and mine) or (left and not mine):
+                    self._heights.pop(ev["id"], None)
+                if mine or left:
+                    touched = True
+            elif op == "edit":
+                # Title may wrap differently: re-measure that row
+                if self._heights.pop(ev["id"], None) is not None or ev["id"] in self._active:
+                    touched = True
+                card = self._active.get(ev["id"])
+                if card is not None:
+                    card.set_title(ev["title"])
+        if touched:
+            self._rows_cache = None
+            self._layout_dirty = True
+            self._schedule_refresh()
+
+    def set_filter(self, ids: Optional[set]):
+        self._filter = ids
+        self._rows_cache = None
+        self._layout_dirty = True
+        self._schedule_refresh()
+
+    # Virtualized layout
+    def _rows(self) -> List[int]:
+        if self._filter is None:
+            return self.model.ids(self.title)
+        if self._rows_cache is None:
+            keep = self._filter
+            self._rows_cache = [cid for cid in self.model.ids(self.title) if cid in keep]
+        return self._rows_cache
+
+    def _relayout(self):
+        rows = self._rows()
+        heights = self._heights
+        offsets = [0] * (len(rows) + 1)
+        y = 0
+        gap = 2 * CARD_PAD_Y
+        for i, cid in enumerate(rows):
+            offsets[i] = y
+            y += heights.get(cid, CARD_EST_HEIGHT) + gap
+        offsets[len(rows)] = y
+        self._offsets = offsets
+        self._layout_dirty = False
+        self.canvas.configure(scrollregion=(0, 0, self._width, max(y, 1)))
+
+    def _append_rows(self, count: int):
+        # Cards appended at the end: extend the offsets instead of a full relayout
+        y = self._offsets[-1]
+        step = CARD_EST_HEIGHT + 2 * CARD_PAD_Y
+        self._offsets.extend(y + step * (i + 1) for i in range(count))
+        self.canvas.configure(scrollregion=(0, 0, self._width, max(self._offsets[-1], 1)))
+
+    def _on_canvas_release(self, event):
+        if self._pressed is not None:
+            # A canvas-drawn button: it fires if released over itself, like a ttk.Button
+            card, cid, button = self._pressed
+            self._pressed = None
+            card.press_button(button, False)
+            x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+            if card.card_id == cid and card.button_at(x, y) == button:
+                card.view() if button == "view" else card.delete()
             return
-        delta = event.delta
-        # Normalize and apply natural vs traditional direction
-        base = int(delta / 120) if delta else 0
-        if base == 0:
-            base = 1 if delta > 0 else -1
-        steps = base if NATURAL_SCROLL else -base
-        self.canvas.yview_scroll(steps, "units")
+        app = self._get_app()
+        app.input.flush()
+        app.drag.release(event.x_root, event.y_root)
+
+    # Canvas-drawn cards (CARD_RENDERER = "canvas")
+    def _current_card(self) -> Optional["CanvasCard"]:
+        found = self.canvas.find_withtag("current")
+        return self._card_items.get(found[0]) if found else None
 
-    def _on_mousewheel_linux(self, event):
-        # Linux typically uses Button-4 (up) and Button-5 (down)
-        if not self._pointer_inside():
+    def _on_card_enter(self, event):
+        card = self._current_card()
+        if card is not None:
+            card.hover(True)
+
+    def _on_card_leave(self, event):
+        card = self._current_card()
+        if card is not None:
+            card.hover(False)
+
+    def _on_card_press(self, event):
+        card = self._current_card()
+        if card is None:
             return
-        if event.num == 4:  # up
-            self.canvas.yview_scroll(3 if NATURAL_SCROLL else -3, "units")
-        elif event.num == 5:  # down
-            self.canvas.yview_scroll(-3 if NATURAL_SCROLL else 3, "units")
-
-    def _activate_mousewheel(self, _):
-        # Bind globally while hovered so children also trigger scrolling
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-        self.canvas.bind_all("<Button-4>", self._on_mousewheel_linux)
-        self.canvas.bind_all("<Button-5>", self._on_mousewheel_linux)
-
-    def _deactivate_mousewheel(self, _):
-        # Remove global bindings when leaving this column
-        self.canvas.unbind_all("<MouseWheel>")
-        self.canvas.unbind_all("<Button-4>")
-        self.canvas.unbind_all("<Button-5>")
-
-    def _pointer_inside(self) -> bool:
-        try:
-            px, py = self.winfo_pointerx(), self.winfo_pointery()
-            x1, y1 = self.canvas.winfo_rootx(), self.canvas.winfo_rooty()
-            x2 = x1 + self.canvas.winfo_width()
-            y2 = y1 + self.canvas.winfo_height()
-            return x1 <= px <= x2 and y1 <= py <= y2
-        except Exception:
-            return False
+        button = card.button_at(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if button is not None:
+            self._pressed = (card, card.card_id, button)
+            card.press_button(button, True)
+        else:
+            card._on_press(event)
+
+    def button_size(self):
+        # View/Delete size for canvas-drawn cards, matching a ttk.Button of width 6
+        if self._button_size is None:
+            import tkinter.font as tkfont
+            font = tkfont.nametofont("TkDefaultFont")
+            width = max(font.measure("0") * 6, font.measure("Delete")) + 18
+            self._button_size = (width, font.metrics("linespace") + 10)
+        return self._button_size
+
+    # Drag support
+    def row_at(self, root_y: int) -> int:
+        # Insertion row (0..len(rows)) for a pointer at screen y
+        y = self.canvas.canvasy(root_y - self.canvas.winfo_rooty())
+        if self._layout_dirty:
+            self._relayout()
+        offsets = self._offsets
+        n = len(offsets) - 1
+        i = bisect_right(offsets, y) - 1
+        if i < 0:
+            return 0
+        if i >= n:
+            return n
+        # Lower half of a card inserts after it
+        return i + 1 if y > (offsets[i] + offsets[i + 1]) / 2 else i
+
+    def lane_index_for_row(self, row: Optional[int], moving_id: int) -> Optional[int]:
+        # Convert a view row into the model index BoardModel.move expects (the
+        # lane without the moving card); None appends. Rows can be filtered, so
+        # anchor on the card currently shown at that row.
+        rows = self._rows()
+        if row is None or row >= len(rows):
+            return None
+        anchor = rows[row]
+        card = self.model.get(moving_id)
+        index = self.model.index_of(anchor)
+        if anchor == moving_id:
+            return index
+        if card is not None and card.lane == self.title and self.model.index_of(moving_id) < index:
+            index -= 1
+        return index
+
+    def show_drop_marker(self, row: int):
+        offsets = self._offsets
+        row = max(0, min(row, len(offsets) - 1))
+        y = offsets[row] + (CARD_PAD_Y // 2 if row < len(offsets) - 1 else CARD_PAD_Y)
+        if self._marker is None:
+            self._marker = self.canvas.create_line(0, 0, 0, 0, fill=DROP_MARKER, width=3)
+        self.canvas.coords(self._marker, CARD_PAD_X, y, self._width - CARD_PAD_X, y)
+        self.canvas.itemconfigure(self._marker, state="normal")
+        self.canvas.tag_raise(self._marker)
+
+    def hide_drop_marker(self):
+        if self._marker is not None:
+            self.canvas.itemconfigure(self._marker, state="hidden")
+
+    def edge_scroll_speed(self, root_y: int) -> int:
+        # Pixels per tick to auto-scroll when the pointer is near the top/bottom edge
+        top = self.canvas.winfo_rooty()
+        bottom = top + self.canvas.winfo_height()
+        if root_y < top + DRAG_EDGE:
+            depth = min(DRAG_EDGE, top + DRAG_EDGE - root_y)
+            return -max(1, DRAG_SCROLL_MAX * depth // DRAG_EDGE)
+        if root_y > bottom - DRAG_EDGE:
+            depth = min(DRAG_EDGE, root_y - (bottom - DRAG_EDGE))
+            return max(1, DRAG_SCROLL_MAX * depth // DRAG_EDGE)
+        return 0
+
+    def scroll_pixels(self, dy: float):
+        # Scroll by a pixel amount (not yview units)
+        total = self._offsets[-1]
+        view_h = max(self.canvas.winfo_height(), 1)
+        if total <= view_h:
+            return
+        top = self.canvas.canvasy(0)
+        new_top = max(0.0, min(total - view_h, top + dy))
+        if new_top != top:
+            self.canvas.yview_moveto(new_top / total)
+
+    def set_loading(self, text: Optional[str]):
+        if text:
+            self.loading_lbl.configure(text=text)
+            if not self.loading_lbl.winfo_manager():
+                self.loading_lbl.pack(side=tk.LEFT, padx=(8, 0))
+        else:
+            self.loading_lbl.pack_forget()
+
+    @contextmanager
+    def suspend_layout(self):
+        # Hold back layout/scrollregion work until the outermost block ends,
+        # then do one pass
+        self._suspended += 1
+        try:
+            yield self
+        finally:
+            self._suspended -= 1
+            if self._suspended == 0 and self._suspended_dirty:
+                self._suspended_dirty = False
+                self._refresh()
+
+    def _schedule_refresh(self):
+        if self._suspended:
+            self._suspended_dirty = True
+        elif self._refreshing:
+            # Measuring runs idle tasks; don't re-enter, go round once more instead
+            self._refresh_again = True
+        elif self._refresh_job is None:
+            self._refresh_job = self.after_idle(self._refresh)
+
+    def _on_yscroll(self, first, last):
+        self.vbar.set(first, last)
+        if (first, last) != self._last_view:
+            self._last_view = (first, last)
+            self._schedule_refresh()
+
+    @instrumented("column refresh")
+    def _refresh(self):
+        self._refresh_job = None
+        self._refreshing = True
+        try:
+            self._refresh_rows()
+        finally:
+            self._refreshing = False
+        if self._refresh_again:
+            self._refresh_again = False
+            self._schedule_refresh()
+
+    def _refresh_rows(self):
+        if self._layout_dirty:
+            self._relayout()
+        rows = self._rows()
+        offsets = self._offsets
+        top = self.canvas.canvasy(0)
+        bottom = top + max(self.canvas.winfo_height(), 1)
+        first = max(0, bisect_right(offsets, top) - 1 - OVERSCAN_ROWS)
+        last = min(len(rows), bisect_left(offsets, bottom) + OVERSCAN_ROWS)
+        wanted = set(rows[first:last])
+
+        # Return widgets that scrolled out of range to the pool
+        for cid in [cid for cid in self._active if cid not in wanted]:
+            self._release(cid)
+
+        fresh = []
+        for i in range(first, last):
+            cid = rows[i]
+            card = self._active.get(cid)
+            if card is None:
+                card = self._acquire(cid)
+                if card is None:
+                    continue
+                fresh.append(card)
+            card.move_to(offsets[i] + CARD_PAD_Y)
+
+        # Measure newly shown cards once; heights stay cached until the title or width changes
+        if fresh:
+            if CARD_RENDERER != "canvas":
+                self.canvas.update_idletasks()
+            changed = False
+            for card in fresh:
+                h = card.height()
+                if self._heights.get(card.card_id) != h:
+                    self._heights[card.card_id] = h
+                    changed = True
+            if changed:
+                self._layout_dirty = True
+                self._refresh_again = True
+
+    def _acquire(self, cid: int) -> Optional["CardActions"]:
+        data = self.model.get(cid)
+        if data is None:
+            return None
+        card_w = max(1, self._width - 2 * CARD_PAD_X)
+        if self._pool:
+            card = self._pool.pop()
+            card.bind_card(data)
+            card.show(card_w)
+        elif CARD_RENDERER == "canvas":
+            card = CanvasCard(self, data, card_w)
+        else:
+            card = TaskCard(self.canvas, data)
+            card.win_id = self.canvas.create_window(CARD_PAD_X, 0, window=card, anchor="nw", width=card_w)
+            card.set_wrap(card_w)
+        self._active[cid] = card
+        return card
+
+    def _release(self, cid: int):
+        card = self._active.pop(cid, None)
+        if card is not None:
+            card.hide()
+            self._pool.append(card)
+
+    def _release_all(self):
+        for cid in list(self._active):
+            self._release(cid)
+
+    def _on_canvas_configure(self, event):
+        if event.width != self._width:
+            # Wrapping changes with width, so cached heights are stale
+            self._width = event.width
+            self._heights.clear()
+            card_w = max(1, self._width - 2 * CARD_PAD_X)
+            for card in self._active.values():
+                card.resize(card_w)
+            self._release_all()
+        self._layout_dirty = True
+        self._schedule_refresh()
 
     def _prompt_new_card(self):
         def on_ok():
@@ -124,79 +4170,176 @@ class ScrollableColumn(ttk.Frame):
             win.destroy()
             if title:
                 self.add_card(title, desc)
-                # Persist after creating a new card
+        win = tk.Toplevel(self)
+        win.title(f"Add to {self.title}")
+        win.geometry("360x280")
+        # Try to darken the native title bar on Windows
+        try:
+            self._get_app()._apply_dark_titlebar(win.winfo_id())
+        except Exception:
+            pass
+        ttk.Label(win, text="Task title:").pack(anchor="w", padx=10, pady=(10, 4))
+        title_entry = ttk.Entry(win)
+        title_entry.pack(fill=tk.X, padx=10)
+        title_entry.focus_set()
+        # Description
+        ttk.Label(win, text="Description (optional):").pack(anchor="w", padx=10, pady=(10, 4))
+        desc_txt = tk.Text(win, height=6, bg=CARD_BG, fg=FG, insertbackground=FG, wrap="word")
+        desc_txt.pack(fill=tk.BOTH, expand=True, padx=10)
+        # Allow Enter to confirm Add (on title field)
+        title_entry.bind("<Return>", lambda e: on_ok())
+        btns = ttk.Frame(win)
+        btns.pack(fill=tk.X, pady=10)
+        ttk.Button(btns, text="Cancel", command=win.destroy).pack(side=tk.RIGHT, padx=4)
+        ttk.Button(btns, text="Add", command=on_ok).pack(side=tk.RIGHT)
+
+    @instrumented("add_card")
+    def add_card(self, text: str, desc: str = ""):
+        card = self.model.add(self.title, text, desc)
+        return self._active.get(card.id)
+
+    def add_cards(self, items: Iterable) -> List[int]:
+        # Batch insert: accepts (title, desc) pairs, titles or saved dicts. The model
+        # sends one notification and this column lays out once at the end.
+        pairs = []
+        for it in items:
+            if isinstance(it, tuple):
+                it = {"title": it[0], "desc": it[1] if len(it) > 1 else ""}
+            title, desc, _, _ = BoardModel._parse_item(it, strip=True)
+            if title:
+                pairs.append((title, desc))
+        with self.suspend_layout():
+            cards = self.model.add_many(self.title, pairs)
+        return [c.id for c in cards]
+
+    def _clear_all(self):
+        # Confirm, then move all cards in this column to the board's archive (or
+        # delete them where there is none: shared boards)
+        app = self._get_app()
+        board = app.board
+        if board.model is self.model and board.archive() is not None:
+            if messagebox.askyesno("Clear", f"Move all tasks in '{self.title}' to the archive?"):
+                app.archive_cards(board, list(self.model.ids(self.title)))
+        elif messagebox.askyesno("Clear", f"Delete all tasks in '{self.title}'?"):
+            self.clear()
+
+    def get_cards_texts(self):
+        return [c.title for c in self.model.lane_cards(self.title)]
+
+    def get_cards_data(self):
+        model = self.model
+        return [{"title": c.title, "desc": model.desc_text(c, cache=False)} for c in model.lane_cards(self.title)]
+
+    def clear(self):
+        self.model.clear(self.title)
+
+    def _get_app(self):
+        w = self
+        while getattr(w, "master", None) is not None:
+            w = w.master
+        return w  # type: ignore
+
+class CardActions(ABC):
+    # What a card does, whichever renderer draws it (TaskCard, CanvasCard): View
+    # opens the edit dialog, Delete asks first, a press starts a drag. Renderers
+    # provide card_id and host(), the widget dialogs belong to.
+    card_id: int
+
+    @abstractmethod
+    def host(self) -> tk.Misc:
+        pass
+
+    def view(self):
+        model = self._get_app().model
+        card = model.get(self.card_id)
+        if card is None:
+            return
+        cid = card.id
+
+        def on_ok():
+            new_text = title_entry.get().strip()
+            new_desc = desc_txt.get("1.0", "end").strip()
+            win.destroy()
+            if new_text and model.get(cid) is not None:
+                model.edit(cid, new_text, new_desc)
+
+        def move_to_backlog():
+            new_text = title_entry.get().strip()
+            new_desc = desc_txt.get("1.0", "end").strip()
+            if not new_text:
                 try:
-                    self._get_app().save_state()
+                    messagebox.showwarning("Missing title", "Please enter a task title before moving to Backlog.")
                 except Exception:
                     pass
-        win = tk.Toplevel(self)
-        win.title(f"Add to {self.title}")
-        win.geometry("360x280")
-        # Try to darken the native title bar on Windows
+                return
+            # Move the card itself into the backlog lane, keeping its id
+            if model.get(cid) is not None:
+                with model.batch():
+                    model.edit(cid, new_text, new_desc)
+                    model.move(cid, BACKLOG)
+            # Close the view window
+            try:
+                win.destroy()
+            except Exception:
+                pass
+
+        win = tk.Toplevel(self.host())
+        win.title("View task")
+        win.geometry("420x340")
         try:
             self._get_app()._apply_dark_titlebar(win.winfo_id())
         except Exception:
             pass
         ttk.Label(win, text="Task title:").pack(anchor="w", padx=10, pady=(10, 4))
         title_entry = ttk.Entry(win)
+        title_entry.insert(0, card.title)
         title_entry.pack(fill=tk.X, padx=10)
         title_entry.focus_set()
-        # Description
-        ttk.Label(win, text="Description (optional):").pack(anchor="w", padx=10, pady=(10, 4))
-        desc_txt = tk.Text(win, height=6, bg=CARD_BG, fg=FG, insertbackground=FG, wrap="word")
+        ttk.Label(win, text="Description:").pack(anchor="w", padx=10, pady=(10, 4))
+        desc_txt = tk.Text(win, height=10, bg=CARD_BG, fg=FG, insertbackground=FG, wrap="word")
         desc_txt.pack(fill=tk.BOTH, expand=True, padx=10)
-        # Allow Enter to confirm Add (on title field)
+        # The body is read now, not kept with the card (BlobStore)
+        desc_txt.insert("1.0", model.desc_text(card))
         title_entry.bind("<Return>", lambda e: on_ok())
         btns = ttk.Frame(win)
         btns.pack(fill=tk.X, pady=10)
         ttk.Button(btns, text="Cancel", command=win.destroy).pack(side=tk.RIGHT, padx=4)
-        ttk.Button(btns, text="Add", command=on_ok).pack(side=tk.RIGHT)
-
-    def add_card(self, text: str, desc: str = ""):
-        card = TaskCard(self.inner, text=text, desc=desc)
-        card.pack(fill=tk.X, padx=8, pady=6)
-        card.update_idletasks()
-        return card
+        ttk.Button(btns, text="Save", command=on_ok).pack(side=tk.RIGHT)
+        ttk.Button(btns, text="Move to Backlog", command=move_to_backlog).pack(side=tk.LEFT)
 
-    def _clear_all(self):
-        # Confirm and clear all cards in this column
-        if messagebox.askyesno("Clear", f"Delete all tasks in '{self.title}'?"):
-            self.clear()
-            try:
-                self._get_app().save_state()
-            except Exception:
-                pass
+    def delete(self):
+        if messagebox.askyesno("Delete", "Delete this task?"):
+            model = self._get_app().model
+            if model.get(self.card_id) is not None:
+                model.remove(self.card_id)
 
-    def get_cards_texts(self):
-        texts = []
-        for child in self.inner.winfo_children():
-            if isinstance(child, TaskCard):
-                texts.append(child.text.get())
-        return texts
+    def _on_press(self, event):
+        self._get_app().drag.press(self, event)
 
-    def get_cards_data(self):
-        items = []
-        for child in self.inner.winfo_children():
-            if isinstance(child, TaskCard):
-                items.append({"title": child.text.get(), "desc": child.desc.get()})
-        return items
+    @instrumented("_on_drag")
+    def _on_drag(self, event):
+        self._get_app().input.motion(event.x_root, event.y_root)
 
-    def clear(self):
-        for child in list(self.inner.winfo_children()):
-            if isinstance(child, TaskCard):
-                child.destroy()
+    @instrumented("_on_release")
+    def _on_release(self, event):
+        app = self._get_app()
+        app.input.flush()
+        app.drag.release(event.x_root, event.y_root)
 
     def _get_app(self):
-        w = self
+        w = self.host()
         while getattr(w, "master", None) is not None:
             w = w.master
         return w  # type: ignore
 
-class TaskCard(tk.Frame):
-    def __init__(self, master, text: str, desc: str = ""):
+class TaskCard(CardActions, tk.Frame):
+    def __init__(self, master, card: Card):
         super().__init__(master, bg=CARD_BG, highlightthickness=1, highlightbackground=CARD_BORDER, bd=0)
-        self.text = tk.StringVar(value=text)
-        self.desc = tk.StringVar(value=desc)
+        # The model owns title/desc; the StringVar only feeds the label.
+        # Columns pool these widgets and rebind them to other cards as they scroll.
+        self.card_id = card.id
+        self.win_id = None  # canvas window item hosting this widget
+        self.text = tk.StringVar(value=card.title)
 
         # Title label
         self.lbl = tk.Label(
@@ -239,6 +4382,42 @@ class TaskCard(tk.Frame):
         self.btns.bind("<B1-Motion>", self._on_drag)
         self.btns.bind("<ButtonRelease-1>", self._on_release)
 
+    # Renderer interface (see ScrollableColumn._acquire; CanvasCard has the same)
+    def host(self) -> tk.Misc:
+        return self
+
+    def bind_card(self, card: Card):
+        self.card_id = card.id
+        self.text.set(card.title)
+        self._on_leave(None)
+
+    def set_title(self, title: str):
+        self.text.set(title)
+
+    def move_to(self, y: int):
+        self.master.coords(self.win_id, CARD_PAD_X, y)
+
+    def show(self, width: int):
+        self.master.itemconfigure(self.win_id, state="normal", width=width)
+        self.set_wrap(width)
+
+    def hide(self):
+        self.master.itemconfigure(self.win_id, state="hidden")
+
+    def resize(self, width: int):
+        self.master.itemconfigure(self.win_id, width=width)
+        self.set_wrap(width)
+
+    def height(self) -> int:
+        # Valid once idle tasks have run (the column calls update_idletasks)
+        return self.winfo_reqheight()
+
+    def set_wrap(self, width: int):
+        try:
+            self.lbl.configure(wraplength=max(100, width - 20))
+        except Exception:
+            pass
+
     def _on_resize(self, event):
         # Adjust wraplength for the label to fit the card width
         try:
@@ -257,147 +4436,254 @@ class TaskCard(tk.Frame):
         self.lbl.configure(bg=CARD_BG, fg=FG)
         self.btns.configure(bg=CARD_BG)
 
-    def view(self):
-        def on_ok():
-            new_text = title_entry.get().strip()
-            new_desc = desc_txt.get("1.0", "end").strip()
-            win.destroy()
-            if new_text:
-                self.text.set(new_text)
-                self.desc.set(new_desc)
-                try:
-                    self._get_app().save_state()
-                except Exception:
-                    pass
+class CanvasCard(CardActions):
+    # A card drawn straight onto its column's canvas: background, title, and two
+    # buttons (outline + label), six items sharing one tag per card, instead of a
+    # Frame, Label, button row and two ttk.Buttons with their own bindings. The
+    # column binds Enter/Leave/press once for the "card" tag and hit-tests the
+    # buttons itself; hover is a single itemconfigure of the background.
+    # Measuring needs no idle pass: the title's bbox is known as soon as it is set.
+    _serial = 0
 
-        def move_to_backlog():
-            new_text = title_entry.get().strip()
-            new_desc = desc_txt.get("1.0", "end").strip()
-            if not new_text:
-                try:
-                    messagebox.showwarning("Missing title", "Please enter a task title before moving to Backlog.")
-                except Exception:
-                    pass
-                return
-            app = self._get_app()
-            # Add to backlog
-            try:
-                if hasattr(app, "backlog") and app.backlog:
-                    app.backlog.add_item(new_text, new_desc)
-            except Exception:
-                pass
-            # Remove this card from its column
-            try:
-                self.destroy()
-            except Exception:
-                pass
-            # Close the view window and persist
-            try:
-                win.destroy()
-            except Exception:
-                pass
-            try:
-                app.save_state()
-            except Exception:
-                pass
+    def __init__(self, column: "ScrollableColumn", card: Card, width: int):
+        CanvasCard._serial += 1
+        self.tag = f"card{CanvasCard._serial}"
+        self.column = column
+        self.canvas = c = column.canvas
+        self.card_id = card.id
+        self.width = width
+        self.y = 0
+        self._height = 0
+        tags = ("card", self.tag)
+        font = "TkDefaultFont"
+        self.bg = c.create_rectangle(0, 0, 0, 0, fill=CARD_BG, outline=CARD_BORDER, tags=tags)
+        self.text = c.create_text(0, 0, text=card.title, fill=FG, anchor="nw", justify=tk.LEFT, font=font, tags=tags)
+        self.view_box = c.create_rectangle(0, 0, 0, 0, fill=CARD_BG, outline=BUTTON_BORDER, tags=tags)
+        self.view_lbl = c.create_text(0, 0, text="View", fill=FG, font=font, tags=tags)
+        self.del_box = c.create_rectangle(0, 0, 0, 0, fill=CARD_BG, outline=BUTTON_BORDER, tags=tags)
+        self.del_lbl = c.create_text(0, 0, text="Delete", fill=FG, font=font, tags=tags)
+        for item in (self.bg, self.text, self.view_box, self.view_lbl, self.del_box, self.del_lbl):
+            column._card_items[item] = self
+        self._layout()
 
-        win = tk.Toplevel(self)
-        win.title("View task")
-        win.geometry("420x340")
-        try:
-            self._get_app()._apply_dark_titlebar(win.winfo_id())
-        except Exception:
-            pass
-        ttk.Label(win, text="Task title:").pack(anchor="w", padx=10, pady=(10, 4))
-        title_entry = ttk.Entry(win)
-        title_entry.insert(0, self.text.get())
-        title_entry.pack(fill=tk.X, padx=10)
-        title_entry.focus_set()
-        ttk.Label(win, text="Description:").pack(anchor="w", padx=10, pady=(10, 4))
-        desc_txt = tk.Text(win, height=10, bg=CARD_BG, fg=FG, insertbackground=FG, wrap="word")
-        desc_txt.pack(fill=tk.BOTH, expand=True, padx=10)
-        desc_txt.insert("1.0", self.desc.get())
-        title_entry.bind("<Return>", lambda e: on_ok())
-        btns = ttk.Frame(win)
-        btns.pack(fill=tk.X, pady=10)
-        ttk.Button(btns, text="Cancel", command=win.destroy).pack(side=tk.RIGHT, padx=4)
-        ttk.Button(btns, text="Save", command=on_ok).pack(side=tk.RIGHT)
-        ttk.Button(btns, text="Move to Backlog", command=move_to_backlog).pack(side=tk.LEFT)
+    def host(self) -> tk.Misc:
+        return self.canvas
 
-    def delete(self):
-        if messagebox.askyesno("Delete", "Delete this task?"):
-            self.destroy()
-            try:
-                self._get_app().save_state()
-            except Exception:
-                pass
+    def _layout(self):
+        # Same geometry as TaskCard: 1px border, label padding 8/6, buttons 6px in
+        c = self.canvas
+        x, y, w = CARD_PAD_X, self.y, self.width
+        bw, bh = self.column.button_size()
+        c.itemconfigure(self.text, width=max(100, w - 20))
+        c.coords(self.text, x + 9, y + 7)
+        box = c.bbox(self.text)
+        th = box[3] - box[1] if box else bh
+        by = y + th + 13
+        c.coords(self.view_box, x + 7, by, x + 7 + bw, by + bh)
+        c.coords(self.view_lbl, x + 7 + bw // 2, by + bh // 2)
+        c.coords(self.del_box, x + w - 7 - bw, by, x + w - 7, by + bh)
+        c.coords(self.del_lbl, x + w - 7 - bw // 2, by + bh // 2)
+        self._height = by + bh + 7 - y
+        c.coords(self.bg, x, y, x + w - 1, y + self._height - 1)
 
-    def _on_press(self, event):
-        app = self._get_app()
-        app.drag.card = self
-        self.update_idletasks()
-        x = self.winfo_rootx()
-        y = self.winfo_rooty()
-        app.drag.offset_x = event.x
-        app.drag.offset_y = event.y
-        ghost = tk.Toplevel(self)
-        ghost.overrideredirect(True)
-        ghost.attributes("-alpha", 0.85)
-        ghost.configure(bg=CARD_BG)
-        lbl = tk.Label(
-            ghost,
-            text=self.text.get(),
-            bg=CARD_BG,
-            fg=FG,
-            padx=10,
-            pady=6,
-            justify=tk.LEFT,
-            wraplength=240,
-        )
-        lbl.pack()
-        ghost.geometry(f"+{x}+{y}")
-        app.drag.ghost = ghost
+    # Renderer interface (see TaskCard)
+    def bind_card(self, card: Card):
+        # Laid out by show(): hidden items have no bbox to measure
+        self.card_id = card.id
+        self.canvas.itemconfigure(self.text, text=card.title)
+        self.hover(False)
 
-    def _on_drag(self, event):
-        app = self._get_app()
-        if app.drag.ghost is None:
-            return
-        gx = self.winfo_pointerx() - app.drag.offset_x
-        gy = self.winfo_pointery() - app.drag.offset_y
-        app.drag.ghost.geometry(f"+{gx}+{gy}")
+    def set_title(self, title: str):
+        self.canvas.itemconfigure(self.text, text=title)
+        self._layout()
 
-    def _on_release(self, _):
-        app = self._get_app()
-        ghost = app.drag.ghost
-        if ghost is None:
-            return
-        px, py = self.winfo_pointerx(), self.winfo_pointery()
-        target_col = app.column_under_pointer(px, py)
-        ghost.destroy()
-        app.drag.ghost = None
-        app.drag.card = None
-        if target_col is not None:
-            text = self.text.get()
-            desc = self.desc.get()
-            self.destroy()
-            app.add_card_to_column(target_col, text, desc)
+    def move_to(self, y: int):
+        if y != self.y:
+            self.canvas.move(self.tag, 0, y - self.y)
+            self.y = y
+
+    def show(self, width: int):
+        self.canvas.itemconfigure(self.tag, state="normal")
+        self.resize(width)
+
+    def hide(self):
+        self.canvas.itemconfigure(self.tag, state="hidden")
+
+    def resize(self, width: int):
+        self.width = width
+        self._layout()
+
+    def height(self) -> int:
+        return self._height
+
+    def hover(self, on: bool):
+        self.canvas.itemconfigure(self.bg, fill=CARD_HOVER if on else CARD_BG)
+
+    def button_at(self, x: float, y: float) -> Optional[str]:
+        # "view" or "delete" if canvas point (x, y) is on that button
+        for name, item in (("view", self.view_box), ("delete", self.del_box)):
+            x1, y1, x2, y2 = self.canvas.coords(item)
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                return name
+        return None
+
+    def press_button(self, name: str, down: bool):
+        item = self.view_box if name == "view" else self.del_box
+        self.canvas.itemconfigure(item, fill=BUTTON_PRESSED if down else CARD_BG)
+
+    # What DragState.press reads from a card widget
+    def winfo_rootx(self) -> int:
+        return self.canvas.winfo_rootx() + int(CARD_PAD_X - self.canvas.canvasx(0))
+
+    def winfo_rooty(self) -> int:
+        return self.canvas.winfo_rooty() + int(self.y - self.canvas.canvasy(0))
+
+    def winfo_width(self) -> int:
+        return self.width
+
+class VirtualList(tk.Frame):
+    # Canvas-backed list that only draws the rows in view, reusing a small pool of
+    # canvas items. Rows are ids; `label_for(id)` supplies the text. Selection is
+    # kept by id with extended semantics: click, Ctrl+click, Shift+click, Ctrl+A.
+    def __init__(self, master, label_for: Callable[[int], str], on_select: Optional[Callable[[], None]] = None):
+        super().__init__(master, bg=CARD_BG, highlightthickness=1, highlightbackground=CARD_BORDER, bd=0)
+        self.label_for = label_for
+        self.on_select = on_select
+        self.rows: List[int] = []
+        self.selection: set = set()
+        self._anchor: Optional[int] = None
+        self._items: List[tuple] = []   # pooled (background rect, text) canvas items
+        self._job = None
+        self._last_view = None   # last (first, last) from yscrollcommand
+        self._region = None      # scrollregion last set
+
+        self.canvas = tk.Canvas(self, bg=CARD_BG, highlightthickness=0, takefocus=1)
+        self.vbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+        self.canvas.bind("<ButtonPress-1>", self._on_click)
+        self.canvas.bind("<Control-a>", self._select_all)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self._scroll(3 if NATURAL_SCROLL else -3))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll(-3 if NATURAL_SCROLL else 3))
+
+    def _on_yscroll(self, first, last):
+        # Setting the scrollregion in _redraw calls this again; only an actual
+        # change of view needs another redraw
+        self.vbar.set(first, last)
+        if (first, last) != self._last_view:
+            self._last_view = (first, last)
+            self.refresh()
+
+    def set_rows(self, rows: List[int]):
+        self.rows = rows
+        self.refresh()
+
+    def refresh(self):
+        if self._job is None:
+            self._job = self.after_idle(self._redraw)
+
+    def destroy(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
+
+    def _redraw(self):
+        self._job = None
+        c = self.canvas
+        h = LIST_ROW_HEIGHT
+        n = len(self.rows)
+        width = max(c.winfo_width(), 1)
+        region = (0, 0, width, max(n * h, 1))
+        if region != self._region:
+            self._region = region
+            c.configure(scrollregion=region)
+        top = c.canvasy(0)
+        first = max(0, int(top // h))
+        last = min(n, int((top + max(c.winfo_height(), 1)) // h) + 1)
+        while len(self._items) < last - first:
+            rect = c.create_rectangle(0, 0, 0, 0, width=0)
+            text = c.create_text(0, 0, anchor="w", fill=FG)
+            self._items.append((rect, text))
+        for k, i in enumerate(range(first, last)):
+            cid = self.rows[i]
+            rect, text = self._items[k]
+            y = i * h
+            c.coords(rect, 0, y, width, y + h)
+            c.itemconfigure(rect, fill=LIST_SELECT_BG if cid in self.selection else CARD_BG, state="normal")
+            c.coords(text, 6, y + h / 2)
+            c.itemconfigure(text, text=self.label_for(cid), state="normal")
+        for rect, text in self._items[last - first:]:
+            c.itemconfigure(rect, state="hidden")
+            c.itemconfigure(text, state="hidden")
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        i = int(self.canvas.canvasy(event.y) // LIST_ROW_HEIGHT)
+        if not 0 <= i < len(self.rows):
+            return
+        cid = self.rows[i]
+        toggle = event.state & (0x0008 if sys.platform == "darwin" else 0x0004)
+        extend = event.state & 0x0001
+        if extend and self._anchor in self.selection:
             try:
-                app.save_state()
-            except Exception:
-                pass
+                j = self.rows.index(self._anchor)
+            except ValueError:
+                j = i
+            lo, hi = min(i, j), max(i, j)
+            if not toggle:
+                self.selection = set()
+            self.selection.update(self.rows[lo:hi + 1])
+        elif toggle:
+            self.selection.symmetric_difference_update((cid,))
+            self._anchor = cid
+        else:
+            self.selection = {cid}
+            self._anchor = cid
+        self.refresh()
+        if self.on_select is not None:
+            self.on_select()
 
-    def _get_app(self):
-        w = self
-        while getattr(w, "master", None) is not None:
-            w = w.master
-        return w  # type: ignore
+    def _select_all(self, _=None):
+        self.selection = set(self.rows)
+        self.refresh()
+        if self.on_select is not None:
+            self.on_select()
+        return "break"
+
+    def _on_wheel(self, event):
+        # Same direction as the columns (see App._on_global_mousewheel)
+        notches = float(event.delta) if sys.platform == "darwin" else event.delta / 120.0
+        if not NATURAL_SCROLL:
+            notches = -notches
+        if notches:
+            self._scroll(int(notches) if abs(notches) >= 1 else (1 if notches > 0 else -1))
+        return "break"
+
+    def _scroll(self, rows: int):
+        self.canvas.yview_scroll(rows, "units")
+        return "break"
+
+    def selected_ids(self) -> List[int]:
+        # Selected rows in display order
+        sel = self.selection
+        if not sel:
+            return []
+        return [cid for cid in self.rows if cid in sel]
+
+    def prune(self, alive: Callable[[int], bool]):
+        self.selection = {cid for cid in self.selection if alive(cid)}
 
 class BacklogPanel(ttk.Frame):
-    def __init__(self, master, on_move_to_todo):
+    def __init__(self, master, model: BoardModel):
         super().__init__(master, padding=(6, 6, 6, 6))
-        self.on_move_to_todo = on_move_to_todo
-        # Parallel list to store descriptions for listbox items
-        self._backlog_desc = []
+        self.model = model
+        # Search filter: only card ids in this set are listed (None lists all)
+        self._filter: Optional[set] = None
 
         ttk.Label(self, text="Backlog", font=("Segoe UI", 11, "bold"), foreground=FG).pack(anchor="w")
 
@@ -416,130 +4702,761 @@ class BacklogPanel(ttk.Frame):
         self.desc_txt = tk.Text(desc_row, height=4, bg=CARD_BG, fg=FG, insertbackground=FG, wrap="word")
         self.desc_txt.pack(fill=tk.BOTH, expand=True)
 
-        list_frame = ttk.Frame(self)
-        list_frame.pack(fill=tk.BOTH, expand=True)
-        self.listbox = tk.Listbox(
-            list_frame,
-            height=20,
-            bg=CARD_BG,
-            fg=FG,
-            selectbackground="#334155",
-            selectforeground=FG,
-            highlightthickness=1,
-            highlightbackground=CARD_BORDER,
-            relief="flat",
-        )
-        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        sb = ttk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
-        sb.pack(side=tk.RIGHT, fill=tk.Y)
-        self.listbox.configure(yscrollcommand=sb.set)
+        # Rows are drawn on demand; selection is by card id (Ctrl/Shift+click, Ctrl+A)
+        self.list = VirtualList(self, label_for=self._label_for, on_select=self._update_count)
+        self.list.pack(fill=tk.BOTH, expand=True)
+        self.list.canvas.bind("<Delete>", lambda e: self._delete_selected())
+
+        btns = ttk.Frame(self)
+        btns.pack(fill=tk.X, pady=(6, 0))
+        ttk.Button(btns, text="To To-Do", command=self._move_selected_to_todo).pack(side=tk.LEFT)
+        ttk.Button(btns, text="Up", width=5, command=lambda: self._reorder_selected(-1)).pack(side=tk.LEFT, padx=(12, 0))
+        ttk.Button(btns, text="Down", width=5, command=lambda: self._reorder_selected(1)).pack(side=tk.LEFT, padx=(4, 0))
+        self.count_lbl = ttk.Label(btns, text="")
+        self.count_lbl.pack(side=tk.LEFT, padx=(12, 0))
+        ttk.Button(btns, text="Delete", command=self._delete_selected).pack(side=tk.RIGHT)
+
+        self.model.subscribe(self._on_model_change)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+        self._rebuild()
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.model.unsubscribe(self._on_model_change)
+
+    def _in_backlog(self, cid: int) -> bool:
+        card = self.model.get(cid)
+        return card is not None and card.lane == BACKLOG
+
+    def _label_for(self, cid: int) -> str:
+        card = self.model.get(cid)
+        return card.title if card is not None else ""
+
+    def _on_model_change(self, events: List[dict]):
+        relist = False
+        redraw = False
+        for ev in events:
+            op = ev["op"]
+            if op == "reset":
+                relist = True
+            elif ev.get("lane") == BACKLOG or ev.get("from_lane") == BACKLOG:
+                relist = True
+            elif op == "edit":
+                redraw = True
+        if relist:
+            self._rebuild()
+        elif redraw:
+            self.list.refresh()
+
+    def _rebuild(self):
+        ids = self.model.ids(BACKLOG)
+        if self._filter is not None:
+            keep = self._filter
+            ids = [cid for cid in ids if cid in keep]
+        # Unfiltered, the list reads the model's lane order directly (no copy)
+        self.list.set_rows(ids)
+        self.list.prune(self._in_backlog)
+        self._update_count()
+
+    def _update_count(self):
+        n = len(self.list.selection)
+        total = len(self.list.rows)
+        self.count_lbl.configure(text=f"{n:,} of {total:,} selected" if n else f"{total:,} items")
+
+    def set_filter(self, ids: Optional[set]):
+        self._filter = ids
+        self._rebuild()
+
+    def add_item(self, title: str, desc: str = ""):
+        title = (title or "").strip()
+        if not title:
+            return
+        self.model.add(BACKLOG, title, desc or "")
+
+    def _add(self):
+        text = self.entry.get().strip()
+        desc = self.desc_txt.get("1.0", "end").strip()
+        if text:
+            self.model.add(BACKLOG, text, desc)
+            self.entry.delete(0, tk.END)
+            self.desc_txt.delete("1.0", "end")
+
+    def _move_selected_to_todo(self):
+        # One batch: one notification, one persisted write
+        ids = self.list.selected_ids()
+        if not ids:
+            return
+        with self.model.batch():
+            for cid in ids:
+                self.model.move(cid, "To-Do")
+
+    def _delete_selected(self):
+        ids = self.list.selected_ids()
+        if not ids:
+            return
+        if len(ids) > 1 and not messagebox.askyesno("Delete", f"Delete {len(ids):,} backlog items?"):
+            return
+        with self.model.batch():
+            for cid in ids:
+                self.model.remove(cid)
+
+    def _reorder_selected(self, step: int):
+        # Shift the selected items up (-1) or down (+1) one place as a block;
+        # items already packed against the edge stay put
+        sel = self.list.selection
+        if not sel:
+            return
+        model = self.model
+        positions = sorted(model.index_of(cid) for cid in sel if self._in_backlog(cid))
+        lane = model.ids(BACKLOG)
+        with model.batch():
+            if step < 0:
+                limit = 0
+                for i in positions:
+                    if i > limit:
+                        model.move(lane[i], BACKLOG, i - 1)
+                    else:
+                        limit = i + 1
+            else:
+                limit = len(lane) - 1
+                for i in reversed(positions):
+                    if i < limit:
+                        model.move(lane[i], BACKLOG, i + 1)
+                    else:
+                        limit = i - 1
+
+    def get_items(self):
+        model = self.model
+        return [{"title": c.title, "desc": model.desc_text(c, cache=False)} for c in model.lane_cards(BACKLOG)]
+
+    def set_items(self, items):
+        pairs = []
+        for it in items:
+            title, desc, _, _ = BoardModel._parse_item(it, strip=False)
+            if title:
+                pairs.append((title, desc))
+        with self.model.batch():
+            self.model.clear(BACKLOG)
+            self.model.add_many(BACKLOG, pairs)
+
+    def _get_app(self):
+        w = self
+        while getattr(w, "master", None) is not None:
+            w = w.master
+        return w  # type: ignore
+
+class ArchiveBrowser(tk.Toplevel):
+    # A board's archive, newest first, filtered by title as you type. Restore puts
+    # the selected cards back on the board. Cards already on the board are not
+    # listed, so restoring (or undoing a clear) takes them off the list.
+    def __init__(self, app: "App", board: "OpenBoard"):
+        super().__init__(app)
+        self.app = app
+        self.board = board
+        self.entries: Dict[int, dict] = {}
+        self.title(f"Archive - {board.name}")
+        self.geometry("560x480")
+        self.configure(bg=APP_BG)
+        try:
+            app._apply_dark_titlebar(self.winfo_id())
+        except Exception:
+            pass
+
+        find_row = ttk.Frame(self, padding=(10, 10, 10, 6))
+        find_row.pack(fill=tk.X)
+        ttk.Label(find_row, text="Find:").pack(side=tk.LEFT)
+        self.query = tk.StringVar()
+        entry = ttk.Entry(find_row, textvariable=self.query)
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(6, 0))
+        entry.focus_set()
+        self.query.trace_add("write", lambda *_: self._rebuild())
+
+        self.list = VirtualList(self, label_for=self._label_for, on_select=self._update_count)
+        self.list.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        btns = ttk.Frame(self, padding=(10, 6, 10, 10))
+        btns.pack(fill=tk.X)
+        ttk.Button(btns, text="Restore", command=self._restore_selected).pack(side=tk.LEFT)
+        self.count_lbl = ttk.Label(btns, text="")
+        self.count_lbl.pack(side=tk.LEFT, padx=(12, 0))
+        ttk.Button(btns, text="Close", command=self.destroy).pack(side=tk.RIGHT)
+
+        board.model.subscribe(self._on_model_change)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+        self.reload()
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.board.model.unsubscribe(self._on_model_change)
+            if self.app._archive_view is self:
+                self.app._archive_view = None
+
+    def reload(self):
+        # Read the index again (new cards were archived)
+        try:
+            entries = self.board.archive().entries()
+        except OSError as e:
+            entries = []
+            try:
+                messagebox.showwarning("Archive", f"Could not read the archive: {e}", parent=self)
+            except Exception:
+                pass
+        self.entries = {e["id"]: e for e in entries}
+        self._rebuild()
+
+    def _on_model_change(self, events: List[dict]):
+        # Only cards appearing or leaving change what is listed
+        if any(ev["op"] in ("add", "remove", "reset") for ev in events):
+            self._rebuild()
+
+    def _rebuild(self):
+        on_board = self.board.model.cards
+        needle = self.query.get().strip().lower()
+        rows = [cid for cid, e in self.entries.items()
+                if cid not in on_board and (not needle or needle in e["title"].lower())]
+        self.list.set_rows(rows)
+        self.list.prune(lambda cid: cid in self.entries and cid not in on_board)
+        self._update_count()
+
+    def _label_for(self, cid: int) -> str:
+        e = self.entries.get(cid)
+        if e is None:
+            return ""
+        when = time.strftime("%Y-%m-%d", time.localtime(e.get("at", 0)))
+        return f"{e['title']}    ({e.get('lane', DONE_LANE)}, {when})"
+
+    def _update_count(self):
+        n = len(self.list.selection)
+        total = len(self.list.rows)
+        self.count_lbl.configure(text=f"{n:,} of {total:,} selected" if n else f"{total:,} archived")
+
+    def _restore_selected(self):
+        entries = [self.entries[cid] for cid in self.list.selected_ids() if cid in self.entries]
+        if entries:
+            self.app.restore_archived(self.board, entries)
+
+class AnalyticsPanel(ttk.Frame):
+    # Cumulative flow, time in column, throughput, and cycle and lead times of a
+    # board, from its TransitionLog. The log is read and aggregated by a process
+    # job (read_flow_stats); blocks recorded meanwhile are held back and added
+    # when it is done, later ones as they come. Redraws are debounced.
+    def __init__(self, master, model: BoardModel, flow: Optional[TransitionLog], runner: "JobRunner"):
+        super().__init__(master, padding=(6, 6, 6, 6))
+        self.model = model
+        self.flow = flow
+        self.runner = runner
+        self.stats: Optional[FlowStats] = None
+        self._held: Optional[list] = None   # blocks recorded while the log is read
+        self._job: Optional[Job] = None
+        self._redraw_job = None
+
+        top = ttk.Frame(self)
+        top.pack(fill=tk.X)
+        ttk.Label(top, text="Analytics", font=("Segoe UI", 11, "bold"), foreground=FG).pack(side=tk.LEFT)
+        self.status = ttk.Label(top, text="")
+        self.status.pack(side=tk.LEFT, padx=(12, 0))
+        self.range_var = tk.StringVar(value=ANALYTICS_RANGES[0][0])
+        box = ttk.Combobox(top, textvariable=self.range_var, state="readonly", width=14,
+                           values=[name for name, _ in ANALYTICS_RANGES])
+        box.pack(side=tk.RIGHT)
+        box.bind("<<ComboboxSelected>>", lambda e: self.redraw())
+        ttk.Label(top, text="Range:").pack(side=tk.RIGHT, padx=(0, 6))
+        ttk.Button(top, text="Reload", command=self.reload).pack(side=tk.RIGHT, padx=(0, 12))
+
+        self.chart = tk.Canvas(self, height=280, bg=APP_BG, highlightthickness=0)
+        self.chart.pack(fill=tk.X, pady=(6, 6))
+        self.table = tk.Text(self, height=14, bg=CARD_BG, fg=FG, wrap="none", font=("Consolas", 10))
+        self.table.pack(fill=tk.BOTH, expand=True)
+        self.table.configure(state="disabled")
+
+        # Lane counts change with loads and syncs too, not only with what is logged
+        self.model.subscribe(self._on_model_change)
+        self.chart.bind("<Configure>", lambda e: self._schedule_redraw())
+        self.bind("<Map>", lambda e: self._schedule_redraw())
+        self.bind("<Destroy>", self._on_destroy, add="+")
+        self.reload()
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.model.unsubscribe(self._on_model_change)
+            if self.flow is not None:
+                self.flow.unsubscribe(self._on_records)
+            if self._job is not None:
+                self.runner.cancel(self._job, notify=False)
+            if self._redraw_job is not None:
+                self.after_cancel(self._redraw_job)
+
+    def reload(self):
+        # Read the whole log again (it also holds what other windows recorded)
+        if self.flow is None:
+            self.status.configure(text="No history is kept here for shared boards")
+            self._schedule_redraw()
+            return
+        if self._held is not None:
+            return
+        # Blocks are recorded on this thread, so none can fall between the
+        # subscription and tail(): each is either within `limit`, still buffered
+        # (held from the start), or recorded later and held
+        self.flow.unsubscribe(self._on_records)
+        self.flow.subscribe(self._on_records)
+        limit, self._held = self.flow.tail()
+        self.status.configure(text="Reading history...")
+        self._job = self.runner.submit("Reading board history", read_flow_stats, self.flow.path,
+                                       limit, cpu=True, on_done=self._loaded, on_error=self._failed)
+
+    def _loaded(self, stats: FlowStats):
+        self._job = None
+        held, self._held = self._held, None
+        for block in held:
+            stats.add_block(*block)
+        self.stats = stats
+        self.status.configure(text=f"{stats.records:,} column changes")
+        self.redraw()
+
+    def _failed(self, error: Exception):
+        self._job = None
+        self._held = None
+        self.flow.unsubscribe(self._on_records)
+        if isinstance(error, JobCancelled):
+            self.status.configure(text="Cancelled (Reload to read the history)")
+        else:
+            self.status.configure(text=f"Could not read the history: {error}")
+
+    def _on_records(self, times, ids, src, dst):
+        if self._held is not None:
+            self._held.append((times, ids, src, dst))
+        elif self.stats is not None:
+            self.stats.add_block(times, ids, src, dst)
+            self.status.configure(text=f"{self.stats.records:,} column changes")
+            self._schedule_redraw()
+
+    def _on_model_change(self, events: List[dict]):
+        self._schedule_redraw()
+
+    def _schedule_redraw(self):
+        if self._redraw_job is None:
+            self._redraw_job = self.after(ANALYTICS_REFRESH_MS, self.redraw)
+
+    def redraw(self):
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+            self._redraw_job = None
+        if not self.winfo_ismapped():
+            return   # drawn again on <Map>
+        stats = self.stats or FlowStats()
+        today = stats.day(time.time())
+        span = dict(ANALYTICS_RANGES).get(self.range_var.get())
+        if span is None:
+            first = min(stats.arrive, default=today)
+        else:
+            first = today - span + 1
+        days = list(range(first, today + 1))
+        since = stats.day_start(first)
+        current = [len(self.model.ids(lane)) for lane in stats.lanes]
+        arrived, wip = stats.series(days, current)
+        self._draw_chart(stats, days, arrived, wip)
+        self._fill_table(stats, days, since, current)
+
+    def _draw_chart(self, stats: FlowStats, days: List[int], arrived, wip):
+        # Stacked bands, one per lane: cards finished so far at the bottom, then
+        # the cards in each other lane, working back from Complete to the backlog
+        c = self.chart
+        c.delete("all")
+        w, h = c.winfo_width(), c.winfo_height()
+        left, right, top, bottom = 44, 12, 28, 22
+        pw, ph = w - left - right, h - top - bottom
+        if pw < 20 or ph < 20:
+            return
+        done = stats.done
+        order = [done] + [i for i in reversed(range(len(stats.lanes))) if i != done]
+        rows = [[arrived[k][done]] + [wip[k][i] for i in order[1:]] for k in range(len(days))]
+        if len(rows) == 1:
+            rows, days = rows * 2, days * 2   # a single day spans the width
+        peak = max((sum(r) for r in rows), default=0) or 1
+        n = len(days)
+
+        def x(k):
+            return left + pw * k / (n - 1)
+
+        def y(v):
+            return top + ph - ph * v / peak
+
+        base = [0] * n
+        for band, lane in enumerate(order):
+            upper = [b + rows[k][band] for k, b in enumerate(base)]
+            if any(upper[k] != base[k] for k in range(n)):
+                pts = [(x(k), y(v)) for k, v in enumerate(upper)]
+                pts += [(x(k), y(base[k])) for k in reversed(range(n))]
+                c.create_polygon(*[v for p in pts for v in p], fill=ANALYTICS_COLORS.get(stats.lanes[lane], FG),
+                                 outline="")
+            base = upper
+
+        axis = "#6B7280"
+        c.create_line(left, top, left, top + ph, left + pw, top + ph, fill=axis)
+        c.create_text(left - 6, top, text=f"{peak:,}", anchor="e", fill=FG)
+        c.create_text(left - 6, top + ph, text="0", anchor="e", fill=FG)
+        for k, anchor in ((0, "nw"), (n - 1, "ne")):
+            # Day numbers count local days, so they read back through gmtime
+            c.create_text(x(k), top + ph + 4, text=time.strftime("%Y-%m-%d", time.gmtime(days[k] * 86400)),
+                          anchor=anchor, fill=FG)
+        lx = left
+        for lane in reversed(order):
+            name = stats.lanes[lane]
+            c.create_rectangle(lx, 8, lx + 10, 18, fill=ANALYTICS_COLORS.get(name, FG), outline="")
+            label = c.create_text(lx + 14, 13, text=name, anchor="w", fill=FG)
+            lx = c.bbox(label)[2] + 14
+
+    def _fill_table(self, stats: FlowStats, days: List[int], since: float, current: List[int]):
+        zero = [0] * len(stats.lanes)
+        arrived = [sum(col) for col in zip(*[stats.arrive.get(d, zero) for d in days])] or zero
+        left = [sum(col) for col in zip(*[stats.leave.get(d, zero) for d in days])] or zero
+        lines = [f"{'Column':<14}{'Now':>7}{'In':>8}{'Out':>8}{'Visits':>9}{'p50':>9}{'p85':>9}{'p95':>9}"]
+        for i, name in enumerate(stats.lanes):
+            spent = stats.visits(i, since)
+            p50, p85, p95 = (format_span(v) for v in percentiles(spent, [50, 85, 95]))
+            lines.append(f"{name:<14}{current[i]:>7,}{arrived[i]:>8,}{left[i]:>8,}{len(spent):>9,}"
+                         f"{p50:>9}{p85:>9}{p95:>9}")
+        lines.append("")
+        finished = arrived[stats.done]
+        week = sum(stats.arrive.get(d, zero)[stats.done] for d in days[-7:])
+        lines.append(f"Throughput: {finished:,} finished, {finished / max(1, len(days)):.1f} per day; "
+                     f"{week:,} in the last 7 days")
+        for label, spans in ((f"Cycle time ({FLOW_START_LANE} to {DONE_LANE})", stats.cycle_times(since)),
+                             (f"Lead time (created to {DONE_LANE})", stats.lead_times(since))):
+            p50, p85, p95 = (format_span(v) for v in percentiles(spans, [50, 85, 95]))
+            lines.append(f"{label}: p50 {p50}, p85 {p85}, p95 {p95} ({len(spans):,} cards)")
+        lines.append("")
+        lines.append("Time in column is per visit, for visits that ended in the range.")
+        self.table.configure(state="normal")
+        self.table.delete("1.0", tk.END)
+        self.table.insert("1.0", "\n".join(lines))
+        self.table.configure(state="disabled")
+
+class ViewsPanel(ttk.Frame):
+    # Saved views over a board: pick one, or change the filters, and the cards
+    # that match are listed in its order, selected from the board's CardIndexes
+    # rather than by scanning the columns. Listed again as the board changes.
+    AGE_FIELDS = [(None, "Any time")] + [(f, label) for f, label in VIEW_SORTS if f in VIEW_TIMES]
+    AGE_OPS = [("older_than_days", "older than"), ("newer_than_days", "within")]
+
+    def __init__(self, master, app: "App", board: "OpenBoard"):
+        super().__init__(master, padding=(6, 6, 6, 6))
+        self.app = app
+        self.board = board
+        self.store: ViewStore = app.view_store
+        self._job = None
+        self._now = time.time()
+
+        top = ttk.Frame(self)
+        top.pack(fill=tk.X)
+        ttk.Label(top, text="Views", font=("Segoe UI", 11, "bold"), foreground=FG).pack(side=tk.LEFT)
+        self.name_var = tk.StringVar()
+        self.name_box = ttk.Combobox(top, textvariable=self.name_var, state="readonly", width=28)
+        self.name_box.pack(side=tk.LEFT, padx=(12, 0))
+        self.name_box.bind("<<ComboboxSelected>>", lambda e: self._open(self.name_var.get()))
+        ttk.Button(top, text="Delete", command=self._delete).pack(side=tk.RIGHT)
+        ttk.Button(top, text="Save as...", command=self._save_as).pack(side=tk.RIGHT, padx=(0, 6))
 
-        btns = ttk.Frame(self)
-        btns.pack(fill=tk.X, pady=(6, 0))
-        ttk.Button(btns, text="To To-Do", command=self._move_selected_to_todo).pack(side=tk.LEFT)
-        ttk.Button(btns, text="Delete", command=self._delete_selected).pack(side=tk.RIGHT)
+        row = ttk.Frame(self)
+        row.pack(fill=tk.X, pady=(6, 0))
+        ttk.Label(row, text="Contains:").pack(side=tk.LEFT)
+        self.query_var = tk.StringVar()
+        ttk.Entry(row, textvariable=self.query_var, width=28).pack(side=tk.LEFT, padx=(6, 12))
+        ttk.Label(row, text="Column:").pack(side=tk.LEFT)
+        self.lane_var = tk.StringVar(value="Any")
+        ttk.Combobox(row, textvariable=self.lane_var, state="readonly", width=12,
+                     values=["Any"] + LANES).pack(side=tk.LEFT, padx=(6, 0))
 
-    def add_item(self, title: str, desc: str = ""):
-        title = (title or "").strip()
-        if not title:
+        row = ttk.Frame(self)
+        row.pack(fill=tk.X, pady=(6, 6))
+        self.age_var = tk.StringVar(value=self.AGE_FIELDS[0][1])
+        ttk.Combobox(row, textvariable=self.age_var, state="readonly", width=15,
+                     values=[label for _, label in self.AGE_FIELDS]).pack(side=tk.LEFT)
+        self.op_var = tk.StringVar(value=self.AGE_OPS[0][1])
+        ttk.Combobox(row, textvariable=self.op_var, state="readonly", width=10,
+                     values=[label for _, label in self.AGE_OPS]).pack(side=tk.LEFT, padx=(6, 0))
+        self.days_var = tk.StringVar(value="7")
+        ttk.Spinbox(row, textvariable=self.days_var, from_=0, to=3650, width=6).pack(side=tk.LEFT, padx=(6, 0))
+        ttk.Label(row, text="days").pack(side=tk.LEFT, padx=(4, 12))
+        ttk.Label(row, text="Sort by:").pack(side=tk.LEFT)
+        self.sort_var = tk.StringVar(value=VIEW_SORTS[0][1])
+        ttk.Combobox(row, textvariable=self.sort_var, state="readonly", width=15,
+                     values=[label for _, label in VIEW_SORTS]).pack(side=tk.LEFT, padx=(6, 0))
+        self.desc_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(row, text="Descending", variable=self.desc_var).pack(side=tk.LEFT, padx=(6, 0))
+
+        self.list = VirtualList(self, label_for=self._label_for, on_select=self._update_count)
+        self.list.pack(fill=tk.BOTH, expand=True)
+        self.count_lbl = ttk.Label(self, text="")
+        self.count_lbl.pack(anchor="w", pady=(6, 0))
+
+        for var in (self.query_var, self.lane_var, self.age_var, self.op_var, self.days_var,
+                    self.sort_var, self.desc_var):
+            var.trace_add("write", lambda *_: self.schedule())
+        board.model.subscribe(self._on_model_change)
+        self.bind("<Destroy>", self._on_destroy, add="+")
+        self._names()
+        if self.store.views:
+            self._open(self.store.views[0]["name"])
+        else:
+            self.schedule()
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.board.model.unsubscribe(self._on_model_change)
+            if self._job is not None:
+                self.after_cancel(self._job)
+
+    def _names(self):
+        self.name_box.configure(values=[v["name"] for v in self.store.views])
+
+    def _open(self, name: str):
+        view = self.store.get(name)
+        if view is None:
             return
-        self.listbox.insert(tk.END, title)
-        self._backlog_desc.append(desc or "")
-        # Persist after programmatic add
+        self.name_var.set(name)
+        self.query_var.set(view.get("query", ""))
+        self.lane_var.set(view.get("lane") or "Any")
+        labels = dict(self.AGE_FIELDS)
+        self.age_var.set(labels.get(view.get("age_field"), labels[None]))
+        # Defaults first, so a view without an age filter doesn't keep the last one's
+        self.op_var.set(self.AGE_OPS[0][1])
+        self.days_var.set("7")
+        for key, label in self.AGE_OPS:
+            if view.get(key) is not None:
+                self.op_var.set(label)
+                self.days_var.set(str(view[key]))
+                break
+        self.sort_var.set(dict(VIEW_SORTS).get(view.get("sort"), VIEW_SORTS[0][1]))
+        self.desc_var.set(bool(view.get("descending")))
+
+    def _form_view(self) -> dict:
+        view = {"query": self.query_var.get().strip()}
+        if self.lane_var.get() in LANES:
+            view["lane"] = self.lane_var.get()
+        age_field = {label: f for f, label in self.AGE_FIELDS}.get(self.age_var.get())
         try:
-            self._get_app().save_state()
-        except Exception:
-            pass
+            days = float(self.days_var.get())
+        except ValueError:
+            days = None
+        if age_field is not None and days is not None:
+            view["age_field"] = age_field
+            view[{label: key for key, label in self.AGE_OPS}.get(self.op_var.get(), "older_than_days")] = days
+        view["sort"] = {label: f for f, label in VIEW_SORTS}.get(self.sort_var.get(), "created")
+        view["descending"] = bool(self.desc_var.get())
+        return view
 
-    def _add(self):
-        text = self.entry.get().strip()
-        desc = self.desc_txt.get("1.0", "end").strip()
-        if text:
-            self.listbox.insert(tk.END, text)
-            self._backlog_desc.append(desc)
-            self.entry.delete(0, tk.END)
-            self.desc_txt.delete("1.0", "end")
-            # Persist after adding backlog item
+    def _save_as(self):
+        from tkinter import simpledialog
+        name = simpledialog.askstring("Save view", "View name:", initialvalue=self.name_var.get(), parent=self)
+        if not name or not name.strip():
+            return
+        view = self._form_view()
+        view["name"] = name.strip()
+        try:
+            self.store.put(view)
+        except OSError as e:
             try:
-                self._get_app().save_state()
+                messagebox.showwarning("Save view", f"Could not save the view: {e}")
             except Exception:
                 pass
-
-    def _move_selected_to_todo(self):
-        sel = self.listbox.curselection()
-        if not sel:
             return
-        idx = sel[0]
-        text = self.listbox.get(idx)
-        desc = self._backlog_desc.pop(idx) if 0 <= idx < len(self._backlog_desc) else ""
-        self.listbox.delete(idx)
-        self.on_move_to_todo(text, desc)
-        # Persist after moving backlog -> To-Do
-        try:
-            self._get_app().save_state()
-        except Exception:
-            pass
+        self._names()
+        self.name_var.set(view["name"])
 
-    def _delete_selected(self):
-        sel = self.listbox.curselection()
-        if not sel:
+    def _delete(self):
+        name = self.name_var.get()
+        if not name or self.store.get(name) is None:
             return
-        idx = sel[0]
-        self.listbox.delete(idx)
-        if 0 <= idx < len(self._backlog_desc):
-            self._backlog_desc.pop(idx)
-        # Persist after delete
         try:
-            self._get_app().save_state()
-        except Exception:
-            pass
+            self.store.remove(name)
+        except OSError as e:
+            try:
+                messagebox.showwarning("Delete view", f"Could not save the views: {e}")
+            except Exception:
+                pass
+            return
+        self._names()
+        self.name_var.set("")
 
-    def get_items(self):
-        items = []
-        for i, title in enumerate(self.listbox.get(0, tk.END)):
-            desc = self._backlog_desc[i] if i < len(self._backlog_desc) else ""
-            items.append({"title": title, "desc": desc})
-        return items
+    def _on_model_change(self, events: List[dict]):
+        self.schedule()
 
-    def set_items(self, items):
-        self.listbox.delete(0, tk.END)
-        self._backlog_desc = []
-        for it in items:
-            if isinstance(it, dict):
-                title = str(it.get("title", ""))
-                desc = str(it.get("desc", ""))
-                if title:
-                    self.listbox.insert(tk.END, title)
-                    self._backlog_desc.append(desc)
-            else:
-                txt = str(it)
-                if txt:
-                    self.listbox.insert(tk.END, txt)
-                    self._backlog_desc.append("")
+    def schedule(self):
+        if self._job is None:
+            self._job = self.after_idle(self.refresh)
 
-    def _get_app(self):
-        w = self
-        while getattr(w, "master", None) is not None:
-            w = w.master
-        return w  # type: ignore
+    @instrumented("view select")
+    def refresh(self):
+        self._job = None
+        board = self.board
+        view = self._form_view()
+        if view["query"] and board.search.has_unread() and board.model.blobs is not None:
+            if board.index_job is None:
+                # Listed again once the descriptions are indexed
+                self.app._index_descs(board)
+        self._now = time.time()
+        rows = board.indexes().select(view, board.search, self._now, partial=True)
+        cards = board.model.cards
+        self.list.set_rows(rows)
+        self.list.prune(lambda cid: cid in cards)
+        self._update_count()
+
+    def _label_for(self, cid: int) -> str:
+        card = self.board.model.get(cid)
+        if card is None:
+            return ""
+        created, updated, entered = self.board.times.get(cid)
+        return (f"{card.title}    ({card.lane} for {format_span(self._now - entered)}, "
+                f"updated {format_span(self._now - updated)} ago)")
+
+    def _update_count(self):
+        n = len(self.list.selection)
+        total = len(self.list.rows)
+        self.count_lbl.configure(text=f"{n:,} of {total:,} selected" if n else f"{total:,} cards")
+
+class OpenBoard:
+    # A board open in the window: its model, storage, search index and saver, and
+    # the widgets built for it (`view` is None until it is shown, or once evicted)
+    def __init__(self, app: "App", name: str, state_path: Optional[str], fallback: bool,
+                 storage: Optional[Storage] = None):
+        self.name = name
+        self.state_path = state_path
+        self.fallback = fallback  # may fall back to the legacy board file (default board only)
+        self.model = BoardModel()
+        self.storage: Storage = storage if storage is not None else make_storage(state_path)
+        self.model.blobs = self.storage.blobs
+        self.remote = isinstance(self.storage, SyncClient)  # shared through a sync server
+        # Before anything else subscribes: CardIndexes reads these on the same events
+        self.times = CardTimes(self.model, None if self.remote or state_path is None
+                               else os.path.splitext(state_path)[0] + ".times")
+        self._indexes: Optional[CardIndexes] = None
+        self.remote_job = None
+        self.search = SearchIndex(self.model)
+        self.history = UndoHistory(self.model)
+        self.saver = SaveScheduler(app, self)
+        self.view: Optional[ttk.Frame] = None
+        self.columns: Dict[str, ScrollableColumn] = {}
+        self.backlog: Optional[BacklogPanel] = None
+        self.analytics: Optional[AnalyticsPanel] = None
+        self.saved_views: Optional[ViewsPanel] = None
+        self.index_job: Optional[Job] = None   # reading descriptions for search
+        self.reading: Optional[Job] = None     # reading the saved board (App.load_state)
+        self.syncing = False  # merging changes made elsewhere: nothing to persist or send
+        # Persist every change made through the model, off the Tk thread
+        self.model.subscribe(functools.partial(app._on_model_change, self))
+        # When cards reached DONE_LANE, for archiving them once they have aged
+        self.done_since: Dict[int, float] = {}
+        self._marks_loaded = False
+        self._archive: Optional[Archive] = None
+        self._flow: Optional[TransitionLog] = None
+        if not self.remote:
+            self.model.subscribe(self._track_done)
+
+    def archive(self) -> Optional[Archive]:
+        # None for shared boards: their cards are the server's
+        if self.remote or self.state_path is None:
+            return None
+        if self._archive is None:
+            self._archive = Archive(os.path.splitext(self.state_path)[0] + ".archive")
+        return self._archive
+
+    def indexes(self) -> CardIndexes:
+        if self._indexes is None:
+            self._indexes = CardIndexes(self.model, self.times)
+        return self._indexes
+
+    def flow_log(self) -> Optional[TransitionLog]:
+        # None for shared boards, like archive()
+        if self.remote or self.state_path is None:
+            return None
+        if self._flow is None:
+            self._flow = TransitionLog(os.path.splitext(self.state_path)[0] + ".flow")
+        return self._flow
+
+    def _track_done(self, events: List[dict]):
+        for ev in events:
+            op = ev["op"]
+            if op in ("add", "move"):
+                if ev["lane"] == DONE_LANE:
+                    self.done_since[ev["id"]] = time.time()
+                else:
+                    self.done_since.pop(ev["id"], None)
+            elif op == "remove":
+                self.done_since.pop(ev["id"], None)
+
+    def aged(self, now: float) -> List[int]:
+        # Ids in DONE_LANE for at least ARCHIVE_AFTER_DAYS, in lane order. Cards
+        # that arrived by loading count from the time saved with the archive, or
+        # from now the first time they are seen.
+        ids = self.model.ids(DONE_LANE)
+        since = self.done_since
+        if not self._marks_loaded:
+            self._marks_loaded = True
+            saved = self.archive().load_marks()
+            for cid in ids:
+                if cid not in since:
+                    since[cid] = saved.get(cid, now)
+        else:
+            for cid in ids:
+                since.setdefault(cid, now)
+        cutoff = now - ARCHIVE_AFTER_DAYS * 86400
+        return [cid for cid in ids if since[cid] <= cutoff]
+
+    def save_marks(self):
+        if self._marks_loaded:
+            done = set(self.model.ids(DONE_LANE))
+            try:
+                self.archive().save_marks({cid: t for cid, t in self.done_since.items() if cid in done})
+            except OSError:
+                pass
+
+def _active_board_attr(name: str):
+    # App.<name> reads and writes the active board's attribute
+    return property(lambda self: getattr(self.board, name),
+                    lambda self, value: setattr(self.board, name, value))
 
 class App(tk.Tk):
+    # Board state lives on the active OpenBoard; the rest of the app reaches it
+    # through these
+    model = _active_board_attr("model")
+    storage = _active_board_attr("storage")
+    state_path = _active_board_attr("state_path")
+    search = _active_board_attr("search")
+    saver = _active_board_attr("saver")
+    columns = _active_board_attr("columns")
+    backlog = _active_board_attr("backlog")
+    analytics = _active_board_attr("analytics")
+    saved_views = _active_board_attr("saved_views")
+
     def __init__(self):
         super().__init__()
         self.title("notTrello")
         self.geometry("1200x700")
         self.minsize(860, 560)
 
-        self.drag = DragState()
+        self.drag = DragState(self)
+        self.input = InputCoalescer(self)
+        self._col_rects = None  # cached column screen rectangles for hit-testing
+        self.loader: Optional[ProgressiveLoader] = None
+        self.first_paint_ms: Optional[float] = None
+        # Startup phases in ms (see --profile-startup)
+        self.startup: Dict[str, float] = {}
+        init_start = time.perf_counter()
+        self._search_job = None
+        self._archive_view: Optional["ArchiveBrowser"] = None
+        self.runner = JobRunner(self, self._show_jobs)
+        self.instrument = Instrumentation(self)
 
-        # Where to store state (use AppData to work in a frozen EXE)
-        appdata = os.environ.get("APPDATA", os.path.expanduser("~"))
-        data_dir = os.path.join(appdata, "notTrello")
-        try:
-            os.makedirs(data_dir, exist_ok=True)
-        except Exception:
-            pass
-        self.state_path = os.path.join(data_dir, "board_state.json")
+        # Open boards, least recently used first; only the active one is loaded now
+        self.registry = BoardRegistry(os.path.dirname(default_state_path()))
+        self.view_store = ViewStore(os.path.join(self.registry.data_dir, "views.json"))
+        self.boards: "OrderedDict[str, OpenBoard]" = OrderedDict()
+        self.board = self._open_remote(SYNC_SERVER) if SYNC_SERVER else None
+        if self.board is None:
+            self.board = self._open_board(self.registry.active)
+        if self.board.name != DEFAULT_BOARD:
+            self.title(f"notTrello - {self.board.name}")
 
         # Dark ttk styling and window background
         self.configure(bg=APP_BG)
@@ -555,122 +5472,523 @@ class App(tk.Tk):
         style.map("TNotebook.Tab", background=[("selected", "#0B1220")])
         style.configure("TButton", background=CARD_BG, foreground=FG)
         style.configure("TEntry", fieldbackground=CARD_BG, foreground=FG, insertcolor=FG)
+        style.map("TCombobox", fieldbackground=[("readonly", CARD_BG)], foreground=[("readonly", FG)])
+
+        # Search bar: filters board columns and backlog as you type
+        search_row = ttk.Frame(self, padding=(12, 8, 12, 0))
+        search_row.pack(fill=tk.X)
+        ttk.Label(search_row, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_row, textvariable=self.search_var, width=40)
+        search_entry.pack(side=tk.LEFT, padx=(6, 0))
+        search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        ttk.Button(search_row, text="Clear", command=lambda: self.search_var.set("")).pack(side=tk.LEFT, padx=(6, 0))
+        self.search_count = ttk.Label(search_row, text="")
+        self.search_count.pack(side=tk.LEFT, padx=(10, 0))
+        self.search_var.trace_add("write", lambda *_: self._schedule_search())
 
-        # Tabs across the top: Board and Backlog
-        notebook = ttk.Notebook(self)
+        # Board switcher
+        ttk.Button(search_row, text="New board", command=self._new_board).pack(side=tk.RIGHT)
+        self.board_var = tk.StringVar(value=self.board.name)
+        self.board_box = ttk.Combobox(search_row, textvariable=self.board_var, state="readonly", width=24,
+                                      values=self._board_names())
+        self.board_box.pack(side=tk.RIGHT, padx=6)
+        self.board_box.bind("<<ComboboxSelected>>", lambda e: self.switch_board(self.board_var.get()))
+        ttk.Label(search_row, text="Board:").pack(side=tk.RIGHT)
+
+        # Tabs across the top: Board, Backlog, Views and Analytics
+        self.notebook = notebook = ttk.Notebook(self)
         notebook.pack(fill=tk.BOTH, expand=True)
 
+        # Background jobs: shown under the tabs while any is running (_show_jobs)
+        self.job_bar = ttk.Frame(self, padding=(12, 0, 12, 6))
+        self.job_label = ttk.Label(self.job_bar, text="")
+        self.job_label.pack(side=tk.LEFT)
+        ttk.Button(self.job_bar, text="Cancel", command=self._cancel_job).pack(side=tk.RIGHT)
+        self.job_progress = ttk.Progressbar(self.job_bar, length=220, mode="determinate")
+        self.job_progress.pack(side=tk.RIGHT, padx=(0, 8))
+
         board_tab = ttk.Frame(notebook)
-        backlog_tab = ttk.Frame(notebook)
+        self.backlog_tab = ttk.Frame(notebook)
+        self.views_tab = ttk.Frame(notebook)
+        self.analytics_tab = ttk.Frame(notebook)
         notebook.add(board_tab, text="Board")
-        notebook.add(backlog_tab, text="Backlog")
+        notebook.add(self.backlog_tab, text="Backlog")
+        notebook.add(self.views_tab, text="Views")
+        notebook.add(self.analytics_tab, text="Analytics")
 
-        # Board tab: columns area
+        # Board tab: columns area, one set of columns per board (see _show_board).
+        # The other tabs are built the first time they are shown.
         self.columns_frame = ttk.Frame(board_tab)
         self.columns_frame.pack(fill=tk.BOTH, expand=True)
+        self._show_board()
 
-        self.columns: Dict[str, ScrollableColumn] = {}
-        cols_holder = ttk.Frame(self.columns_frame)
-        cols_holder.pack(fill=tk.BOTH, expand=True)
-        cols_holder.grid_rowconfigure(0, weight=1)
-        for idx, (title, color) in enumerate(COLUMNS):
-            cols_holder.grid_columnconfigure(idx, weight=1, uniform="cols")
-            col = ScrollableColumn(
-                cols_holder,
-                title,
-                color,
-                allow_add=(title == "To-Do"),
-                allow_clear=(title == "Complete"),
-            )
-            col.grid(row=0, column=idx, sticky="nsew", padx=6, pady=6)
-            self.columns[title] = col
-
-        # Backlog tab
-        self.backlog = BacklogPanel(backlog_tab, on_move_to_todo=lambda t, d="": self.add_card_to_column("To-Do", t, d))
-        self.backlog.pack(fill=tk.BOTH, expand=True)
+        # Column rectangles change on resize, window moves and tab switches
+        self.bind("<Configure>", self._invalidate_hit_cache, add="+")
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed, add="+")
 
         # Enable natural/global mouse wheel scrolling over the column under the pointer
         self.bind_all("<MouseWheel>", self._on_global_mousewheel)
         self.bind_all("<Button-4>", self._on_global_mousewheel_linux)
         self.bind_all("<Button-5>", self._on_global_mousewheel_linux)
 
-        # Load saved data or seed with sample data
-        loaded = self.load_state()
-        if not loaded:
-            self.add_card_to_column("To-Do", "Try adding and dragging tasks")
-            self.add_card_to_column("Priority", "High-priority item")
-            self.add_card_to_column("In Progress", "Working on the UI")
+        # Undo/redo for the active board; text fields keep their own shortcuts
+        self.bind("<Control-z>", lambda e: self._undo_redo(e, redo=False))
+        self.bind("<Control-y>", lambda e: self._undo_redo(e, redo=True))
+        self.bind("<Control-Z>", lambda e: self._undo_redo(e, redo=True))
+
+        # Instrumentation overlay and trace dump
+        self.bind("<F12>", self.instrument.toggle)
+        self.bind("<Control-F12>", lambda e: self.instrument.dump())
+        if INSTRUMENT:
+            self.instrument.enable()
+
+        # Load saved data or seed with sample data. The board is read in the
+        # background; then its first screen is shown and the rest streams in.
+        self.bind("<Map>", self._on_first_map, add="+")
+        self.load_state(progressive=True, on_empty=functools.partial(self._seed, self.board)
+                        if self.board.name == DEFAULT_BOARD else None)
 
         # Save on close
         self.protocol("WM_DELETE_WINDOW", self.on_close)
-        # Darken the main window's native title bar on Windows
+        # Pick up changes other processes make to the open boards
+        self._watch_job = self.after(WATCH_MS, self._watch)
+        self._age_job = self.after(ARCHIVE_FIRST_CHECK_MS, self._age_archives)
+        # Reading and parsing the saved board runs meanwhile, off this thread
+        self.startup["widget build"] = (time.perf_counter() - init_start) * 1000
+
+    def _seed(self, board: OpenBoard):
+        board.model.add("To-Do", "Try adding and dragging tasks")
+        board.model.add("Priority", "High-priority item")
+        board.model.add("In Progress", "Working on the UI")
+
+    def _on_first_map(self, event):
+        if event.widget is self and self.first_paint_ms is None:
+            self.first_paint_ms = -1.0
+            self.after_idle(self._report_first_paint)
+            # Darken the native title bar once the window has a frame to darken
+            try:
+                self._apply_dark_titlebar(self.winfo_id())
+            except Exception:
+                pass
+
+    def _report_first_paint(self):
+        self.first_paint_ms = (time.perf_counter() - _START) * 1000
+        self.startup["first paint"] = self.first_paint_ms
+        pending = self.loader.remaining() if self.loader is not None else 0
+        log(f"first paint after {self.first_paint_ms:.0f} ms ({len(self.model):,} cards shown, {pending:,} still loading)")
+        if PROFILE_STARTUP:
+            self.report_startup()
+
+    def report_startup(self):
+        parts = [f"{name} {ms:.0f} ms" for name, ms in self.startup.items()]
+        cache = getattr(self.storage, "cache_hit", None)
+        if cache is not None:
+            parts.append("parse cache " + ("hit" if cache else "miss"))
+        log("startup: " + ", ".join(parts))
+
+    def _apply_dark_titlebar(self, window_id: int):
+        # Ask DWM for a dark title bar (Windows 10 1809+); a no-op elsewhere
+        if sys.platform != "win32":
+            return
+        import ctypes
+        hwnd = ctypes.windll.user32.GetParent(window_id) or window_id
+        value = ctypes.c_int(1)
+        for attr in (20, 19):  # DWMWA_USE_IMMERSIVE_DARK_MODE, then its pre-20H1 id
+            if ctypes.windll.dwmapi.DwmSetWindowAttribute(hwnd, attr, ctypes.byref(value), ctypes.sizeof(value)) == 0:
+                break
+
+    # Boards
+    def _open_board(self, name: str) -> OpenBoard:
+        board = OpenBoard(self, name, self.registry.state_path(name), fallback=self.registry.is_default(name))
+        self.boards[name] = board
+        return board
+
+    def _open_remote(self, address: str) -> Optional[OpenBoard]:
+        # The board shared by a sync server; None (after a warning) if unreachable
+        client = SyncClient(address, os.path.join(self.registry.data_dir, "remote.blobs"))
         try:
-            self._apply_dark_titlebar(self.winfo_id())
-            # Re-apply shortly after the window is realized to ensure it sticks
-            self.after(200, lambda: self._apply_dark_titlebar(self.winfo_id()))
-        except Exception:
-            pass
+            client.connect()
+        except (OSError, ValueError) as e:
+            try:
+                messagebox.showwarning("Shared board unavailable", f"Could not connect to {address}: {e}")
+            except Exception:
+                pass
+            return None
+        board = OpenBoard(self, f"Shared ({address})", None, fallback=False, storage=client)
+        self.boards[board.name] = board
+        board.remote_job = self.after(SYNC_POLL_MS, self._pump_remote, board)
+        return board
+
+    def _board_names(self) -> List[str]:
+        return [name for name, board in self.boards.items() if board.remote] + self.registry.names()
+
+    def _pump_remote(self, board: OpenBoard):
+        # Tk thread: apply what the server sent since the last tick (a bounded
+        # number of messages, so a flood cannot stall the UI), then send ours
+        board.remote_job = self.after(SYNC_POLL_MS, self._pump_remote, board)
+        client = board.storage
+        if board is self.board and self.loader is not None:
+            return
+        for _ in range(SYNC_CLIENT_BUFFER):
+            msg = client.poll()
+            if msg is None:
+                break
+            kind = msg.get("type")
+            if kind == "events":
+                recs = client.received(msg)
+                if recs:
+                    with self._remote_change(board):
+                        replay(board.model, recs)
+            elif kind == "snapshot":
+                data = client.snapshot(msg)
+                if data is not None:
+                    lanes, next_id, _ = BoardModel.parse_state(data, board.model.lanes)
+                    theirs = BoardModel(board.model.lanes)
+                    theirs.load_parsed(lanes, next_id)
+                    with self._remote_change(board):
+                        board.model.sync(theirs)
+            elif kind == "closed":
+                self.after_cancel(board.remote_job)
+                board.remote_job = None
+                try:
+                    messagebox.showwarning("Shared board", f"Lost the connection to {client.address}; "
+                                           "changes from now on are not shared.")
+                except Exception:
+                    pass
+                return
+        try:
+            client.send()
+        except OSError:
+            pass  # the reader sees the connection close and reports it
+        board.saver.write_bodies()
+
+    @contextmanager
+    def _remote_change(self, board: OpenBoard):
+        # Other clients' changes: not sent back, not undoable here
+        board.syncing = True
+        try:
+            with board.history.ignoring():
+                yield
+        finally:
+            board.syncing = False
+
+    def _show_board(self):
+        # Put the active board's columns (and its other tabs, if built) on screen
+        board = self.board
+        if board.view is None:
+            holder = ttk.Frame(self.columns_frame)
+            holder.grid_rowconfigure(0, weight=1)
+            for idx, (title, color) in enumerate(COLUMNS):
+                holder.grid_columnconfigure(idx, weight=1, uniform="cols")
+                col = ScrollableColumn(
+                    holder,
+                    title,
+                    color,
+                    board.model,
+                    allow_add=(title == "To-Do"),
+                    allow_clear=(title == DONE_LANE),
+                )
+                col.grid(row=0, column=idx, sticky="nsew", padx=6, pady=6)
+                board.columns[title] = col
+            board.view = holder
+        board.view.pack(fill=tk.BOTH, expand=True)
+        if board.backlog is not None:
+            board.backlog.pack(fill=tk.BOTH, expand=True)
+        elif self.notebook.select() == str(self.backlog_tab):
+            self.ensure_backlog()
+        if board.saved_views is not None:
+            board.saved_views.pack(fill=tk.BOTH, expand=True)
+        elif self.notebook.select() == str(self.views_tab):
+            self.ensure_views()
+        if board.analytics is not None:
+            board.analytics.pack(fill=tk.BOTH, expand=True)
+        elif self.notebook.select() == str(self.analytics_tab):
+            self.ensure_analytics()
+
+    def switch_board(self, name: str):
+        if name == self.board.name or (name not in self.registry.boards and name not in self.boards):
+            self.board_var.set(self.board.name)
+            return
+        if self.loader is not None:
+            self.loader.finish()
+        self.drag.cancel()
+        old = self.board
+        old.view.pack_forget()
+        if old.backlog is not None:
+            old.backlog.pack_forget()
+        if old.saved_views is not None:
+            old.saved_views.pack_forget()
+        if old.analytics is not None:
+            old.analytics.pack_forget()
+        board = self.boards.get(name)
+        fresh = board is None
+        if fresh:
+            # First visit: the board is read from disk now, first screen first
+            board = self._open_board(name)
+        self.boards.move_to_end(name)
+        self.board = board
+        self._show_board()
+        if fresh:
+            self.load_state(progressive=True)
+        self._evict()
+        if not board.remote:
+            self.registry.active = name
+            try:
+                self.registry.save()
+            except OSError:
+                pass
+        self.board_var.set(name)
+        self.title("notTrello" if name == DEFAULT_BOARD else f"notTrello - {name}")
+        self._invalidate_hit_cache()
+        self._apply_search()
+
+    def _evict(self):
+        # Keep BOARD_VIEWS boards rendered and BOARD_CACHE open, most recent first;
+        # the active board is always the most recent
+        for i, board in enumerate(reversed(list(self.boards.values()))):
+            if i >= BOARD_CACHE and not board.remote:
+                self._close_board(board)
+            elif i >= BOARD_VIEWS:
+                self._drop_view(board)
+
+    def _drop_view(self, board: OpenBoard):
+        if board.view is not None:
+            board.view.destroy()
+            board.view = None
+            board.columns = {}
+        if board.backlog is not None:
+            board.backlog.destroy()
+            board.backlog = None
+        if board.saved_views is not None:
+            board.saved_views.destroy()
+            board.saved_views = None
+        if board.analytics is not None:
+            board.analytics.destroy()
+            board.analytics = None
+
+    def _close_board(self, board: OpenBoard):
+        self.wait_loaded(board)
+        self._drop_view(board)
+        if board.index_job is not None:
+            self.runner.cancel(board.index_job, notify=False)
+        if self._archive_view is not None and self._archive_view.board is board:
+            self._archive_view.destroy()
+        board.save_marks()
+        board.times.save()
+        try:
+            board.saver.close()
+        finally:
+            board.storage.close()
+            self.boards.pop(board.name, None)
 
+    def _new_board(self):
+        from tkinter import simpledialog
+        name = simpledialog.askstring("New board", "Board name:", parent=self)
+        if not name:
+            return
+        try:
+            name = self.registry.add(name)
+        except (OSError, ValueError) as e:
+            try:
+                messagebox.showwarning("New board", str(e))
+            except Exception:
+                pass
+            return
+        self.board_box.configure(values=self._board_names())
+        self.switch_board(name)
+
+    def _undo_redo(self, event, redo: bool):
+        if event.widget.winfo_class() in ("Entry", "TEntry", "Text", "TCombobox"):
+            return None
+        self.drag.cancel()
+        if self.loader is not None:
+            self.loader.finish()
+        history = self.board.history
+        if not (history.redo() if redo else history.undo()):
+            self.bell()
+        return "break"
+
+    def _on_tab_changed(self, event):
+        self._invalidate_hit_cache()
+        if self.backlog is None and event.widget.select() == str(self.backlog_tab):
+            self.ensure_backlog()
+        if self.saved_views is None and event.widget.select() == str(self.views_tab):
+            self.ensure_views()
+        if self.analytics is None and event.widget.select() == str(self.analytics_tab):
+            self.ensure_analytics()
+
+    def ensure_backlog(self) -> BacklogPanel:
+        # The Backlog tab is not on screen at startup, so its panel is built on demand
+        if self.backlog is None:
+            self.backlog = BacklogPanel(self.backlog_tab, self.model)
+            self.backlog.pack(fill=tk.BOTH, expand=True)
+            if self.search_var.get():
+                self.backlog.set_filter(self.search.query(self.search_var.get(), partial=True))
+        return self.backlog
+
+    def ensure_views(self) -> ViewsPanel:
+        if self.saved_views is None:
+            self.saved_views = ViewsPanel(self.views_tab, self, self.board)
+            self.saved_views.pack(fill=tk.BOTH, expand=True)
+        return self.saved_views
+
+    def ensure_analytics(self) -> AnalyticsPanel:
+        if self.analytics is None:
+            self.analytics = AnalyticsPanel(self.analytics_tab, self.model, self.board.flow_log(), self.runner)
+            self.analytics.pack(fill=tk.BOTH, expand=True)
+        return self.analytics
+
+    @instrumented("mousewheel")
     def _on_global_mousewheel(self, event):
-        # Route scroll to the column under the pointer
-        px, py = self.winfo_pointerx(), self.winfo_pointery()
-        title = self.column_under_pointer(px, py)
+        # Route scroll to the column under the pointer; applied once per frame
+        title = self.column_under_pointer(event.x_root, event.y_root)
         if not title:
             return
-        col = self.columns.get(title)
-        if not col:
-            return
         delta = event.delta
-        base = int(delta / 120) if delta else 0
-        if base == 0:
-            base = 1 if delta > 0 else -1
-        steps = base if NATURAL_SCROLL else -base
-        col.canvas.yview_scroll(steps, "units")
+        if sys.platform == "darwin":
+            # Tk on macOS reports small line counts rather than multiples of 120
+            notches = float(delta)
+        else:
+            # Windows: 120 per notch, smaller fractions from precision touchpads
+            notches = delta / 120.0
+        self.input.wheel(title, notches if NATURAL_SCROLL else -notches)
         return "break"
 
+    @instrumented("mousewheel")
     def _on_global_mousewheel_linux(self, event):
         # Route Linux scroll buttons to the column under the pointer
-        px, py = self.winfo_pointerx(), self.winfo_pointery()
-        title = self.column_under_pointer(px, py)
+        title = self.column_under_pointer(event.x_root, event.y_root)
         if not title:
             return
-        col = self.columns.get(title)
-        if not col:
-            return
         if event.num == 4:  # up
-            col.canvas.yview_scroll(3 if NATURAL_SCROLL else -3, "units")
+            self.input.wheel(title, 3 if NATURAL_SCROLL else -3)
         elif event.num == 5:  # down
-            col.canvas.yview_scroll(-3 if NATURAL_SCROLL else 3, "units")
+            self.input.wheel(title, -3 if NATURAL_SCROLL else 3)
         return "break"
 
     def add_card_to_column(self, column_title: str, text: str, desc: str = ""):
-        col = self.columns.get(column_title)
-        if not col:
+        if column_title not in self.columns:
+            return
+        self.model.add(column_title, text, desc)
+
+    def _schedule_search(self):
+        if self._search_job is None:
+            self._search_job = self.after_idle(self._apply_search)
+
+    @instrumented("search")
+    def _apply_search(self):
+        self._search_job = None
+        board = self.board
+        if self.search_var.get().strip() and board.search.has_unread() and board.model.blobs is not None:
+            if board.index_job is None:
+                self._index_descs(board)
+        # Matches among what is indexed so far; applied again when the job is done
+        ids = self.search.query(self.search_var.get(), partial=True)
+        for col in self.columns.values():
+            col.set_filter(ids)
+        if self.backlog is not None:
+            self.backlog.set_filter(ids)
+        self.search_count.configure(text="" if ids is None else f"{len(ids):,} match{'es' if len(ids) != 1 else ''}")
+
+    def _index_descs(self, board: OpenBoard):
+        # Read the descriptions search has not indexed yet on a worker thread; the
+        # filter is applied again once they are in, instead of the query blocking
+        items = board.search.take_unread()
+
+        def done(found):
+            board.index_job = None
+            board.search.add_desc_tokens(found)
+            if board is self.board:
+                self._schedule_search()
+            if board.saved_views is not None:
+                board.saved_views.schedule()
+
+        def failed(error):
+            board.index_job = None
+            board.search.requeue(items)
+            if not isinstance(error, JobCancelled):
+                log(f"could not index descriptions: {error}")
+
+        board.index_job = self.runner.submit("Indexing descriptions", read_desc_tokens, board.model.blobs, items,
+                                             on_done=done, on_error=failed)
+
+    def _show_jobs(self):
+        # The newest running job, with a count of the others
+        jobs = list(self.runner.jobs.values())
+        bar = self.job_progress
+        if not jobs:
+            bar.stop()
+            self.job_bar.pack_forget()
             return
-        col.add_card(text, desc)
+        job = jobs[-1]
+        more = f"  (+{len(jobs) - 1} more)" if len(jobs) > 1 else ""
+        self.job_label.configure(text=job.name + more)
+        if job.total:
+            if str(bar.cget("mode")) != "determinate":
+                bar.stop()
+                bar.configure(mode="determinate")
+            bar.configure(maximum=job.total, value=job.done)
+        elif str(bar.cget("mode")) != "indeterminate":
+            bar.configure(mode="indeterminate")
+            bar.start(20)
+        if not self.job_bar.winfo_manager():
+            self.job_bar.pack(side=tk.BOTTOM, fill=tk.X, before=self.notebook)
+
+    def _cancel_job(self):
+        if self.runner.jobs:
+            self.runner.cancel(list(self.runner.jobs.values())[-1])
+
+    def _on_model_change(self, board: OpenBoard, events: List[dict]):
+        if board is self.board and self.search_var.get().strip():
+            # Keep the filter in step with added/edited cards
+            self._schedule_search()
+        # Resets and bulk loads come from load_state itself, merged changes from the
+        # files (sync_external); anything else is an edit to persist
+        if not board.syncing and any(ev["op"] not in ("reset", "load") for ev in events):
+            if board.remote:
+                # Goes to the sync server with the next tick (_pump_remote)
+                board.storage.append(events)
+            else:
+                # Buffered only; the save worker writes it with these events
+                flow = board.flow_log()
+                if flow is not None:
+                    flow.record(events)
+                board.saver.mark_dirty(events)
 
     def column_under_pointer(self, px: int, py: int) -> Optional[str]:
-        for title, col in self.columns.items():
-            x1 = col.winfo_rootx()
-            y1 = col.winfo_rooty()
-            x2 = x1 + col.winfo_width()
-            y2 = y1 + col.winfo_height()
+        # Pure-Python lookup in cached screen rectangles; <Configure> (resize,
+        # window move) and tab switches invalidate the cache
+        rects = self._col_rects
+        if rects is None:
+            rects = self._col_rects = self._measure_columns()
+        for title, x1, y1, x2, y2 in rects:
             if x1 <= px <= x2 and y1 <= py <= y2:
                 return title
         return None
 
+    def _measure_columns(self):
+        rects = []
+        for title, col in self.columns.items():
+            if not col.winfo_ismapped():
+                continue
+            x1 = col.winfo_rootx()
+            y1 = col.winfo_rooty()
+            rects.append((title, x1, y1, x1 + col.winfo_width(), y1 + col.winfo_height()))
+        return rects
+
+    def _invalidate_hit_cache(self, _=None):
+        self._col_rects = None
+
     # Persistence
-    def save_state(self):
-        data = {
-            # Store title+desc per card
-            "columns": {title: (col.get_cards_data() if hasattr(col, "get_cards_data") else [
-                {"title": t, "desc": ""} for t in col.get_cards_texts()
-            ]) for title, col in self.columns.items()},
-            "backlog": self.backlog.get_items() if hasattr(self, "backlog") else [],
-        }
+    @instrumented("save_state")
+    def save_state(self, board: Optional[OpenBoard] = None):
+        # Store id+title+desc per card, straight from the model. With a journal this
+        # is a synchronous compaction: snapshot written atomically, journal trimmed.
+        board = board or self.board
+        data = board.model.to_dict()
         try:
-            with open(self.state_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            board.storage.save(data)
         except Exception as e:
             # Non-blocking; show a gentle message
             try:
@@ -678,65 +5996,800 @@ class App(tk.Tk):
             except Exception:
                 pass
 
-    def load_state(self) -> bool:
-        if not os.path.exists(self.state_path):
-            # Fallback: try legacy location next to script (pre-EXE builds)
+    @instrumented("load_state")
+    def load_state(self, progressive: bool = False, on_empty: Optional[Callable] = None):
+        # Read the active board's saved state on a job thread (read_board); the
+        # model is filled on this thread when it is done (_board_read), and
+        # on_empty() is called there if nothing was saved. Until then the saver
+        # holds changes (SaveScheduler._take); they are rebased onto the board read.
+        board = self.board
+        self.wait_loaded(board)
+        if board.remote:
+            # Arrived parsed with the connection; other clients' changes apply to
+            # the whole board right away
             try:
-                base_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(__file__)
+                parsed = board.storage.load_parsed(board.model.lanes)
             except Exception:
-                base_dir = os.getcwd()
-            legacy_path = os.path.join(base_dir, "board_state.json")
-            if os.path.exists(legacy_path):
-                self.state_path = legacy_path
+                parsed = None
+            self._board_read(board, False, on_empty, (board.storage, board.state_path, parsed, 0.0))
+            return
+        board.reading = self.runner.submit(
+            f"Reading {board.name}", read_board, board.state_path, board.fallback, list(board.model.lanes),
+            on_done=functools.partial(self._board_read, board, progressive, on_empty),
+            on_error=functools.partial(self._board_unread, board, progressive, on_empty))
+
+    def wait_loaded(self, board: Optional[OpenBoard] = None):
+        # Apply a board still being read now, waiting for the read (closing,
+        # evicting, benchmarks); cancelling the job does the same
+        board = board or self.board
+        if board.reading is not None:
+            self.runner.cancel(board.reading)
+
+    def _board_unread(self, board: OpenBoard, progressive: bool, on_empty: Optional[Callable], err: Exception):
+        job = board.reading
+        if job is None:
+            return
+        if isinstance(err, JobCancelled):
+            # The board has to be read regardless: finish here what the job began
+            # (never twice: a migration may be under way), or do all of it
+            try:
+                result = job.future.result() if not job.future.cancel() else \
+                    read_board(None, board.state_path, board.fallback, list(board.model.lanes))
+            except Exception as e:
+                err = e
             else:
-                return False
+                self._board_read(board, progressive, on_empty, result)
+                return
+        log(f"could not read board {board.name}: {err}")
+        self._board_read(board, progressive, on_empty, (board.storage, board.state_path, None, 0.0))
+
+    def _board_read(self, board: OpenBoard, progressive: bool, on_empty: Optional[Callable], result: tuple):
+        storage, state_path, parsed, ms = result
+        board.reading = None
+        board.storage, board.state_path = storage, state_path
+        board.model.blobs = storage.blobs
+        pending = board.saver.drain()   # made while the board was read
+        restored = False
+        if parsed is not None:
+            self.startup.setdefault("state parse", ms)
+            lanes, next_id, restored, ops = parsed
+            restored = self._restore(board, lanes, next_id, restored, ops, progressive)
+        if pending:
+            rebase(board.model, pending)
+        elif not restored and on_empty is not None:
+            on_empty()
+
+    def _restore(self, board: OpenBoard, lanes: Dict[str, list], next_id: int, restored: bool,
+                 ops: List[dict], progressive: bool = False) -> bool:
+        if board is not self.board:
+            # Switched away while it was read: the loader only fills the board shown
+            progressive = False
+        elif self.loader is not None:
+            self.loader.finish()
+        if progressive and not ops:
+            # First screen now, remainder in slices. Journal records left over from a
+            # crash must replay against the complete board, so that case loads at once.
+            first = {lane: items[:FIRST_SCREEN_ROWS] for lane, items in lanes.items()}
+            rest = {lane: items[FIRST_SCREEN_ROWS:] for lane, items in lanes.items()}
+            board.model.load_parsed(first, next_id)
+            if any(rest.values()):
+                self.loader = ProgressiveLoader(self, rest)
+                self.loader.start()
+            return restored
+        board.model.load_parsed(lanes, next_id)
+        if ops:
+            # Replay journal records written since the snapshot
+            replay(board.model, ops)
+            restored = restored or len(board.model) > 0
+        return restored
+
+    def _watch(self):
+        # A couple of os.stat calls (or one PRAGMA) per open board and tick
+        self._watch_job = self.after(WATCH_MS, self._watch)
+        if self.drag.active:
+            return
+        for board in list(self.boards.values()):
+            if board.reading is not None or (board is self.board and self.loader is not None):
+                # Diffing against a half-loaded board would drop the rest
+                continue
+            try:
+                changed = board.storage.changed_externally()
+            except Exception:
+                continue
+            if changed:
+                self.sync_external(board)
+
+    @instrumented("sync_external")
+    def sync_external(self, board: OpenBoard) -> bool:
+        # Another process changed the board's files: read them and patch the model
+        # by card id (BoardModel.sync), so the views add, drop and move just those
+        # cards and keep their scroll positions; open dialogs stay open. Our changes
+        # not written yet go back on top, and undo restarts from here if any card
+        # changed under it.
+        pending = board.saver.drain()
         try:
-            with open(self.state_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            lanes, next_id, _, ops = board.storage.load_parsed(board.model.lanes)
         except Exception:
+            # Unreadable (e.g. edited by hand): keep what we have
+            if pending:
+                board.saver.mark_dirty(pending)
             return False
+        theirs = BoardModel(board.model.lanes)
+        theirs.load_parsed(lanes, next_id)
+        if ops:
+            replay(theirs, ops)
+        board.syncing = True
+        try:
+            changed = board.model.sync(theirs)
+        finally:
+            board.syncing = False
+        if changed:
+            board.history.clear()
+        if pending:
+            rebase(board.model, pending)
+        return True
 
-        # Restore columns
-        cols_data = data.get("columns", {})
-        restored_any = False
-        for title, col in self.columns.items():
-            items = cols_data.get(title)
-            if isinstance(items, list):
-                col.clear()
-                for it in items:
-                    if isinstance(it, dict):
-                        title_txt = str(it.get("title", "")).strip()
-                        desc_txt = str(it.get("desc", ""))
-                        if title_txt:
-                            col.add_card(title_txt, desc_txt)
-                            restored_any = True
-                    elif isinstance(it, str):
-                        txt = it.strip()
-                        if txt:
-                            col.add_card(txt)
-                            restored_any = True
-
-        # Restore backlog
-        backlog_items = data.get("backlog", [])
-        if isinstance(backlog_items, list):
-            # Accept both legacy string list and new dict list
-            items_norm = []
-            for it in backlog_items:
-                if isinstance(it, dict):
-                    items_norm.append({"title": str(it.get("title", "")), "desc": str(it.get("desc", ""))})
-                else:
-                    items_norm.append(str(it))
-            self.backlog.set_items(items_norm)
-            if backlog_items:
-                restored_any = True
+    # Archive
+    def archive_cards(self, board: OpenBoard, ids: List[int]) -> bool:
+        # Write the cards to the board's archive, then take them off the board in
+        # one batch (a clear's worth of undo). Nothing is removed if writing fails.
+        model = board.model
+        cards = [card for card in map(model.get, ids) if card is not None]
+        if not cards:
+            return False
+        records = [{"id": c.id, "lane": c.lane, "title": c.title, "desc": model.desc_text(c, cache=False)}
+                   for c in cards]
+        try:
+            board.archive().add(records)
+        except OSError as e:
+            try:
+                messagebox.showwarning("Archive failed", f"Could not archive tasks: {e}")
+            except Exception:
+                pass
+            return False
+        with model.batch():
+            for card in cards:
+                model.remove(card.id)
+        if self._archive_view is not None and self._archive_view.board is board:
+            self._archive_view.reload()
+        return True
 
-        return restored_any
+    def restore_archived(self, board: OpenBoard, entries: List[dict]) -> int:
+        # Put archived cards back at the end of the lane they left, keeping their
+        # ids (never handed out again: next_id only grows). -> number restored
+        model = board.model
+        entries = [e for e in entries if e["id"] not in model.cards]
+        try:
+            recs = board.archive().fetch(entries)
+        except (OSError, EOFError, ValueError) as e:
+            try:
+                messagebox.showwarning("Restore failed", f"Could not read the archive: {e}")
+            except Exception:
+                pass
+            return 0
+        with model.batch():
+            for rec in recs:
+                lane = rec.get("lane") if rec.get("lane") in model.lanes else DONE_LANE
+                model.apply({"op": "add", "id": rec["id"], "lane": lane, "index": None,
+                             "title": rec.get("title", ""), "desc": rec.get("desc", "")})
+        return len(recs)
+
+    def show_archive(self):
+        board = self.board
+        if board.archive() is None:
+            try:
+                messagebox.showwarning("Archive", "Shared boards have no archive in this window.")
+            except Exception:
+                pass
+            return
+        view = self._archive_view
+        if view is not None:
+            if view.board is board:
+                view.lift()
+                return
+            view.destroy()
+        self._archive_view = ArchiveBrowser(self, board)
+
+    def _age_archives(self):
+        # Archive cards that have sat in DONE_LANE for ARCHIVE_AFTER_DAYS. Not
+        # undoable: the user did not do it, and their own steps stay on top.
+        self._age_job = self.after(ARCHIVE_CHECK_MS, self._age_archives)
+        if ARCHIVE_AFTER_DAYS is None or self.drag.active:
+            return
+        now = time.time()
+        for board in list(self.boards.values()):
+            if board.archive() is None or board.reading is not None or (board is self.board and self.loader is not None):
+                continue
+            ids = board.aged(now)
+            if ids:
+                with board.history.ignoring():
+                    if self.archive_cards(board, ids):
+                        log(f"archived {len(ids):,} tasks from {board.name}")
+            board.save_marks()
+            board.times.save()
 
     def on_close(self):
         try:
-            self.save_state()
+            if self.instrument.enabled and os.environ.get("NOTTRELLO_TRACE"):
+                try:
+                    self.instrument.dump(os.environ["NOTTRELLO_TRACE"])
+                except Exception:
+                    pass
+            self.instrument.disable()
+            self.after_cancel(self._watch_job)
+            self.after_cancel(self._age_job)
+            for board in list(self.boards.values()):
+                self.wait_loaded(board)
+            self.runner.shutdown()
+            if self.loader is not None:
+                self.loader.finish()
+            for board in list(self.boards.values()):
+                if board.remote_job is not None:
+                    self.after_cancel(board.remote_job)
+                board.save_marks()
+                board.times.save()
+                try:
+                    board.saver.flush()
+                finally:
+                    board.storage.close()
         finally:
             self.destroy()
 
+# Headless command line: `python app.py import|export|move|stats ...` works on the
+# saved board directly, without a window. Input and output are streamed, and
+# imports are written in batches of CLI_BATCH cards (one journal append or one
+# SQLite transaction each), so large dumps never sit in memory twice.
+CLI_BATCH = 1000
+
+class HeadlessBoard:
+    # A board opened the way the window opens it, minus Tk
+    def __init__(self, state_path: Optional[str] = None):
+        fallback = state_path is None
+        self.model = BoardModel()
+        self.storage, self.state_path = open_storage(state_path or default_state_path(), fallback=fallback)
+        self.model.blobs = self.storage.blobs
+        self._pending: List[dict] = []
+        self.model.subscribe(self._pending.extend)
+
+    def load(self):
+        if self.storage.exists():
+            lanes, next_id, _, ops = self.storage.load_parsed(self.model.lanes)
+            self.model.load_parsed(lanes, next_id)
+            replay(self.model, ops)
+        del self._pending[:]
+
+    def lane(self, name: str) -> str:
+        # Case-insensitive lane lookup; raises ValueError for unknown names
+        if name in self.model.lanes:
+            return name
+        for lane in self.model.lanes:
+            if lane.lower() == name.strip().lower():
+                return lane
+        raise ValueError(f"unknown lane {name!r} (expected one of: {', '.join(self.model.lanes)})")
+
+    def commit(self):
+        # Persist the events recorded since the last commit (snapshot-only storage
+        # keeps them until close)
+        if not self.storage.incremental:
+            return
+        events = self.take()
+        if not events:
+            return
+        try:
+            self.storage.append(events)
+        except StaleBoard:
+            # The window (or another command) wrote meanwhile: catch up, then ours on top
+            self._rebase(events)
+            self.commit()
+
+    def take(self) -> List[dict]:
+        # The model events recorded since the last take or commit
+        events, self._pending[:] = list(self._pending), []
+        return events
+
+    def _rebase(self, events: List[dict]):
+        self.load()
+        rebase(self.model, events)
+
+    def close(self):
+        # Incremental backends are up to date; a snapshot compacts the journal
+        self.commit()
+        try:
+            if self.storage.snapshot_on_close:
+                if not self.storage.incremental and self.storage.changed_externally():
+                    self._rebase(list(self._pending))
+                self.storage.save(self.model.to_dict())
+        finally:
+            self.storage.close()
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".json":
+        return "json"
+    raise ValueError(f"cannot tell the format of {path!r}; pass --format csv|jsonl|json")
+
+def _open_text(path: str, mode: str):
+    # "-" is stdin/stdout; the returned handle is closed by the caller only if it is a file
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8", newline="")
+
+def _read_rows(fh, fmt: str, default_lane: str):
+    # Yield (lane name, title, desc) one at a time
+    if fmt == "csv":
+        import csv
+        reader = csv.DictReader(fh)
+        fields = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+        if "title" not in fields:
+            raise ValueError("CSV input needs a header row with at least a 'title' column")
+        for row in reader:
+            title = (row.get(fields["title"]) or "").strip()
+            desc = (row.get(fields["desc"]) or "") if "desc" in fields else ""
+            lane = (row.get(fields["lane"]) or "").strip() if "lane" in fields else ""
+            yield lane or default_lane, title, desc
+    elif fmt == "jsonl":
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            it = json.loads(line)
+            lane = it.get("lane") if isinstance(it, dict) else None
+            title, desc, _, _ = BoardModel._parse_item(it, strip=True)
+            yield str(lane or default_lane), title, desc
+    elif fmt == "json":
+        # A whole board file, in any format load_state accepts (including the
+        # legacy string lists); cards get fresh ids on the target board, and their
+        # descriptions come from the texts saved next to the refs
+        lanes, _, _ = BoardModel.parse_state(json.load(fh), LANES)
+        for lane, items in lanes.items():
+            for _, title, desc, _ in items:
+                yield lane, title, desc
+    else:
+        raise ValueError(f"unsupported format {fmt!r}")
+
+def cli_import(board: HeadlessBoard, args) -> int:
+    fmt = _detect_format(args.file, args.format)
+    default_lane = board.lane(args.lane)
+    model = board.model
+    cleared = set()
+    added = skipped = 0
+    fh = _open_text(args.file, "r")
+    try:
+        rows = _read_rows(fh, fmt, default_lane)
+        while True:
+            with model.batch():
+                n = 0
+                for lane, title, desc in rows:
+                    if not title:
+                        skipped += 1
+                        continue
+                    try:
+                        lane = board.lane(lane)
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    if args.replace and lane not in cleared:
+                        # --replace empties each lane the first time the input mentions it
+                        cleared.add(lane)
+                        model.clear(lane)
+                    model.add(lane, title, desc)
+                    n += 1
+                    if n >= args.batch:
+                        break
+            board.commit()
+            added += n
+            if n < args.batch:
+                break
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+    log(f"imported {added:,} cards ({skipped:,} skipped) into {board.state_path}")
+    return 0
+
+def cli_export(board: HeadlessBoard, args) -> int:
+    model = board.model
+    lanes = [board.lane(name) for name in args.lane] if args.lane else list(model.lanes)
+    fmt = _detect_format(args.file, args.format)
+    fh = _open_text(args.file, "w")
+    count = 0
+    try:
+        if fmt == "json":
+            data = inline_descs(model.to_dict(), model.blobs)
+            json.dump(data, fh, ensure_ascii=False, indent=2)
+            fh.write("\n")
+            count = len(model)
+        else:
+            if fmt == "csv":
+                import csv
+                writer = csv.writer(fh)
+                writer.writerow(["id", "lane", "title", "desc"])
+                write = lambda c: writer.writerow([c.id, c.lane, c.title, model.desc_text(c, cache=False)])
+            elif fmt == "jsonl":
+                write = lambda c: fh.write(json.dumps({"id": c.id, "lane": c.lane, "title": c.title,
+                                                       "desc": model.desc_text(c, cache=False)},
+                                                      ensure_ascii=False) + "\n")
+            else:
+                raise ValueError(f"unsupported format {fmt!r}")
+            for lane in lanes:
+                for card in model.lane_cards(lane):
+                    write(card)
+                    count += 1
+    finally:
+        if fh is not sys.stdout:
+            fh.close()
+        else:
+            fh.flush()
+    log(f"exported {count:,} cards")
+    return 0
+
+def cli_move(board: HeadlessBoard, args) -> int:
+    lane = board.lane(args.lane)
+    missing = [cid for cid in args.id if board.model.get(cid) is None]
+    if missing:
+        raise ValueError(f"no card with id {', '.join(map(str, missing))}")
+    with board.model.batch():
+        for k, cid in enumerate(args.id):
+            # Several ids land in the order given
+            board.model.move(cid, lane, None if args.index is None else args.index + k)
+    return 0
+
+def cli_stats(board: HeadlessBoard, args) -> int:
+    model = board.model
+    stats = {
+        "state": board.state_path,
+        "storage": board.storage.name,
+        "cards": len(model),
+        "next_id": model.next_id,
+        "lanes": {lane: len(model.ids(lane)) for lane in model.lanes},
+    }
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(f"{stats['state']} ({stats['storage']}): {stats['cards']:,} cards, next id {stats['next_id']}")
+        for lane, n in stats["lanes"].items():
+            print(f"  {lane:<12} {n:>9,}")
+    return 0
+
+class SyncPeer:
+    # One client of the sync server and its bounded queue of outgoing lines. A
+    # client that falls SYNC_CLIENT_BUFFER messages behind has its backlog
+    # dropped for a single snapshot (None in the queue), taken when it goes out.
+    def __init__(self, pid: int, writer, buffer: int):
+        import asyncio
+        self.id = pid
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=buffer)
+        self.stale = False   # a snapshot is queued: events until then are in it
+        self.acked = 0       # sequence number of its last batch applied
+
+    def send(self, line: bytes):
+        if self.stale:
+            return
+        if self.queue.full():
+            self.resync()
+        else:
+            self.queue.put_nowait(line)
+
+    def resync(self):
+        self.stale = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class SyncServer:
+    # `python app.py serve`: one board in memory, shared over TCP with windows
+    # started with --connect. The protocol is one JSON object per line.
+    # Descriptions are sent as text, not as refs into either side's BlobStore.
+    #   client -> server  {"op": "ops", "seq": n, "ops": [journal records]}
+    #                     (an "add" without an id gets the next free one)
+    #                     {"op": "snapshot"}
+    #   server -> client  {"type": "snapshot", "rev": r, "client": id, "acked": n, "board": {...}}
+    #                     {"type": "events", "rev": r, "events": [records + "by": client id],
+    #                      "acks": {client id: seq}, "redo": [client ids]}
+    #                     {"type": "error", "error": text}
+    # Changes from all clients within SYNC_BATCH_MS go out as one "events"
+    # message, encoded once for everyone. "redo" names clients whose batch could
+    # not be applied as sent (e.g. an id another client took first); they fetch a
+    # snapshot. Every change is appended to the board's own storage on an I/O
+    # thread, so the event loop never waits for the disk.
+    def __init__(self, board: HeadlessBoard, buffer: int = SYNC_CLIENT_BUFFER):
+        self.board = board
+        self.model = board.model
+        self.buffer = buffer
+        self.rev = 0
+        self.peers: Dict[int, SyncPeer] = {}
+        self._next_peer = 1
+        self._origin = 0                 # client whose batch is being applied (0: none)
+        self._out: List[dict] = []       # records since the last broadcast
+        self._acks: Dict[str, int] = {}
+        self._redo: List[int] = []
+        self._flush_handle = None
+        self._loop = None
+        self._disk = None
+        self._io = None
+        self.model.subscribe(self._on_change)
+
+    async def serve(self, host: str, port: int):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        self._loop = asyncio.get_running_loop()
+        self._disk = asyncio.Queue()
+        self._io = ThreadPoolExecutor(max_workers=1)
+        persist = self._loop.create_task(self._persist())
+        server = await asyncio.start_server(self._serve_peer, host, port, limit=SYNC_MAX_LINE)
+        log(f"sharing {self.board.state_path} ({len(self.model):,} cards) on {host}:{port}")
+        try:
+            await server.serve_forever()
+        finally:
+            server.close()
+            for peer in list(self.peers.values()):
+                peer.writer.close()
+            self._flush()
+            self._disk.put_nowait(None)
+            await persist
+            self._io.shutdown()
+
+    # Model changes -> one broadcast per SYNC_BATCH_MS
+    def _on_change(self, events: List[dict]):
+        for ev in events:
+            if ev["op"] in ("reset", "load"):
+                # The board was read again (see _persist): everyone starts over
+                self._out = []
+                for peer in self.peers.values():
+                    peer.resync()
+                continue
+            rec = journal_record(ev)
+            if rec is not None:
+                rec["by"] = self._origin
+                self._out.append(inline_desc(rec, self.model.blobs))
+        self._schedule()
+
+    def _schedule(self):
+        if self._flush_handle is None and self._loop is not None:
+            self._flush_handle = self._loop.call_later(SYNC_BATCH_MS / 1000, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        events = self.board.take()
+        if events and self._disk is not None:
+            self._disk.put_nowait(events)
+        if not self._out and not self._acks:
+            return
+        self.rev += 1
+        msg = {"type": "events", "rev": self.rev, "events": self._out, "acks": self._acks}
+        if self._redo:
+            msg["redo"] = self._redo
+        self._out, self._acks, self._redo = [], {}, []
+        line = sync_line(msg)
+        for peer in self.peers.values():
+            peer.send(line)
+
+    # Clients
+    async def _serve_peer(self, reader, writer):
+        peer = SyncPeer(self._next_peer, writer, self.buffer)
+        self._next_peer += 1
+        self.peers[peer.id] = peer
+        peer.resync()  # the first message is a snapshot
+        sender = self._loop.create_task(self._send(peer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    peer.send(sync_line({"type": "error", "error": "not a JSON line"}))
+                    continue
+                self._handle(peer, msg)
+        except (OSError, ValueError):
+            pass  # dropped connection, or a line over SYNC_MAX_LINE
+        finally:
+            self.peers.pop(peer.id, None)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, peer: SyncPeer):
+        try:
+            while True:
+                line = await peer.queue.get()
+                if line is None:
+                    line = await self._snapshot(peer)
+                peer.writer.write(line)
+                await peer.writer.drain()
+        except OSError:
+            pass
+
+    async def _snapshot(self, peer: SyncPeer) -> bytes:
+        # Taken when it is about to go out, after a flush, so every change in it
+        # has a revision at or below its own and none is sent twice
+        peer.stale = False
+        self._flush()
+        msg = {"type": "snapshot", "rev": self.rev, "client": peer.id, "acked": peer.acked,
+               "board": self.model.to_dict()}
+        blobs = self.model.blobs
+
+        def encode():
+            # Descriptions are read off the event loop too
+            inline_descs(msg["board"], blobs)
+            return sync_line(msg)
+        return await self._loop.run_in_executor(None, encode)
+
+    def _handle(self, peer: SyncPeer, msg):
+        op = msg.get("op") if isinstance(msg, dict) else None
+        if op == "ops":
+            if not self._apply(peer.id, msg.get("ops")):
+                self._redo.append(peer.id)
+            if isinstance(msg.get("seq"), int):
+                peer.acked = self._acks[str(peer.id)] = msg["seq"]
+            self._schedule()
+        elif op == "snapshot":
+            peer.resync()
+        else:
+            peer.send(sync_line({"type": "error", "error": f"unknown op {op!r}"}))
+
+    def _apply(self, origin: int, ops) -> bool:
+        # One client's batch, in order -> False if any of it could not be applied as sent
+        if not isinstance(ops, list):
+            return False
+        model = self.model
+        exact = True
+        renamed: Dict[int, int] = {}
+        self._origin = origin
+        try:
+            with model.batch():
+                for rec in ops:
+                    if not isinstance(rec, dict):
+                        exact = False
+                        continue
+                    rec = dict(rec)
+                    cid = rec.get("id")
+                    if rec.get("op") == "add" and (cid is None or cid in model.cards):
+                        if cid is not None:
+                            # Another client took this id first
+                            renamed[cid] = model.next_id
+                            exact = False
+                        rec["id"] = model.next_id
+                    elif cid in renamed:
+                        rec["id"] = renamed[cid]
+                    try:
+                        model.apply(rec)
+                    except (KeyError, TypeError, ValueError):
+                        exact = False
+        finally:
+            self._origin = 0
+        return exact
+
+    # Disk
+    async def _persist(self):
+        storage = self.board.storage
+        done = False
+        while not done:
+            events = await self._disk.get()
+            if events is None:
+                return
+            while not self._disk.empty():
+                # Coalesce whatever queued up during the last write
+                more = self._disk.get_nowait()
+                if more is None:
+                    done = True
+                    break
+                events.extend(more)
+            try:
+                if storage.incremental:
+                    await self._loop.run_in_executor(self._io, storage.append, events)
+                if not storage.incremental or storage.needs_compaction():
+                    data = self.model.to_dict()
+                    await self._loop.run_in_executor(self._io, storage.save, data)
+            except StaleBoard:
+                # The board's file was changed outside the server: read it again and
+                # put everything not yet written back on top
+                log("the board was changed by another process; merging")
+                while not self._disk.empty():
+                    more = self._disk.get_nowait()
+                    if more is None:
+                        done = True
+                    else:
+                        events.extend(more)
+                events.extend(self.board.take())
+                self.board._rebase(events)
+            except Exception as e:
+                log(f"could not save board: {e}")
+
+def cli_serve(board: HeadlessBoard, args) -> int:
+    import asyncio
+    server = SyncServer(board, args.buffer)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def cli(argv: List[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="notTrello", description="Work on the saved board without opening a window.")
+    parser.add_argument("--state", help="board_state.json to use (default: the app's own board)")
+    parser.add_argument("--board", help=f"board name as shown in the board switcher (default: {DEFAULT_BOARD})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="add cards from CSV (lane,title,desc), JSONL or a board JSON file")
+    p.add_argument("file", help="input file, or - for stdin")
+    p.add_argument("--format", choices=["csv", "jsonl", "json"])
+    p.add_argument("--lane", default="To-Do", help="lane for rows that do not name one (default: To-Do)")
+    p.add_argument("--replace", action="store_true", help="empty each imported lane before adding to it")
+    p.add_argument("--batch", type=int, default=CLI_BATCH, help=f"cards per write (default: {CLI_BATCH})")
+    p.set_defaults(run=cli_import, writes=True)
+
+    p = sub.add_parser("export", help="write cards as CSV, JSONL or board JSON")
+    p.add_argument("file", help="output file, or - for stdout")
+    p.add_argument("--format", choices=["csv", "jsonl", "json"])
+    p.add_argument("--lane", action="append", help="only this lane (repeatable)")
+    p.set_defaults(run=cli_export, writes=False)
+
+    p = sub.add_parser("move", help="move cards to a lane")
+    p.add_argument("id", type=int, nargs="+")
+    p.add_argument("lane")
+    p.add_argument("--index", type=int, help="position in the target lane (default: end)")
+    p.set_defaults(run=cli_move, writes=True)
+
+    p = sub.add_parser("stats", help="card counts per lane")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(run=cli_stats, writes=False)
+
+    p = sub.add_parser("serve", help="share the board with windows started with --connect HOST:PORT")
+    p.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    p.add_argument("--port", type=int, default=SYNC_PORT, help=f"default: {SYNC_PORT}")
+    p.add_argument("--buffer", type=int, default=SYNC_CLIENT_BUFFER,
+                   help=f"messages queued per client before it is sent a snapshot instead (default: {SYNC_CLIENT_BUFFER})")
+    p.set_defaults(run=cli_serve, writes=True)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "batch", 1) < 1:
+        parser.error("--batch must be at least 1")
+    if getattr(args, "buffer", 1) < 1:
+        parser.error("--buffer must be at least 1")
+    state_path = args.state
+    if args.board is not None:
+        if state_path is not None:
+            parser.error("use either --state or --board")
+        registry = BoardRegistry(os.path.dirname(default_state_path()))
+        if args.board not in registry.boards:
+            parser.error(f"no board called {args.board!r} (boards: {', '.join(registry.names())})")
+        if not registry.is_default(args.board):
+            state_path = registry.state_path(args.board)
+    board = HeadlessBoard(state_path)
+    try:
+        board.load()
+        code = args.run(board, args)
+    except (OSError, ValueError) as e:
+        log(str(e))
+        code = 2
+    finally:
+        if args.writes:
+            board.close()
+        else:
+            board.storage.close()
+    return code
+
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # Job processes of a packaged build start as this executable
+        import multiprocessing
+        multiprocessing.freeze_support()
+    if sys.argv[1:] == ["--profile-startup"]:
+        # Log state parse, widget build, first paint and full load times
+        PROFILE_STARTUP = True
+    elif sys.argv[1:2] == ["--connect"] and len(sys.argv) == 3:
+        # Open the board shared by `python app.py serve` instead of a local one
+        SYNC_SERVER = sys.argv[2]
+    elif len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
     App().mainloop()
@@ -0,0 +1,376 @@
+# Benchmarks for notTrello at realistic board sizes.
+#
+#   python bench.py                                  all scenarios at 1k/10k/100k cards
+#   python bench.py --sizes 1000 --out results.json
+#   python bench.py --save-baseline bench_baseline.json
+#   python bench.py --baseline bench_baseline.json   exit status 1 on a regression
+#
+# Each scenario runs in its own process on a freshly generated board, so the peak
+# RSS reported is that scenario's alone. GUI scenarios need a display: on Linux
+# without $DISPLAY an Xvfb server is started if one is installed, otherwise they
+# are reported as skipped (--no-gui skips them outright).
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SIZES = [1000, 10000, 100000]
+DESCS = ["short", "long"]
+REPEAT = 3
+ADD_CARDS = 200         # cards added one by one in the add_card scenario
+DRAGS = 50              # scripted drags in the drag scenario
+THRESHOLD = 0.25        # slower than baseline by more than this share is a regression
+NOISE_MS = 1.0          # differences below this are never regressions
+
+# name -> needs a display
+SCENARIOS = {
+    "storage_load": False,
+    "storage_save": False,
+    "load_state": True,
+    "save_state": True,
+    "add_card": True,
+    "get_cards_data": True,
+    "backlog_items": True,
+    "drag": True,
+}
+
+WORDS = ("fix update review deploy login page cache index report export search sync api "
+         "button layout column board backlog ticket release draft bug crash slow").split()
+
+def make_board(size: int, desc: str, seed: int = 0) -> dict:
+    # Deterministic synthetic board; most cards sit in Backlog and Complete, as on
+    # long-lived real boards
+    rnd = random.Random(seed * 1000003 + size)
+    shares = [("To-Do", 0.10), ("Blocked", 0.03), ("Priority", 0.04), ("In Progress", 0.08),
+              ("Complete", 0.35), ("Backlog", 0.40)]
+    lanes: Dict[str, list] = {}
+    next_id = 1
+    for lane, share in shares:
+        items = []
+        for _ in range(max(1, int(size * share))):
+            title = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 8)))
+            if desc == "long":
+                body = "\n\n".join(" ".join(rnd.choice(WORDS) for _ in range(60)) for _ in range(5))
+            else:
+                body = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 6)))
+            items.append({"id": next_id, "title": title, "desc": body})
+            next_id += 1
+        lanes[lane] = items
+    backlog = lanes.pop("Backlog")
+    return {"columns": lanes, "backlog": backlog, "next_id": next_id}
+
+def peak_rss_kb() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss // 1024 if sys.platform == "darwin" else rss
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+        c = Counters()
+        c.cb = ctypes.sizeof(c)
+        try:
+            if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                        ctypes.byref(c), c.cb):
+                return c.PeakWorkingSetSize // 1024
+        except Exception:
+            pass
+    return None
+
+def timed(fn, repeat: int) -> float:
+    # Median wall time of `repeat` calls, in ms
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000.0)
+    return round(statistics.median(runs), 3)
+
+def pointer(x: int, y: int, widget=None):
+    # Stand-in for a Tk event: the drag handlers only read root coordinates
+    return SimpleNamespace(x_root=x, y_root=y, x=0, y=0, widget=widget, state=0)
+
+# Scenario bodies. Each gets the imported app module and the repeat count, runs
+# against the board in $APPDATA/notTrello and returns {metric: ms}.
+
+def run_storage_load(app, repeat):
+    def load():
+        board = app.HeadlessBoard()
+        board.load()
+        board.storage.close()
+    return {"load": timed(load, repeat)}
+
+def run_storage_save(app, repeat):
+    board = app.HeadlessBoard()
+    board.load()
+    out = {"to_dict": timed(board.model.to_dict, repeat)}
+    data = board.model.to_dict()
+    out["save"] = timed(lambda: board.storage.save(dict(data)), repeat)
+    board.storage.close()
+    return out
+
+def open_app(app):
+    win = app.App()
+    win.wait_loaded()
+    if win.loader is not None:
+        win.loader.finish()
+    win.update()
+    return win
+
+def run_load_state(app, repeat):
+    win = open_app(app)
+    try:
+        # The board is read on a job thread; wait_loaded applies it here
+        out = {"load_state": timed(lambda: (win.load_state(), win.wait_loaded()), repeat)}
+        out["render"] = timed(lambda: (win.load_state(), win.wait_loaded(), win.update_idletasks()), repeat)
+        # Startup as users see it: first screen, then the remainder in slices
+        t0 = time.perf_counter()
+        win.load_state(progressive=True)
+        win.wait_loaded()
+        win.update_idletasks()
+        out["first_screen"] = round((time.perf_counter() - t0) * 1000.0, 3)
+        if win.loader is not None:
+            win.loader.finish()
+        out["progressive_total"] = round((time.perf_counter() - t0) * 1000.0, 3)
+        return out
+    finally:
+        win.on_close()
+
+def run_save_state(app, repeat):
+    win = open_app(app)
+    try:
+        return {"save_state": timed(win.save_state, repeat)}
+    finally:
+        win.on_close()
+
+def run_add_card(app, repeat):
+    win = open_app(app)
+    col = win.columns["To-Do"]
+    try:
+        def add():
+            for i in range(ADD_CARDS):
+                col.add_card(f"bench card {i}", "added by bench.py")
+                win.update_idletasks()
+        total = timed(add, repeat)
+        return {"add_card": round(total / ADD_CARDS, 3), f"add_card_x{ADD_CARDS}": total}
+    finally:
+        win.on_close()
+
+def run_get_cards_data(app, repeat):
+    win = open_app(app)
+    try:
+        return {"get_cards_data": timed(lambda: [c.get_cards_data() for c in win.columns.values()], repeat)}
+    finally:
+        win.on_close()
+
+def run_backlog_items(app, repeat):
+    win = open_app(app)
+    try:
+        backlog = win.ensure_backlog()
+        items = backlog.get_items()
+        out = {"get_items": timed(backlog.get_items, repeat)}
+        out["set_items"] = timed(lambda: (backlog.set_items(items), win.update_idletasks()), repeat)
+        return out
+    finally:
+        win.on_close()
+
+def run_drag(app, repeat):
+    win = open_app(app)
+    try:
+        src, dst = win.columns["To-Do"], win.columns["In Progress"]
+
+        def drag_once(a, b):
+            card = next(iter(a._active.values()), None)
+            if card is None:
+                return False
+            x, y = card.winfo_rootx() + 10, card.winfo_rooty() + 10
+            tx = b.winfo_rootx() + b.winfo_width() // 2
+            ty = b.winfo_rooty() + b.winfo_height() // 2
+            card._on_press(pointer(x, y, card))
+            card._on_drag(pointer((x + tx) // 2, (y + ty) // 2, card))
+            card._on_drag(pointer(tx, ty, card))
+            card._on_release(pointer(tx, ty, card))
+            win.update_idletasks()
+            return True
+
+        def drags():
+            for i in range(DRAGS):
+                a, b = (src, dst) if i % 2 == 0 else (dst, src)
+                if not drag_once(a, b):
+                    break
+        total = timed(drags, repeat)
+        return {"drag": round(total / DRAGS, 3), f"drag_x{DRAGS}": total}
+    finally:
+        win.on_close()
+
+def child(spec: dict):
+    # Runs inside the scenario's own process; prints one JSON result line
+    sys.path.insert(0, HERE)
+    import app
+    fn = globals()["run_" + spec["scenario"]]
+    metrics = fn(app, spec["repeat"])
+    print(json.dumps({"metrics": metrics, "peak_rss_kb": peak_rss_kb()}))
+
+def run_scenario(spec: dict, env: dict) -> dict:
+    tmp = tempfile.mkdtemp(prefix="nottrello-bench-")
+    try:
+        data_dir = os.path.join(tmp, "notTrello")
+        os.makedirs(data_dir)
+        with open(os.path.join(data_dir, "board_state.json"), "w", encoding="utf-8") as f:
+            json.dump(make_board(spec["size"], spec["desc"]), f)
+        child_env = dict(env, APPDATA=tmp, NOTTRELLO_STORAGE=spec["storage"])
+        if spec["storage"] == "sqlite":
+            # Migrate once up front so the scenario measures the database, not the import
+            subprocess.run([sys.executable, os.path.join(HERE, "app.py"), "stats"],
+                           env=child_env, capture_output=True, timeout=600)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(spec)],
+                              env=child_env, capture_output=True, text=True, timeout=1800)
+        if proc.returncode != 0:
+            return dict(spec, error=(proc.stderr.strip().splitlines() or ["failed"])[-1])
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        return dict(spec, **json.loads(lines[-1]))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def start_xvfb() -> Optional[subprocess.Popen]:
+    # A private X server for the GUI scenarios; None if there is no Xvfb
+    exe = shutil.which("Xvfb")
+    if exe is None:
+        return None
+    for n in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{n}") or os.path.exists(f"/tmp/.X{n}-lock"):
+            continue
+        proc = subprocess.Popen([exe, f":{n}", "-screen", "0", "1600x1000x24", "-nolisten", "tcp"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 5
+        while time.time() < deadline and proc.poll() is None:
+            if os.path.exists(f"/tmp/.X11-unix/X{n}"):
+                os.environ["DISPLAY"] = f":{n}"
+                return proc
+            time.sleep(0.05)
+        proc.kill()
+    return None
+
+def result_key(r: dict) -> str:
+    return f"{r['scenario']}/{r['size']}/{r['desc']}/{r['storage']}"
+
+def compare(results: List[dict], baseline: dict, threshold: float) -> List[str]:
+    # Lines describing each metric (and peak RSS) that got worse than the baseline
+    base = {result_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = base.get(result_key(r))
+        if old is None or "metrics" not in r or "metrics" not in old:
+            continue
+        pairs = [(name, ms, old["metrics"].get(name), "ms") for name, ms in r["metrics"].items()]
+        pairs.append(("peak_rss", r.get("peak_rss_kb"), old.get("peak_rss_kb"), "KB"))
+        for name, new, prev, unit in pairs:
+            if new is None or prev is None:
+                continue
+            floor = NOISE_MS if unit == "ms" else 1024
+            if new > prev * (1 + threshold) and new - prev > floor:
+                regressions.append(f"{result_key(r)} {name}: {prev:,.1f} -> {new:,.1f} {unit} "
+                                   f"(+{(new / prev - 1) * 100 if prev else 0:.0f}%)")
+    return regressions
+
+def report(results: List[dict]):
+    for r in results:
+        head = f"{result_key(r):<36}"
+        if "skipped" in r or "error" in r:
+            print(f"{head} {r.get('skipped') or 'error: ' + r['error']}", file=sys.stderr)
+            continue
+        metrics = "  ".join(f"{k}={v:,.1f}ms" for k, v in r["metrics"].items())
+        rss = r.get("peak_rss_kb")
+        print(f"{head} {metrics}  rss={rss / 1024:,.0f}MB" if rss else f"{head} {metrics}", file=sys.stderr)
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark notTrello load, save, render and drag.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated card counts")
+    parser.add_argument("--desc", default=",".join(DESCS), help="description lengths: short,long")
+    parser.add_argument("--storage", default="json", help="comma-separated backends: json,sqlite")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="only these (repeatable)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--no-gui", action="store_true", help="skip scenarios that need a display")
+    parser.add_argument("--out", help="write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this results file; exit 1 on regression")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also write the results as a new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(json.loads(args.child))
+        return 0
+
+    xvfb = None
+    gui = not args.no_gui
+    if gui and sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        xvfb = start_xvfb()
+        gui = xvfb is not None
+    try:
+        results = []
+        for size in [int(s) for s in args.sizes.split(",") if s]:
+            for desc in [d for d in args.desc.split(",") if d]:
+                for storage in [s for s in args.storage.split(",") if s]:
+                    for scenario in args.scenario or list(SCENARIOS):
+                        spec = {"scenario": scenario, "size": size, "desc": desc,
+                                "storage": storage, "repeat": args.repeat}
+                        if SCENARIOS[scenario] and not gui:
+                            result = dict(spec, skipped="no display")
+                        else:
+                            result = run_scenario(spec, dict(os.environ))
+                        report([result])
+                        results.append(result)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    doc = {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    text = json.dumps(doc, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    code = 1 if any("error" in r for r in results) else 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            code = 1
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
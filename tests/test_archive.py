@@ -0,0 +1,84 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from app import Archive
+
+OCT = time.mktime((2026, 10, 15, 12, 0, 0, 0, 0, -1))
+NOV = time.mktime((2026, 11, 2, 12, 0, 0, 0, 0, -1))
+
+
+def card(cid, title="t", desc=""):
+    return {"id": cid, "lane": "Complete", "title": title, "desc": desc}
+
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.archive = Archive(os.path.join(self.dir, "board.archive"))
+
+    def test_add_entries_fetch(self):
+        self.assertEqual(self.archive.entries(), [])
+        self.archive.add([card(1, "one", "first body"), card(2, "two")], now=OCT)
+        self.archive.add([card(3, "three", "third body")], now=OCT + 60)
+        self.archive.add([], now=OCT + 120)
+        entries = self.archive.entries()
+        self.assertEqual([e["id"] for e in entries], [3, 1, 2])
+        self.assertEqual([e["title"] for e in entries], ["three", "one", "two"])
+        # The index holds no descriptions; fetch reads them from the segment
+        self.assertNotIn("desc", entries[0])
+        records = self.archive.fetch(entries)
+        self.assertEqual([(r["id"], r["desc"]) for r in records], [(3, "third body"), (1, "first body"), (2, "")])
+        self.assertEqual(records[0]["at"], round(OCT + 60, 3))
+        self.assertEqual(self.archive.fetch(entries[1:2]), [records[1]])
+
+    def test_archived_again_keeps_the_newest(self):
+        self.archive.add([card(1, "old", "old body")], now=OCT)
+        self.archive.add([card(1, "new", "new body")], now=OCT + 60)
+        entries = self.archive.entries()
+        self.assertEqual([e["title"] for e in entries], ["new"])
+        self.assertEqual([r["desc"] for r in self.archive.fetch(entries)], ["new body"])
+
+    def test_segments_roll_over_by_month(self):
+        self.archive.add([card(1, "oct", "a" * 5000)], now=OCT)
+        self.archive.add([card(2, "oct again", "b")], now=OCT + 3600)
+        self.archive.add([card(3, "nov", "c")], now=NOV)
+        segments = sorted(name for name in os.listdir(self.archive.root) if name.endswith(".jsonl.gz"))
+        self.assertEqual(segments, ["2026-10.jsonl.gz", "2026-11.jsonl.gz"])
+        # Each add is one gzip member: a segment reads whole as one stream too
+        with gzip.open(os.path.join(self.archive.root, segments[0]), "rt", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+        entries = self.archive.entries()
+        self.assertEqual([(e["id"], e["seg"]) for e in entries],
+                         [(3, segments[1]), (2, segments[0]), (1, segments[0])])
+        self.assertGreater(entries[1]["off"], 0)
+        self.assertEqual(entries[2]["off"], 0)
+        records = self.archive.fetch(entries)
+        self.assertEqual([(r["id"], r["desc"]) for r in records], [(3, "c"), (2, "b"), (1, "a" * 5000)])
+
+    def test_torn_index_line_is_skipped(self):
+        self.archive.add([card(1)], now=OCT)
+        with open(os.path.join(self.archive.root, Archive.INDEX), "a", encoding="utf-8") as f:
+            f.write('{"id": 2, "lane"')
+        self.assertEqual([e["id"] for e in self.archive.entries()], [1])
+
+    def test_damaged_segment_raises(self):
+        self.archive.add([card(1)], now=OCT)
+        entries = self.archive.entries()
+        with open(os.path.join(self.archive.root, entries[0]["seg"]), "r+b") as f:
+            f.write(b"not gzip")
+        with self.assertRaises((OSError, EOFError)):
+            self.archive.fetch(entries)
+
+    def test_marks(self):
+        self.assertEqual(self.archive.load_marks(), {})
+        self.archive.save_marks({4: 12.5})
+        self.assertEqual(self.archive.load_marks(), {4: 12.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
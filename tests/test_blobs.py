@@ -0,0 +1,165 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from app import BlobStore, BoardModel, JsonStorage, UndoHistory, replay
+
+
+class BlobStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.store = BlobStore(os.path.join(self.dir, "board.blobs"))
+
+    def age_all(self, seconds=10 ** 6):
+        old = time.time() - seconds
+        for root, _, files in os.walk(self.store.root):
+            for name in files:
+                os.utime(os.path.join(root, name), (old, old))
+
+    def test_put_and_get(self):
+        ref = self.store.put("some text")
+        self.assertTrue(BlobStore.is_ref(ref))
+        self.assertEqual(self.store.put("some text"), ref)
+        self.assertTrue(self.store.has(ref))
+        # Only hashed until flushed
+        self.assertFalse(os.path.exists(self.store.root))
+        self.assertTrue(self.store.pending())
+        self.store.flush()
+        self.assertFalse(self.store.pending())
+        self.assertEqual(BlobStore(self.store.root).get(ref), "some text")
+        self.assertIsNone(self.store.put(""))
+        self.assertEqual(self.store.get("not a ref"), "")
+        self.assertEqual(self.store.get("sha256:" + "0" * 64), "")
+
+    def test_unwritable_store(self):
+        path = os.path.join(self.dir, "file")
+        open(path, "w").close()
+        store = BlobStore(os.path.join(path, "blobs"))
+        ref = store.put("text")
+        with self.assertRaises(OSError):
+            store.flush()
+        self.assertTrue(store.pending())
+        self.assertEqual(store.get(ref), "text")
+
+    def test_cache_is_bounded(self):
+        store = BlobStore(self.store.root, cache_bytes=100)
+        for i in range(50):
+            store.put(f"{i:02d}" * 5)
+        self.assertLessEqual(store._cached, 100)
+        self.assertEqual(len(store._cache), 10)
+
+    def test_gc(self):
+        live = self.store.put("live")
+        dead = self.store.put("dead")
+        self.store.flush()
+        self.age_all()
+        young = self.store.put("young")
+        self.store.flush()
+        self.assertEqual(self.store.gc([live]), 1)
+        self.assertTrue(self.store.has(live))
+        self.assertFalse(self.store.has(dead))
+        self.assertTrue(self.store.has(young))
+        self.assertFalse(self.store.gc_due())
+
+    def test_pinned_refs_survive_gc(self):
+        ref = self.store.put("held by undo")
+        self.store.pin([ref])
+        self.store.pin([ref])
+        self.store.flush()
+        self.age_all()
+        self.store.unpin([ref])
+        self.assertEqual(self.store.gc([]), 0)
+        self.store.unpin([ref])
+        self.assertEqual(self.store.gc([]), 1)
+
+    def test_undo_pins_what_it_can_bring_back(self):
+        model = BoardModel()
+        model.blobs = self.store
+        history = UndoHistory(model)
+        card = model.add("To-Do", "t", "first body")
+        first = card.ref
+        model.edit(card.id, "t", "second body")
+        second = card.ref
+        self.store.flush()
+        self.age_all()
+        self.store._cache.clear()
+        self.store.gc([card.ref])
+        self.assertTrue(self.store.has(first))
+        history.undo()
+        self.assertEqual(model.desc_text(card), "first body")
+        # Redo still needs the second body; once the history is gone it is garbage
+        self.store.gc([card.ref])
+        self.assertTrue(self.store.has(second))
+        history.clear()
+        self.store.gc([card.ref])
+        self.assertFalse(self.store.has(second))
+
+
+class DescriptionRefTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def open_board(self, path):
+        storage = JsonStorage(path)
+        model = BoardModel()
+        model.blobs = storage.blobs
+        if storage.exists():
+            lanes, next_id, _, ops = storage.load_parsed(model.lanes)
+            model.load_parsed(lanes, next_id)
+            replay(model, ops)
+        return storage, model
+
+    def descs(self, model):
+        return sorted(model.desc_text(c) for c in model.cards.values())
+
+    def test_text_that_looks_like_a_ref_stays_text(self):
+        fake = "sha256:" + "ab" * 32
+        model = BoardModel()
+        model.blobs = BlobStore(os.path.join(self.dir, "b.blobs"))
+        card = model.add("To-Do", "t", fake)
+        self.assertNotEqual(card.ref, fake)
+        self.assertEqual(model.desc_text(card), fake)
+        path = os.path.join(self.dir, "board_state.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"columns": {"To-Do": [{"id": 1, "title": "t", "desc": fake}]}}, f)
+        _, loaded = self.open_board(path)
+        self.assertEqual(self.descs(loaded), [fake])
+
+    def test_saves_hold_refs_only(self):
+        path = os.path.join(self.dir, "board_state.json")
+        storage, model = self.open_board(path)
+        events = []
+        model.subscribe(events.extend)
+        model.add("To-Do", "a", "in the snapshot")
+        storage.save(model.to_dict())
+        del events[:]
+        model.add("To-Do", "b", "in the journal")
+        storage.append(events)
+        for name in ("board_state.json", "board_state.journal"):
+            with open(os.path.join(self.dir, name), encoding="utf-8") as f:
+                text = f.read()
+            self.assertNotIn("in the", text)
+            self.assertIn("sha256:", text)
+        _, loaded = self.open_board(path)
+        self.assertEqual(self.descs(loaded), ["in the journal", "in the snapshot"])
+
+    def test_inline_texts_from_older_versions_are_stored(self):
+        path = os.path.join(self.dir, "board_state.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"columns": {"To-Do": [{"id": 1, "title": "t", "desc": "old body"}]}}, f)
+        storage, model = self.open_board(path)
+        card = model.get(1)
+        self.assertEqual((card.desc, model.desc_text(card)), ("", "old body"))
+        storage.save(model.to_dict())
+        saved = json.load(open(path, encoding="utf-8"))["columns"]["To-Do"][0]
+        self.assertEqual((saved["desc"], saved["desc_ref"]), ("", card.ref))
+        self.assertEqual(BlobStore(storage.blobs.root).get(card.ref), "old body")
+
+
+if __name__ == "__main__":
+    unittest.main()
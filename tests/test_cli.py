@@ -0,0 +1,99 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import cli
+
+
+class CliTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.state = os.path.join(self.dir, "board_state.json")
+
+    def run_cli(self, *argv):
+        # -> (exit code, stdout)
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            code = cli(["--state", self.state] + list(argv))
+        return code, out.getvalue()
+
+    def write(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        return path
+
+    def stats(self):
+        code, out = self.run_cli("stats", "--json")
+        self.assertEqual(code, 0)
+        return json.loads(out)
+
+    def export_jsonl(self, *extra):
+        code, out = self.run_cli("export", "-", "--format", "jsonl", *extra)
+        self.assertEqual(code, 0)
+        return [json.loads(line) for line in out.splitlines()]
+
+    def test_import_csv_then_export(self):
+        src = self.write("in.csv", "lane,title,desc\nblocked,waiting,on review\n,plain,\nNowhere,lost,\n,,\n")
+        self.assertEqual(self.run_cli("import", src)[0], 0)
+        rows = self.export_jsonl()
+        self.assertEqual([(r["lane"], r["title"], r["desc"]) for r in rows],
+                         [("To-Do", "plain", ""), ("Blocked", "waiting", "on review")])
+        self.assertEqual(self.stats()["cards"], 2)
+
+    def test_import_jsonl_in_batches(self):
+        lines = "".join(json.dumps({"title": f"t{i}", "desc": f"d{i}", "lane": "Backlog"}) + "\n" for i in range(25))
+        src = self.write("in.jsonl", lines)
+        self.assertEqual(self.run_cli("import", src, "--batch", "4")[0], 0)
+        rows = self.export_jsonl("--lane", "backlog")
+        self.assertEqual([r["title"] for r in rows], [f"t{i}" for i in range(25)])
+        self.assertEqual(rows[7]["desc"], "d7")
+
+    def test_replace_empties_lanes_it_imports_into(self):
+        self.run_cli("import", self.write("a.csv", "title\nold\n"))
+        self.run_cli("import", self.write("b.csv", "title\nnew\n"), "--replace")
+        self.assertEqual([r["title"] for r in self.export_jsonl()], ["new"])
+
+    def test_json_export_imports_elsewhere(self):
+        self.run_cli("import", self.write("a.csv", "lane,title,desc\nPriority,p,body\nComplete,c,\n"))
+        out = os.path.join(self.dir, "out.json")
+        self.assertEqual(self.run_cli("export", out)[0], 0)
+        exported = json.load(open(out, encoding="utf-8"))
+        self.assertEqual(exported["columns"]["Priority"][0]["desc"], "body")
+        self.assertNotIn("desc_ref", exported["columns"]["Priority"][0])
+        self.state = os.path.join(self.dir, "second.json")
+        self.assertEqual(self.run_cli("import", out)[0], 0)
+        self.assertEqual([(r["lane"], r["title"], r["desc"]) for r in self.export_jsonl()],
+                         [("Priority", "p", "body"), ("Complete", "c", "")])
+
+    def test_csv_export(self):
+        self.run_cli("import", self.write("a.csv", "title,desc\n\"a, b\",\"multi\nline\"\n"))
+        code, out = self.run_cli("export", "-", "--format", "csv")
+        self.assertEqual(code, 0)
+        rows = list(csv.reader(io.StringIO(out)))
+        self.assertEqual(rows[0], ["id", "lane", "title", "desc"])
+        self.assertEqual(rows[1][1:], ["To-Do", "a, b", "multi\nline"])
+
+    def test_move(self):
+        self.run_cli("import", self.write("a.csv", "title\na\nb\nc\n"))
+        ids = [r["id"] for r in self.export_jsonl()]
+        self.assertEqual(self.run_cli("move", str(ids[2]), str(ids[0]), "in progress", "--index", "0")[0], 0)
+        self.assertEqual([(r["lane"], r["title"]) for r in self.export_jsonl()],
+                         [("To-Do", "b"), ("In Progress", "c"), ("In Progress", "a")])
+
+    def test_errors_exit_2(self):
+        self.run_cli("import", self.write("a.csv", "title\na\n"))
+        self.assertEqual(self.run_cli("move", "999", "To-Do")[0], 2)
+        self.assertEqual(self.run_cli("import", self.write("a.txt", "x"))[0], 2)
+        self.assertEqual(self.run_cli("import", self.write("b.csv", "name\nx\n"))[0], 2)
+        self.assertEqual(self.stats()["cards"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import datetime
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+from array import array
+from unittest import mock
+
+import app
+from app import LANES, FlowStats, TransitionLog
+
+
+def local_day(t):
+    # Days from 1970-01-01 to the local date at `t`
+    return datetime.date(*time.localtime(t)[:3]).toordinal() - datetime.date(1970, 1, 1).toordinal()
+
+
+def history(n, cards, seed, start=1.7e9, span=3e7):
+    # Random columns: time ordered, lanes and cards in no particular order
+    rnd = random.Random(seed)
+    times = array("d", sorted(start + rnd.random() * span for _ in range(n)))
+    ids = array("I", (rnd.randrange(cards) for _ in range(n)))
+    src = array("b", (rnd.randint(-1, len(LANES) - 1) for _ in range(n)))
+    dst = array("b", (rnd.randint(-1, len(LANES) - 1) for _ in range(n)))
+    return times, ids, src, dst
+
+
+def summary(stats):
+    # Visits in a lane come out in a different order from each path
+    return (stats.records, stats.arrive, stats.leave, stats.entered,
+            stats.created, stats.started, stats.finished,
+            [sorted(zip(d, e)) for d, e in zip(stats.durations, stats.ended)])
+
+
+class TransitionLogTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.log = TransitionLog(os.path.join(self.dir, "board.flow"))
+
+    def test_record_and_read(self):
+        seen = []
+        self.log.subscribe(lambda *block: seen.append(block))
+        self.log.record([
+            {"op": "add", "id": 1, "lane": "To-Do"},
+            {"op": "move", "id": 1, "from_lane": "To-Do", "lane": "In Progress"},
+            {"op": "move", "id": 1, "from_lane": "In Progress", "lane": "In Progress"},
+            {"op": "edit", "id": 1},
+        ], now=100.0)
+        self.log.record([{"op": "remove", "id": 1, "lane": "In Progress"}], now=200.0)
+        self.log.record([{"op": "edit", "id": 1}], now=300.0)
+        self.assertEqual(len(seen), 2)
+        # Buffered until flushed
+        size, held = self.log.tail()
+        self.assertEqual((size, len(held)), (0, 2))
+        self.log.flush()
+        self.assertEqual(self.log.tail(), (os.path.getsize(self.log.path), []))
+        times, ids, src, dst = self.log.read()
+        todo, doing = LANES.index("To-Do"), LANES.index("In Progress")
+        self.assertEqual(list(times), [100.0, 100.0, 200.0])
+        self.assertEqual(list(ids), [1, 1, 1])
+        self.assertEqual(list(src), [-1, todo, doing])
+        self.assertEqual(list(dst), [todo, doing, -1])
+
+    def test_torn_block_is_ignored(self):
+        self.log.record([{"op": "add", "id": 1, "lane": "To-Do"}], now=1.0)
+        self.log.flush()
+        whole = self.log.size()
+        self.log.record([{"op": "add", "id": 2, "lane": "To-Do"}], now=2.0)
+        self.log.flush()
+        self.assertEqual(list(self.log.read(whole)[1]), [1])
+        with open(self.log.path, "r+b") as f:
+            f.truncate(self.log.size() - 1)
+        self.assertEqual(list(self.log.read()[1]), [1])
+
+    def test_blocks_replay_into_stats(self):
+        stats = FlowStats()
+        self.log.subscribe(stats.add_block)
+        self.log.record([{"op": "add", "id": 1, "lane": "To-Do"}], now=1000.0)
+        self.log.record([{"op": "move", "id": 1, "from_lane": "To-Do", "lane": "In Progress"}], now=1600.0)
+        self.log.record([{"op": "move", "id": 1, "from_lane": "In Progress", "lane": "Complete"}], now=5000.0)
+        self.log.flush()
+        again = FlowStats()
+        again.bulk(*self.log.read())
+        self.assertEqual(summary(again), summary(stats))
+        self.assertEqual(list(stats.visits(LANES.index("To-Do"))), [600.0])
+        self.assertEqual(stats.cycle_times(), [3400.0])
+        self.assertEqual(stats.lead_times(), [4000.0])
+
+
+class FlowStatsTest(unittest.TestCase):
+    def incremental(self, cols, step=97):
+        stats = FlowStats()
+        for i in range(0, len(cols[0]), step):
+            stats.add_block(*(c[i:i + step] for c in cols))
+        return stats
+
+    def without_numpy(self, cols):
+        stats = FlowStats()
+        with mock.patch.object(app, "_numpy", lambda: None):
+            stats.bulk(*cols)
+        return stats
+
+    def test_bulk_matches_incremental(self):
+        for seed, cards in ((1, 3), (2, 40), (3, 500)):
+            cols = history(3000, cards, seed)
+            expected = summary(self.incremental(cols))
+            self.assertEqual(summary(self.without_numpy(cols)), expected)
+            if app._numpy() is not None:
+                stats = FlowStats()
+                stats.bulk(*cols)
+                self.assertEqual(summary(stats), expected)
+
+    def test_bulk_of_interleaved_blocks(self):
+        # Two windows' blocks out of time order: taken in time order
+        cols = history(2000, 30, 4)
+        swapped = tuple(c[1000:] + c[:1000] for c in cols)
+        self.assertEqual(summary(self.without_numpy(swapped)), summary(self.incremental(cols)))
+
+    def test_sparse_card_ids(self):
+        times, ids, src, dst = history(1000, 20, 5)
+        ids = array("I", (i * 10 ** 8 for i in ids))
+        cols = (times, ids, src, dst)
+        self.assertEqual(summary(self.without_numpy(cols)), summary(self.incremental(cols)))
+
+    def test_single_record(self):
+        cols = (array("d", [5.0]), array("I", [3]), array("b", [-1]), array("b", [0]))
+        stats = self.without_numpy(cols)
+        self.assertEqual(summary(stats), summary(self.incremental(cols)))
+        self.assertEqual(stats.entered, {3: (0, 5.0)})
+
+    def test_days_follow_daylight_saving(self):
+        if not hasattr(time, "tzset"):
+            self.skipTest("no time.tzset")
+        self.addCleanup(time.tzset)
+        with mock.patch.dict(os.environ, {"TZ": "America/New_York"}):
+            time.tzset()
+            # Around midnight either side of both 2024 changes
+            marks = []
+            for date in ("2024-03-09", "2024-03-10", "2024-03-11", "2024-11-02", "2024-11-03", "2024-11-04"):
+                midnight = time.mktime(time.strptime(date, "%Y-%m-%d"))
+                marks += [midnight - 60, midnight + 60, midnight + 3 * 3600]
+            times = array("d", sorted(marks))
+            stats = FlowStats()
+            for t in times:
+                self.assertEqual(stats.day(t), local_day(t))
+                self.assertEqual(stats.day(FlowStats.day_start(stats.day(t))), stats.day(t))
+            n = len(times)
+            cols = (times, array("I", range(n)), array("b", [-1]) * n, array("b", [0]) * n)
+            expected = {}
+            for t in times:
+                expected[local_day(t)] = expected.get(local_day(t), 0) + 1
+            for stats in (self.incremental(cols, step=5), self.without_numpy(cols)):
+                self.assertEqual({day: counts[0] for day, counts in stats.arrive.items()}, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from app import BoardModel, JsonStorage, StaleBoard, replay
+
+
+def open_board(path, journal=True):
+    storage = JsonStorage(path, journal=journal)
+    model = BoardModel()
+    model.blobs = storage.blobs
+    if storage.exists():
+        lanes, next_id, _, ops = storage.load_parsed(model.lanes)
+        model.load_parsed(lanes, next_id)
+        replay(model, ops)
+    return storage, model
+
+
+def texts(model):
+    return {c.id: (c.lane, c.title, model.desc_text(c)) for c in model.cards.values()}
+
+
+class JsonStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "board_state.json")
+
+    def edit_some(self, storage, model):
+        events = []
+        model.subscribe(events.extend)
+        a = model.add("To-Do", "a", "first body")
+        b = model.add("To-Do", "b")
+        model.move(a.id, "In Progress")
+        model.edit(b.id, "b2", "second body")
+        model.add("Backlog", "idea")
+        storage.append(events)
+        model.unsubscribe(events.extend)
+
+    def test_journal_replays_on_load(self):
+        storage, model = open_board(self.path)
+        self.edit_some(storage, model)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(storage.journal_path))
+        _, again = open_board(self.path)
+        self.assertEqual(texts(again), texts(model))
+        self.assertEqual(again.next_id, model.next_id)
+
+    def test_compaction_trims_journal(self):
+        storage, model = open_board(self.path)
+        self.edit_some(storage, model)
+        storage.save(model.to_dict())
+        self.assertFalse(os.path.exists(storage.journal_path))
+        snapshot = json.load(open(self.path, encoding="utf-8"))
+        self.assertEqual(snapshot["seq"], storage.seq)
+        again_storage, again = open_board(self.path)
+        self.assertTrue(again_storage.cache_hit)
+        self.assertEqual(texts(again), texts(model))
+
+    def test_lines_covered_by_snapshot_are_skipped(self):
+        # A crash between writing the snapshot and trimming the journal
+        storage, model = open_board(self.path)
+        self.edit_some(storage, model)
+        with open(storage.journal_path, encoding="utf-8") as f:
+            lines = f.read()
+        storage.save(model.to_dict())
+        with open(storage.journal_path, "w", encoding="utf-8") as f:
+            f.write(lines)
+        _, again = open_board(self.path)
+        self.assertEqual(texts(again), texts(model))
+
+    def test_torn_last_line_is_ignored(self):
+        storage, model = open_board(self.path)
+        self.edit_some(storage, model)
+        with open(storage.journal_path, "a", encoding="utf-8") as f:
+            f.write('{"op": "add", "id": 99, "la')
+        _, again = open_board(self.path)
+        self.assertEqual(texts(again), texts(model))
+
+    def test_other_writer_makes_appends_stale(self):
+        storage, model = open_board(self.path)
+        self.edit_some(storage, model)
+        other, theirs = open_board(self.path)
+        self.edit_some(other, theirs)
+        self.assertTrue(storage.changed_externally())
+        with self.assertRaises(StaleBoard):
+            self.edit_some(storage, model)
+
+    def test_own_writes_are_not_external_changes(self):
+        storage, model = open_board(self.path)
+        self.edit_some(storage, model)
+        self.assertFalse(storage.changed_externally())
+        # A check from another thread while a write is under way
+        seen = []
+        with storage._lock:
+            with open(storage.journal_path, "a", encoding="utf-8") as f:
+                f.write("\n")
+            check = threading.Thread(target=lambda: seen.append(storage.changed_externally()))
+            check.start()
+            check.join()
+        self.assertEqual(seen, [False])
+
+    def test_snapshot_only(self):
+        storage, model = open_board(self.path, journal=False)
+        model.add("To-Do", "a", "body")
+        storage.save(model.to_dict())
+        self.assertFalse(os.path.exists(storage.journal_path))
+        _, again = open_board(self.path, journal=False)
+        self.assertEqual(texts(again), texts(model))
+
+    def test_saved_file_holds_description_refs(self):
+        storage, model = open_board(self.path)
+        self.edit_some(storage, model)
+        storage.save(model.to_dict())
+        saved = json.load(open(self.path, encoding="utf-8"))
+        card = saved["columns"]["In Progress"][0]
+        self.assertEqual(card["desc"], "")
+        self.assertEqual(storage.blobs.get(card["desc_ref"]), "first body")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+import random
+import unittest
+from unittest import mock
+
+from app import BACKLOG, BoardModel, LANES, Lane
+
+
+def titles(model, lane):
+    return [c.title for c in model.lane_cards(lane)]
+
+
+class BoardModelTest(unittest.TestCase):
+    def setUp(self):
+        self.model = BoardModel()
+        self.events = []
+        self.model.subscribe(self.events.extend)
+
+    def test_add_move_edit_remove(self):
+        m = self.model
+        a = m.add("To-Do", "a")
+        b = m.add("To-Do", "b")
+        c = m.add("To-Do", "c", index=0)
+        self.assertEqual(titles(m, "To-Do"), ["c", "a", "b"])
+        m.move(b.id, "To-Do", 1)
+        self.assertEqual(titles(m, "To-Do"), ["c", "b", "a"])
+        m.move(c.id, "Complete")
+        self.assertEqual(titles(m, "Complete"), ["c"])
+        m.edit(a.id, "a2", "body")
+        self.assertEqual((m.get(a.id).title, m.desc_text(m.get(a.id))), ("a2", "body"))
+        m.remove(b.id)
+        self.assertEqual(titles(m, "To-Do"), ["a2"])
+        self.assertIsNone(m.get(b.id))
+        self.assertEqual(len(m), 2)
+        self.assertEqual([ev["op"] for ev in self.events], ["add", "add", "add", "move", "move", "edit", "remove"])
+        self.assertEqual(self.events[3]["from_index"], 2)
+        self.assertEqual(self.events[3]["index"], 1)
+
+    def test_unknown_lane(self):
+        with self.assertRaises(KeyError):
+            self.model.add("Nowhere", "x")
+
+    def test_unchanged_edit_emits_nothing(self):
+        card = self.model.add("To-Do", "a", "d")
+        del self.events[:]
+        self.model.edit(card.id, "a", "d")
+        self.assertEqual(self.events, [])
+
+    def test_batch_is_one_notification(self):
+        calls = []
+        self.model.subscribe(calls.append)
+        with self.model.batch():
+            self.model.add_many("To-Do", [("a", ""), ("b", ""), ("c", "")])
+            self.model.clear("To-Do")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([ev["op"] for ev in calls[0]], ["add"] * 3 + ["remove"] * 3)
+
+    def test_many_inserts_at_one_spot_keep_order(self):
+        # Repeated halving of the gap forces the lane to renumber its keys
+        m = self.model
+        m.add("To-Do", "first")
+        m.add("To-Do", "last")
+        for i in range(100):
+            m.add("To-Do", str(i), index=1 + i)
+        self.assertEqual(titles(m, "To-Do"), ["first"] + [str(i) for i in range(100)] + ["last"])
+
+    def test_apply_replays_events(self):
+        m = self.model
+        a = m.add("To-Do", "a")
+        m.add("Blocked", "b")
+        m.move(a.id, "Blocked", 0)
+        m.edit(a.id, "a!", "why")
+        other = BoardModel()
+        for ev in self.events:
+            other.apply(ev)
+        self.assertEqual(other.to_dict(), m.to_dict())
+
+    def test_round_trip(self):
+        m = self.model
+        m.add("To-Do", "a", "desc a")
+        m.add(BACKLOG, "  idea  ")
+        m.add("Complete", "done")
+        other = BoardModel()
+        self.assertTrue(other.load(m.to_dict()))
+        self.assertEqual(other.to_dict(), m.to_dict())
+        self.assertEqual(titles(other, BACKLOG), ["  idea  "])
+
+    def test_legacy_formats(self):
+        data = {"columns": {"To-Do": ["a", " b ", ""], "Complete": [{"title": "c", "desc": "d"}]},
+                "backlog": ["x"]}
+        lanes, next_id, restored = BoardModel.parse_state(data, LANES)
+        self.assertTrue(restored)
+        self.assertEqual([t for _, t, _, _ in lanes["To-Do"]], ["a", "b"])
+        self.assertEqual(lanes["Complete"][0][1:3], ("c", "d"))
+        ids = [cid for items in lanes.values() for cid, _, _, _ in items]
+        self.assertEqual(len(set(ids)), 4)
+        self.assertEqual(next_id, max(ids) + 1)
+
+    def test_duplicate_ids_get_fresh_ones(self):
+        data = {"columns": {"To-Do": [{"id": 5, "title": "a"}, {"id": 5, "title": "b"}]}, "next_id": 2}
+        m = BoardModel()
+        m.load(data)
+        self.assertEqual(sorted(m.cards), [5, 6])
+        self.assertEqual(m.add("To-Do", "c").id, 7)
+
+    def test_load_emits_reset(self):
+        self.model.load({"columns": {"To-Do": ["a"]}})
+        self.assertEqual(self.events[-1], {"op": "reset"})
+
+
+class LaneTest(unittest.TestCase):
+    def setUp(self):
+        # Small blocks, so they split and empty out often
+        patcher = mock.patch.object(Lane, "LOAD", 4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_matches_a_sorted_list(self):
+        rng = random.Random(7)
+        lane = Lane()
+        lane.extend([0.0, 1.0, 2.0], [10, 11, 12])
+        ref = [(0.0, 10), (1.0, 11), (2.0, 12)]
+        next_id = 13
+        for _ in range(2000):
+            if ref and rng.random() < 0.45:
+                pos, cid = ref.pop(rng.randrange(len(ref)))
+                index = lane.remove(pos, cid)
+            else:
+                index = rng.randint(0, len(ref))
+                pos = lane.key_for_index(index)
+                if pos is None:
+                    lane.reset([cid for _, cid in ref])
+                    ref = [(float(i), cid) for i, (_, cid) in enumerate(ref)]
+                    pos = lane.key_for_index(index)
+                cid = next_id
+                next_id += 1
+                self.assertEqual(lane.insert(pos, cid), index)
+                ref.insert(index, (pos, cid))
+            ids = [cid for _, cid in ref]
+            self.assertEqual(len(lane), len(ref))
+            self.assertEqual(list(lane.ids), ids)
+            if ref:
+                k = rng.randrange(len(ref))
+                self.assertEqual(lane.index_of(*ref[k]), k)
+                self.assertEqual(lane.ids[k], ids[k])
+                self.assertEqual(lane.ids[-1], ids[-1])
+                self.assertEqual(lane.ids[k:k + 9], ids[k:k + 9])
+                self.assertEqual(lane.ids.index(ids[k]), k)
+                self.assertEqual(lane.key_at(k), ref[k][0])
+
+    def test_ids_view_stays_current(self):
+        model = BoardModel()
+        view = model.ids("To-Do")
+        cards = [model.add("To-Do", str(i)) for i in range(20)]
+        self.assertEqual(view, [c.id for c in cards])
+        model.remove(cards[3].id)
+        self.assertNotIn(cards[3].id, view)
+        self.assertEqual(len(view), 19)
+        model.restore("To-Do", [(cards[3].id, 3, "3", "", "")])
+        self.assertEqual(view, [c.id for c in cards])
+        self.assertEqual(view[2:5], [c.id for c in cards[2:5]])
+        self.assertEqual(list(reversed(view)), [c.id for c in reversed(cards)])
+
+
+class BoardModelSyncTest(unittest.TestCase):
+    def copy(self, model):
+        other = BoardModel()
+        other.load(model.to_dict())
+        return other
+
+    def test_sync_matches_other_board(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            mine = BoardModel()
+            for i in range(40):
+                mine.add(rng.choice(LANES), f"card {i}")
+            theirs = self.copy(mine)
+            for _ in range(30):
+                ids = list(theirs.cards)
+                roll = rng.random()
+                if roll < 0.3:
+                    theirs.add(rng.choice(LANES), "new", "text", index=rng.randrange(5))
+                elif roll < 0.5 and ids:
+                    theirs.remove(rng.choice(ids))
+                elif roll < 0.8 and ids:
+                    theirs.move(rng.choice(ids), rng.choice(LANES), rng.randrange(5))
+                elif ids:
+                    theirs.edit(rng.choice(ids), "edited", str(rng.random()))
+            mine.sync(theirs)
+            self.assertEqual(mine.to_dict(), theirs.to_dict())
+
+    def test_sync_touches_only_what_changed(self):
+        mine = BoardModel()
+        cards = [mine.add("To-Do", str(i)) for i in range(20)]
+        theirs = self.copy(mine)
+        theirs.move(cards[5].id, "To-Do", 15)
+        theirs.edit(cards[0].id, "renamed", "")
+        events = []
+        mine.subscribe(events.extend)
+        self.assertTrue(mine.sync(theirs))
+        self.assertEqual([(ev["op"], ev["id"]) for ev in events], [("move", cards[5].id), ("edit", cards[0].id)])
+        self.assertEqual(mine.to_dict(), theirs.to_dict())
+
+    def test_sync_of_equal_boards_is_silent(self):
+        mine = BoardModel()
+        mine.add("To-Do", "a", "b")
+        calls = []
+        mine.subscribe(calls.append)
+        self.assertFalse(mine.sync(self.copy(mine)))
+        self.assertEqual(calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
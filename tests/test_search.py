@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import BACKLOG, BlobStore, BoardModel, SearchIndex, read_desc_tokens
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.model = BoardModel()
+        self.model.blobs = BlobStore(os.path.join(self.dir, "board.blobs"))
+        self.search = SearchIndex(self.model)
+
+    def test_prefix_matches(self):
+        a = self.model.add("To-Do", "Deploy the login page")
+        b = self.model.add(BACKLOG, "Deployment notes")
+        self.model.add("To-Do", "Fix cache")
+        self.assertEqual(self.search.query("deploy"), {a.id, b.id})
+        self.assertEqual(self.search.query("DEPLOYM"), {b.id})
+        self.assertEqual(self.search.query("log"), {a.id})
+        self.assertEqual(self.search.query("ogin"), set())
+        self.assertIsNone(self.search.query("  "))
+
+    def test_every_word_must_match(self):
+        a = self.model.add("To-Do", "deploy login", "slow page")
+        b = self.model.add("To-Do", "deploy cache")
+        self.model.add("To-Do", "login")
+        self.assertEqual(self.search.query("deploy"), {a.id, b.id})
+        self.assertEqual(self.search.query("dep log"), {a.id})
+        self.assertEqual(self.search.query("log dep sl"), {a.id})
+        self.assertEqual(self.search.query("dep nothing"), set())
+
+    def test_short_words_alone_match_whole_words(self):
+        a = self.model.add("To-Do", "a plan")
+        b = self.model.add("To-Do", "api page")
+        self.assertEqual(self.search.query("a"), {a.id})
+        self.assertEqual(self.search.query("p"), set())
+        self.assertEqual(self.search.query("ap"), {b.id})
+        # Next to a longer word, still a prefix
+        self.assertEqual(self.search.query("page a"), {b.id})
+        self.assertEqual(self.search.query("pl a"), {a.id})
+
+    def test_edits_and_removals_update_the_index(self):
+        card = self.model.add("To-Do", "release draft", "notes")
+        other = self.model.add("To-Do", "release")
+        self.model.edit(card.id, "crash report", "notes")
+        self.assertEqual(self.search.query("draft"), set())
+        self.assertEqual(self.search.query("release"), {other.id})
+        self.assertEqual(self.search.query("crash"), {card.id})
+        self.assertEqual(self.search.query("notes"), {card.id})
+        self.model.move(card.id, BACKLOG)
+        self.assertEqual(self.search.query("crash"), {card.id})
+        self.model.remove(card.id)
+        self.assertEqual(self.search.query("crash"), set())
+        self.assertEqual(self.search.query("notes"), set())
+        self.model.load({"columns": {"To-Do": [{"id": 9, "title": "fresh"}]}, "next_id": 10})
+        self.assertEqual(self.search.query("release"), set())
+        self.assertEqual(self.search.query("fresh"), {9})
+
+    def test_partial_queries_leave_descriptions_unread(self):
+        card = self.model.add("To-Do", "title", "hidden words")
+        self.assertEqual(self.search.query("hidden", partial=True), set())
+        self.assertTrue(self.search.has_unread())
+        # What the window's job does, then asks again
+        self.search.add_desc_tokens(read_desc_tokens(None, self.model.blobs, self.search.take_unread()))
+        self.assertEqual(self.search.query("hidden", partial=True), {card.id})
+
+    def test_full_queries_read_descriptions(self):
+        card = self.model.add("To-Do", "title", "hidden words")
+        self.assertEqual(self.search.query("hidden"), {card.id})
+        self.assertFalse(self.search.has_unread())
+
+    def test_tokens_read_before_an_edit_are_dropped(self):
+        card = self.model.add("To-Do", "title", "old words")
+        items = self.search.take_unread()
+        self.model.edit(card.id, "title", "new words")
+        self.search.add_desc_tokens(read_desc_tokens(None, self.model.blobs, items))
+        self.assertEqual(self.search.query("old"), set())
+        self.assertEqual(self.search.query("new"), {card.id})
+
+
+if __name__ == "__main__":
+    unittest.main()
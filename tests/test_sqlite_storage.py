@@ -0,0 +1,161 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import app
+from app import BoardModel, JsonStorage, SqliteStorage, StaleBoard, Storage, replay
+
+
+def open_board(path):
+    storage = SqliteStorage(path)
+    model = BoardModel()
+    model.blobs = storage.blobs
+    if storage.exists():
+        lanes, next_id, _, ops = storage.load_parsed(model.lanes)
+        model.load_parsed(lanes, next_id)
+        replay(model, ops)
+    return storage, model
+
+
+def texts(model):
+    return {c.id: (c.lane, model.index_of(c.id), c.title, model.desc_text(c)) for c in model.cards.values()}
+
+
+class SqliteStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "board_state.db")
+
+    def test_events_round_trip(self):
+        storage, model = open_board(self.path)
+        self.addCleanup(storage.close)
+        model.subscribe(storage.append)
+        a = model.add("To-Do", "a", "body a")
+        b = model.add("To-Do", "b")
+        c = model.add("To-Do", "c", index=1)
+        model.move(a.id, "To-Do", 2)
+        model.move(b.id, "Complete")
+        model.edit(c.id, "c2", "body c")
+        model.remove(b.id)
+        other, again = open_board(self.path)
+        self.addCleanup(other.close)
+        self.assertEqual(texts(again), texts(model))
+        self.assertEqual(again.next_id, model.next_id)
+
+    def test_save_round_trip(self):
+        model = BoardModel()
+        for i in range(50):
+            model.add("Backlog" if i % 3 else "Priority", f"card {i}", f"body {i % 7}")
+        storage, _ = open_board(self.path)
+        self.addCleanup(storage.close)
+        model.blobs = storage.blobs
+        storage.save(model.to_dict())
+        other, again = open_board(self.path)
+        self.addCleanup(other.close)
+        self.assertEqual(texts(again), texts(model))
+
+    def test_import_json_folds_in_the_journal(self):
+        json_path = os.path.join(self.dir, "board_state.json")
+        source = JsonStorage(json_path)
+        model = BoardModel()
+        model.blobs = source.blobs
+        model.add("To-Do", "saved", "in the snapshot")
+        source.save(model.to_dict())
+        events = []
+        model.subscribe(events.extend)
+        model.add("Blocked", "journalled", "only in the journal")
+        source.append(events)
+        storage = SqliteStorage(self.path)
+        self.addCleanup(storage.close)
+        self.assertTrue(storage.import_json(json_path))
+        other, again = open_board(self.path)
+        self.addCleanup(other.close)
+        self.assertEqual(sorted(t[2:] for t in texts(again).values()),
+                         [("journalled", "only in the journal"), ("saved", "in the snapshot")])
+
+    def test_import_of_an_empty_board_writes_nothing(self):
+        json_path = os.path.join(self.dir, "board_state.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            f.write("{}")
+        storage = SqliteStorage(self.path)
+        self.assertFalse(storage.import_json(json_path))
+        self.assertFalse(storage.exists())
+
+    def test_failed_import_leaves_no_database(self):
+        json_path = os.path.join(self.dir, "board_state.json")
+        source = JsonStorage(json_path)
+        model = BoardModel()
+        model.add("To-Do", "saved")
+        source.save(model.to_dict())
+
+        def broken_save(storage, data):
+            storage._db()
+            raise sqlite3.OperationalError("disk I/O error")
+
+        with mock.patch.object(app, "STORAGE_BACKEND", "sqlite"), \
+                mock.patch.object(SqliteStorage, "save", broken_save), mock.patch.object(app, "log"):
+            storage, used = app.open_storage(json_path, fallback=False)
+        self.assertIsInstance(storage, JsonStorage)
+        self.assertEqual(used, json_path)
+        self.assertFalse(os.path.exists(self.path))
+        # The next start tries again
+        with mock.patch.object(app, "STORAGE_BACKEND", "sqlite"):
+            storage, _ = app.open_storage(json_path, fallback=False)
+        self.addCleanup(storage.close)
+        self.assertIsInstance(storage, SqliteStorage)
+        self.assertTrue(storage.exists())
+
+    def test_other_connection_makes_appends_stale(self):
+        first, model = open_board(self.path)
+        model.subscribe(first.append)
+        model.add("To-Do", "a")
+        first.close()
+        storage, model = open_board(self.path)
+        self.addCleanup(storage.close)
+        model.subscribe(storage.append)
+        other, theirs = open_board(self.path)
+        self.addCleanup(other.close)
+        theirs.subscribe(other.append)
+        theirs.add("To-Do", "b")
+        self.assertTrue(storage.changed_externally())
+        with self.assertRaises(StaleBoard):
+            model.add("To-Do", "c")
+
+    def test_rows_from_before_desc_ref_are_read(self):
+        db = sqlite3.connect(self.path)
+        db.executescript("""
+            CREATE TABLE cards (id INTEGER PRIMARY KEY, lane TEXT NOT NULL, pos REAL NOT NULL,
+                                title TEXT NOT NULL, desc TEXT NOT NULL DEFAULT '');
+            INSERT INTO cards VALUES (1, 'To-Do', 0, 'a', 'plain text');
+            INSERT INTO cards VALUES (2, 'To-Do', 1, 'b', 'sha256:%s');
+        """ % ("ab" * 32))
+        db.commit()
+        db.close()
+        storage, model = open_board(self.path)
+        self.addCleanup(storage.close)
+        self.assertEqual([model.desc_text(c) for c in model.lane_cards("To-Do")],
+                         ["plain text", "sha256:" + "ab" * 32])
+        events = []
+        model.subscribe(events.extend)
+        model.edit(1, "a", "new text")
+        storage.append(events)
+        rows = sqlite3.connect(self.path).execute("SELECT desc, desc_ref FROM cards ORDER BY id").fetchall()
+        self.assertEqual(rows, [("", model.get(1).ref), ("sha256:" + "ab" * 32, "")])
+
+
+class StorageBaseTest(unittest.TestCase):
+    def test_incomplete_backend_cannot_be_created(self):
+        class LoadOnly(Storage):
+            def load(self):
+                return {}, []
+
+        with self.assertRaises(TypeError):
+            LoadOnly()
+
+
+if __name__ == "__main__":
+    unittest.main()
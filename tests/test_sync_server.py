@@ -0,0 +1,135 @@
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from app import BoardModel, HeadlessBoard, SyncClient, SyncServer, replay
+
+
+class SyncServerApplyTest(unittest.TestCase):
+    # The server's merge of one client's batch, without the network
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.board = HeadlessBoard(os.path.join(self.dir, "board_state.json"))
+        self.board.load()
+        self.server = SyncServer(self.board)
+        self.model = self.board.model
+
+    def test_batch_applies_in_order(self):
+        ops = [{"op": "add", "id": 1, "lane": "To-Do", "index": 0, "title": "a", "desc": "text"},
+               {"op": "move", "id": 1, "lane": "Blocked", "index": 0},
+               {"op": "edit", "id": 1, "title": "a2", "desc": "more text"}]
+        self.assertTrue(self.server._apply(1, ops))
+        card = self.model.get(1)
+        self.assertEqual((card.lane, card.title, self.model.desc_text(card)), ("Blocked", "a2", "more text"))
+        self.assertEqual([rec["by"] for rec in self.server._out], [1, 1, 1])
+        self.assertNotIn("desc_ref", self.server._out[0])
+
+    def test_taken_id_is_renamed(self):
+        self.model.add("To-Do", "someone else's")
+        ops = [{"op": "add", "id": 1, "lane": "To-Do", "index": 1, "title": "mine"},
+               {"op": "edit", "id": 1, "title": "mine, edited"}]
+        self.assertFalse(self.server._apply(2, ops))
+        self.assertEqual([c.title for c in self.model.lane_cards("To-Do")], ["someone else's", "mine, edited"])
+
+    def test_add_without_id_gets_the_next_one(self):
+        self.assertTrue(self.server._apply(1, [{"op": "add", "lane": "To-Do", "title": "x"}]))
+        self.assertEqual(self.model.get(1).title, "x")
+
+    def test_bad_records_are_reported(self):
+        self.assertFalse(self.server._apply(1, [{"op": "remove", "id": 42}, "junk"]))
+        self.assertFalse(self.server._apply(1, "junk"))
+
+
+class SyncRoundTripTest(unittest.TestCase):
+    # A server on a local port and two clients, as `serve` and `--connect` run them
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.board = HeadlessBoard(os.path.join(self.dir, "board_state.json"))
+        self.board.load()
+        self.board.model.add("To-Do", "already there", "saved text")
+        self.board.commit()
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.server = SyncServer(self.board)
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.task = self.loop.create_task(self.server.serve("127.0.0.1", self.port))
+            self.loop.call_soon(ready.set)
+            try:
+                self.loop.run_until_complete(self.task)
+            except asyncio.CancelledError:
+                pass
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        ready.wait(5)
+        self.addCleanup(self.stop)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(5)
+        self.loop.close()
+
+    def connect(self):
+        deadline = time.monotonic() + 5
+        while True:
+            client = SyncClient(f"127.0.0.1:{self.port}", os.path.join(self.dir, "client.blobs"))
+            try:
+                client.connect()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        self.addCleanup(client.close)
+        model = BoardModel()
+        model.blobs = client.blobs
+        lanes, next_id, _, _ = client.load_parsed(model.lanes)
+        model.load_parsed(lanes, next_id)
+        model.subscribe(client.append)
+        return client, model
+
+    def pump(self, client, model, until):
+        # What App._pump_remote does, until `until()` holds
+        deadline = time.monotonic() + 5
+        while not until():
+            self.assertLess(time.monotonic(), deadline, "timed out waiting for the server")
+            client.send()
+            msg = client.poll()
+            if msg is None:
+                time.sleep(0.01)
+            elif msg["type"] == "events":
+                recs = client.received(msg)
+                model.unsubscribe(client.append)
+                replay(model, recs)
+                model.subscribe(client.append)
+
+    def texts(self, model):
+        return {c.id: (c.lane, c.title, model.desc_text(c)) for c in model.cards.values()}
+
+    def test_changes_reach_the_other_client_and_the_server(self):
+        a, model_a = self.connect()
+        b, model_b = self.connect()
+        self.assertEqual(self.texts(model_a), {1: ("To-Do", "already there", "saved text")})
+        card = model_a.add("Priority", "from a", "a's notes")
+        model_a.edit(1, "already there", "rewritten by a")
+        self.pump(a, model_a, lambda: a.sent and a.acked == a.sent)
+        self.pump(b, model_b, lambda: model_b.get(card.id) is not None
+                  and model_b.desc_text(model_b.get(1)) == "rewritten by a")
+        self.assertEqual(self.texts(model_b), self.texts(model_a))
+        self.assertEqual(self.texts(self.board.model), self.texts(model_a))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+from app import BoardModel, UndoHistory
+
+
+class UndoHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.model = BoardModel()
+        self.history = UndoHistory(self.model)
+
+    def state(self):
+        # Ids are never reused, so undo leaves next_id alone
+        data = self.model.to_dict()
+        del data["next_id"]
+        return data
+
+    def test_each_kind_of_change_undoes_and_redoes(self):
+        m, h = self.model, self.history
+        states = [self.state()]
+        a = m.add("To-Do", "a", "first")
+        states.append(self.state())
+        b = m.add("To-Do", "b")
+        states.append(self.state())
+        m.move(a.id, "Blocked")
+        states.append(self.state())
+        m.edit(b.id, "b2", "second")
+        states.append(self.state())
+        m.remove(a.id)
+        states.append(self.state())
+        for expected in reversed(states[:-1]):
+            self.assertTrue(h.undo())
+            self.assertEqual(self.state(), expected)
+        self.assertFalse(h.undo())
+        for expected in states[1:]:
+            self.assertTrue(h.redo())
+            self.assertEqual(self.state(), expected)
+        self.assertFalse(h.redo())
+
+    def test_batch_is_one_step(self):
+        m, h = self.model, self.history
+        for i in range(5):
+            m.add("Complete", str(i))
+        before = self.state()
+        m.clear("Complete")
+        self.assertEqual(len(m.ids("Complete")), 0)
+        h.undo()
+        self.assertEqual(self.state(), before)
+        self.assertTrue(h.can_redo())
+
+    def test_undo_of_scattered_removes(self):
+        m, h = self.model, self.history
+        cards = [m.add("To-Do", str(i)) for i in range(10)]
+        before = self.state()
+        with m.batch():
+            for c in cards[::3]:
+                m.remove(c.id)
+        h.undo()
+        self.assertEqual(self.state(), before)
+
+    def test_new_change_drops_redo(self):
+        m, h = self.model, self.history
+        m.add("To-Do", "a")
+        h.undo()
+        self.assertTrue(h.can_redo())
+        m.add("To-Do", "b")
+        self.assertFalse(h.can_redo())
+
+    def test_limits(self):
+        h = UndoHistory(self.model, max_steps=3)
+        for i in range(10):
+            self.model.add("To-Do", str(i))
+        self.assertEqual(len(h._undo), 3)
+        small = UndoHistory(BoardModel(), max_bytes=1000)
+        for i in range(50):
+            small.model.add("To-Do", "x" * 50)
+        self.assertLessEqual(small.bytes, 1000)
+        self.assertTrue(small.can_undo())
+
+    def test_reset_and_ignored_changes_are_not_steps(self):
+        m, h = self.model, self.history
+        m.add("To-Do", "a")
+        m.load({"columns": {"To-Do": ["b"]}})
+        self.assertFalse(h.can_undo())
+        with h.ignoring():
+            m.add("To-Do", "theirs")
+        self.assertFalse(h.can_undo())
+
+    def test_step_whose_card_is_gone_is_skipped(self):
+        m, h = self.model, self.history
+        card = m.add("To-Do", "a")
+        m.edit(card.id, "a2", "")
+        with h.ignoring():
+            m.remove(card.id)
+        self.assertTrue(h.undo())
+        self.assertIsNone(m.get(card.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
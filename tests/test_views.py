@@ -0,0 +1,137 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+
+from app import LANES, VIEW_TIMES, BoardModel, CardIndexes, CardTimes, SearchIndex, SortedIndex, ViewStore
+
+DAY = 86400
+
+
+class SortedIndexTest(unittest.TestCase):
+    def test_matches_a_sorted_list(self):
+        rng = random.Random(5)
+        ix = SortedIndex((rng.randrange(50), cid) for cid in range(100))
+        keys = dict((cid, key) for key, cid in ix.entries)
+        for _ in range(500):
+            cid = rng.randrange(150)
+            if rng.random() < 0.2:
+                ix.discard(cid)
+                keys.pop(cid, None)
+            else:
+                keys[cid] = rng.randrange(50)
+                ix.put(cid, keys[cid])
+            self.assertEqual(ix.entries, sorted((k, c) for c, k in keys.items()))
+        i, j = ix.span(10, 20)
+        self.assertEqual([k for k, _ in ix.entries[i:j]], sorted(k for k in keys.values() if 10 <= k < 20))
+        self.assertEqual(ix.span(), (0, len(ix)))
+
+
+class CardIndexesTest(unittest.TestCase):
+    VIEWS = [
+        {"sort": "created", "descending": True},
+        {"lane": "Blocked", "age_field": "entered", "older_than_days": 7, "sort": "entered"},
+        {"query": "alpha", "sort": "title"},
+        {"age_field": "updated", "newer_than_days": 20, "sort": "lane"},
+        {"query": "beta", "lane": "To-Do", "age_field": "created", "older_than_days": 30, "sort": "updated"},
+    ]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.rng = random.Random(1)
+        self.model = BoardModel()
+        self.times = CardTimes(self.model, os.path.join(self.dir, "board.times"))
+        self.search = SearchIndex(self.model)
+        with self.model.batch():
+            for i in range(2000):
+                self.model.add(self.rng.choice(LANES), f"task {i} {'alpha' if i % 10 == 0 else 'beta'}")
+        now = time.time()
+        for cid in self.model.cards:
+            rec = self.times.get(cid)
+            rec[:] = [now - self.rng.random() * 60 * DAY for _ in range(3)]
+        self.indexes = CardIndexes(self.model, self.times)
+
+    def brute(self, view, now):
+        cards = self.model.cards
+        matches = self.search.query(view.get("query") or "")
+        out = []
+        for card in cards.values():
+            if matches is not None and card.id not in matches:
+                continue
+            if view.get("lane") and card.lane != view["lane"]:
+                continue
+            if view.get("age_field"):
+                t = self.times.get(card.id)[VIEW_TIMES.index(view["age_field"])]
+                if "older_than_days" in view and not t < now - view["older_than_days"] * DAY:
+                    continue
+                if "newer_than_days" in view and not t >= now - view["newer_than_days"] * DAY:
+                    continue
+            out.append(card.id)
+
+        def key(cid):
+            card = cards[cid]
+            sort = view["sort"]
+            if sort == "title":
+                return card.title.casefold(), cid
+            if sort == "lane":
+                return LANES.index(card.lane), cid
+            return self.times.get(cid)[VIEW_TIMES.index(sort)], cid
+        out.sort(key=key, reverse=bool(view.get("descending")))
+        return out
+
+    def check(self):
+        now = time.time()
+        for view in self.VIEWS:
+            self.assertEqual(self.indexes.select(view, self.search, now), self.brute(view, now), view)
+
+    def test_select_matches_brute_force(self):
+        self.check()
+
+    def test_indexes_follow_changes(self):
+        self.check()
+        rng = self.rng
+        for step in range(500):
+            cid = rng.choice(list(self.model.cards))
+            roll = rng.random()
+            if roll < 0.4:
+                self.model.move(cid, rng.choice(LANES))
+            elif roll < 0.7:
+                self.model.edit(cid, f"renamed {step} alpha", "")
+            elif roll < 0.85:
+                self.model.remove(cid)
+            else:
+                self.model.add("Blocked", f"new beta {step}")
+        for field, ix in self.indexes._indexes.items():
+            fresh = SortedIndex((self.indexes._key(field, c), c.id) for c in self.model.cards.values())
+            self.assertEqual(ix.entries, fresh.entries, field)
+        self.check()
+
+    def test_times_round_trip(self):
+        card = self.model.add("To-Do", "timed")
+        self.model.edit(card.id, "timed", "edited")
+        self.times.save()
+        again = CardTimes(self.model, self.times.path)
+        self.assertEqual(again.get(card.id), self.times.get(card.id))
+
+
+class ViewStoreTest(unittest.TestCase):
+    def test_put_and_remove_persist(self):
+        d = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, d)
+        path = os.path.join(d, "views.json")
+        store = ViewStore(path)
+        defaults = [v["name"] for v in store.views]
+        store.put({"name": "Mine", "lane": "Blocked", "sort": "entered"})
+        store.put({"name": "Mine", "lane": "Priority", "sort": "title"})
+        again = ViewStore(path)
+        self.assertEqual([v["name"] for v in again.views], defaults + ["Mine"])
+        self.assertEqual(again.get("Mine")["lane"], "Priority")
+        again.remove("Mine")
+        self.assertIsNone(ViewStore(path).get("Mine"))
+
+
+if __name__ == "__main__":
+    unittest.main()